@@ -0,0 +1,98 @@
+"""Measure the import cost of CLI startup with `python -X importtime`.
+
+Every command runs in a fresh interpreter; the reported time is the sum of the self time of
+all modules imported (median of several runs), so it does not depend on the data files.
+
+    python benchmarks/importtime.py                        # print a table
+    python benchmarks/importtime.py --save startup.json    # record a baseline
+    python benchmarks/importtime.py --compare startup.json # exit 1 on regressions
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+# Command lines to measure; `--help` keeps them independent of the configured data
+COMMANDS = [
+    "--version",
+    "--help",
+    "item get --help",
+    "meal calc --help",
+    "diet calc --help",
+    "config get --help",
+]
+
+RUNNER = "import sys; sys.argv = ['nut'] + sys.argv[1:]; from nutrition.cli import main; main()"
+
+
+def import_times(command):
+    """Return (total import time, modules imported) in microseconds for one run of a command."""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [SRC, os.environ.get("PYTHONPATH")])))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", RUNNER, *command.split()],
+        capture_output=True, text=True, env=env, check=False
+    )
+    total = 0
+    modules = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_time = line.split(":", 1)[1].split("|")[0]
+        total += int(self_time)
+        modules += 1
+    return total, modules
+
+
+def measure(commands, runs):
+    """Median import time (ms) and module count of every command."""
+    results = {}
+    for command in commands:
+        samples = [import_times(command) for _ in range(runs)]
+        results[command] = {
+            "ms": round(statistics.median(total for total, _ in samples) / 1000, 2),
+            "modules": max(modules for _, modules in samples),
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure nutrition CLI import time")
+    parser.add_argument("--runs", "-r", type=int, default=5, help="Runs per command (median is reported)")
+    parser.add_argument("--save", metavar="FILE", help="Write the results as a JSON baseline")
+    parser.add_argument("--compare", metavar="FILE", help="Compare against a JSON baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed relative slowdown against the baseline (default: 0.25)")
+    parser.add_argument("commands", nargs="*", default=COMMANDS, help="Command lines to measure")
+    args = parser.parse_args()
+
+    results = measure(args.commands, args.runs)
+    baseline = {}
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as file:
+            baseline = json.load(file)
+
+    regressions = []
+    print(f"{'Command':<24}{'Imports':>10}{'Time (ms)':>12}{'Baseline':>12}")
+    for command, result in results.items():
+        reference = baseline.get(command)
+        reference_text = f"{reference['ms']:>12.2f}" if reference else f"{'-':>12}"
+        print(f"{command:<24}{result['modules']:>10}{result['ms']:>12.2f}{reference_text}")
+        if reference and result["ms"] > reference["ms"] * (1 + args.tolerance):
+            regressions.append(command)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+        print(f"Saved results to {args.save}")
+
+    if regressions:
+        print(f"Import time regressed for: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
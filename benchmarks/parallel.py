@@ -0,0 +1,101 @@
+"""Measure the speedup of `--jobs` on a synthetic plan library.
+
+Builds items, meals and diets in memory (nothing is written to disk) and times
+compute_diets and compute_meals for every job count, checking that the results match the
+serial run.
+
+    python benchmarks/parallel.py
+    python benchmarks/parallel.py --items 5000 --meals 20000 --diets 2000 --jobs 1 2 4 8
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from nutrition.diet.calculate import compute_diets  # noqa: E402
+from nutrition.loader import DataContext  # noqa: E402
+from nutrition.meal.calculate import compute_meals  # noqa: E402
+from nutrition.models import from_records  # noqa: E402
+
+UNITS = ["g", "kg", "mg", "oz", "pcs"]
+
+
+def make_datasets(items, meals, diets, seed=0):
+    """Random items, meals built from them and diets built from the meals."""
+    rng = random.Random(seed)
+    item_records = [
+        {
+            "name": f"Item {i:06d}",
+            "type": "Food",
+            "per": "100g",
+            "piece_weight": rng.uniform(20, 250),
+            "nutrition": {
+                "energy": {"value": rng.uniform(10, 900), "unit": "kcal"},
+                "carbohydrates": {"value": rng.uniform(0, 90), "sugar": rng.uniform(0, 40), "unit": "g"},
+                "fat": {"value": rng.uniform(0, 60), "saturated": rng.uniform(0, 20),
+                        "unsaturated": rng.uniform(0, 30), "unit": "g"},
+                "protein": {"value": rng.uniform(0, 40), "unit": "g"},
+                "salt": {"value": rng.uniform(0, 3), "unit": "g"},
+            },
+        }
+        for i in range(items)
+    ]
+    meal_records = [
+        {
+            "name": f"Meal {i:06d}",
+            "items": [
+                {"name": f"Item {rng.randrange(items):06d}", "quantity": rng.randint(1, 300), "unit": rng.choice(UNITS)}
+                for _ in range(rng.randint(3, 12))
+            ],
+        }
+        for i in range(meals)
+    ]
+    diet_records = [
+        {
+            "name": f"Diet {i:06d}",
+            "meals": [{"name": f"Meal {rng.randrange(meals):06d}"} for _ in range(rng.randint(7, 35))],
+        }
+        for i in range(diets)
+    ]
+    return {
+        "item": (from_records("item", item_records), None),
+        "meal": (from_records("meal", meal_records), None),
+        "diet": (from_records("diet", diet_records), None),
+    }
+
+
+def timed(compute, datasets, jobs):
+    """Run compute on a fresh context; returns (seconds, results)."""
+    context = DataContext(datasets)
+    start = time.perf_counter()
+    results = compute("", context, jobs)
+    return time.perf_counter() - start, results
+
+
+def main():
+    cpus = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description="Measure the speedup of parallel batch calculation")
+    parser.add_argument("--items", type=int, default=2000, help="Number of items")
+    parser.add_argument("--meals", type=int, default=5000, help="Number of meals")
+    parser.add_argument("--diets", type=int, default=1000, help="Number of diets")
+    parser.add_argument("--jobs", type=int, nargs="+",
+                        default=sorted({1, 2, 4, 8, cpus} & set(range(1, cpus + 1))), help="Job counts to measure")
+    args = parser.parse_args()
+
+    datasets = make_datasets(args.items, args.meals, args.diets)
+    print(f"{args.items} items, {args.meals} meals, {args.diets} diets, {cpus} CPUs")
+    for label, compute in (("meals", compute_meals), ("diets", compute_diets)):
+        print(f"\n{'Jobs':>6}{label.capitalize() + ' (s)':>14}{'Speedup':>10}")
+        serial, expected = timed(compute, datasets, 1)
+        for jobs in args.jobs:
+            seconds, results = (serial, expected) if jobs == 1 else timed(compute, datasets, jobs)
+            if results != expected:
+                sys.exit(f"Results with {jobs} jobs differ from the serial run")
+            print(f"{jobs:>6}{seconds:>14.3f}{serial / seconds:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
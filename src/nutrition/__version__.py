@@ -1,11 +1,12 @@
-try:
-    from importlib.metadata import version
-except ImportError:
-    # Python < 3.8
-    from importlib_metadata import version
-
 def get_version():
     """Get version from package metadata"""
+    # Imported here, importlib.metadata is slow to import and only needed for --version
+    try:
+        from importlib.metadata import version
+    except ImportError:
+        # Python < 3.8
+        from importlib_metadata import version
+
     try:
         return version("nutrition")
     except Exception:
@@ -0,0 +1,80 @@
+"""On-disk snapshots of parsed data files, invalidated when the source file changes."""
+import os
+import pickle
+
+from .vars import CACHE_DIRNAME, CACHE_SCHEMA_VERSION, CACHE_ENABLED
+
+
+def cache_path(filename, suffix="pickle"):
+    """Return the snapshot path of a data file, inside the cache folder next to it."""
+    folder = os.path.join(os.path.dirname(os.path.abspath(filename)), CACHE_DIRNAME)
+    return os.path.join(folder, f"{os.path.basename(filename)}.{suffix}")
+
+
+def cache_key(filename):
+    """Key identifying the current state of a data file."""
+    stat = os.stat(filename)
+    return (CACHE_SCHEMA_VERSION, os.path.abspath(filename), stat.st_mtime_ns, stat.st_size)
+
+
+def sources_key(sources):
+    """Key identifying the current state of the files holding a dataset, missing files included."""
+    return tuple(cache_key(source) if os.path.exists(source) else (source, None) for source in sources)
+
+
+def read_cache(filename, key, suffix="pickle"):
+    """Return the cached object for a data file, or None if missing or stale."""
+    try:
+        with open(cache_path(filename, suffix), "rb") as file:
+            cached_key, data = pickle.load(file)
+    except Exception:
+        # A damaged snapshot can fail to unpickle with almost any error, the file is parsed instead
+        return None
+    return data if cached_key == key else None
+
+
+def write_cache(filename, key, data, suffix="pickle"):
+    """Store an object for a data file, ignoring folders that are not writable."""
+    path = cache_path(filename, suffix)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp_path, "wb") as file:
+            pickle.dump((key, data), file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def cached(filename, build, suffix="pickle"):
+    """Return build() for a data file, reusing the on-disk snapshot while the file is unchanged."""
+    if not CACHE_ENABLED or not os.path.exists(filename):
+        return build()
+
+    key = cache_key(filename)
+    data = read_cache(filename, key, suffix)
+    if data is None:
+        data = build()
+        write_cache(filename, key, data, suffix)
+    return data
+
+
+def cached_sources(sources, build, suffix):
+    """Return build() for a dataset held in sources (see storage sources()), reusing the snapshot
+    stored next to the first source while none of the files change."""
+    if not CACHE_ENABLED or not os.path.exists(sources[0]):
+        return build()
+
+    key = sources_key(sources)
+    data = read_cache(sources[0], key, suffix)
+    if data is None:
+        data = build()
+        write_cache(sources[0], key, data, suffix)
+    return data
+
+
+def refresh_cache(filename, data, suffix="pickle"):
+    """Snapshot data that was just written to a data file, so the next load does not parse it."""
+    if CACHE_ENABLED and os.path.exists(filename):
+        write_cache(filename, cache_key(filename), data, suffix)
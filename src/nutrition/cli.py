@@ -1,95 +1,164 @@
 import argparse
+import importlib
+import os
+import sys
 
-import nutrition.meal as nutmeal
-import nutrition.item as nutitem
-import nutrition.config as nutcfg
-import nutrition.diet as nutdiet
 from .__version__ import get_version
+from .vars import SOCKET_FILE
 
+# Every object and its actions: (action, aliases, help, module, parser configuration function),
+# or the module and configuration function of objects without actions.
+# Only the module of the command being run is imported, so startup does not pay for the others.
+COMMANDS = {
+    "item": {
+        "aliases": ["items"],
+        "help": "Item management",
+        "actions_help": "Actions",
+        "actions": [
+            ("add", ["create"], "Add a new food item", "nutrition.item.add_item", "configure_add_parser"),
+            ("get", ["show", "calc", "list"], "Get food item information", "nutrition.item.get_item", "configure_get_parser"),
+            ("search", ["find"], "Search food items by name, typos allowed", "nutrition.item.search_item", "configure_search_parser"),
+            ("query", [], "Find food items by nutrient ranges, e.g. 'protein>=20 and salt<0.5'", "nutrition.item.query_item", "configure_query_parser"),
+            ("remove", ["delete", "rm"], "Remove a food item", "nutrition.item.remove_item", "configure_remove_parser"),
+            ("update", ["edit"], "Update a food item", "nutrition.item.update_item", "configure_update_parser"),
+            ("import", [], "Import food items from a CSV, JSON or YAML file", "nutrition.item.import_items", "configure_import_parser"),
+        ],
+    },
+    "meal": {
+        "aliases": ["meals"],
+        "help": "Meal management",
+        "actions_help": "Actions",
+        "actions": [
+            ("add", ["create"], "Add a new meal", "nutrition.meal.add_meal", "configure_add_parser"),
+            ("get", ["show", "list"], "Get meal information", "nutrition.meal.get_meal", "configure_get_parser"),
+            ("remove", ["delete", "rm"], "Remove a meal", "nutrition.meal.remove_meal", "configure_remove_parser"),
+            ("update", ["edit"], "Update a meal", "nutrition.meal.update_meal", "configure_update_parser"),
+            ("calculate", ["calc"], "Calculate nutrition for a meal", "nutrition.meal.calculate", "configure_calculate_parser"),
+            ("optimize", ["opt"], "Find item quantities that meet nutrient targets", "nutrition.meal.optimize", "configure_optimize_parser"),
+        ],
+    },
+    "diet": {
+        "aliases": ["diets"],
+        "help": "Diet plan management",
+        "actions_help": "Actions",
+        "actions": [
+            ("add", ["create"], "Add a new diet plan", "nutrition.diet.add_diet", "configure_add_parser"),
+            ("get", ["show", "list"], "Get diet plan information", "nutrition.diet.get_diet", "configure_get_parser"),
+            ("remove", ["delete", "rm"], "Remove a diet plan", "nutrition.diet.remove_diet", "configure_remove_parser"),
+            ("update", ["edit"], "Update a diet plan", "nutrition.diet.update_diet", "configure_update_parser"),
+            ("calculate", ["calc"], "Calculate total nutrition for a diet plan", "nutrition.diet.calculate", "configure_calculate_parser"),
+        ],
+    },
+    "config": {
+        "aliases": [],
+        "help": "Configuration management",
+        "actions_help": "Config actions",
+        "actions": [
+            ("add", ["create"], "Create a new configuration", "nutrition.config.add_config", "configure_add_parser"),
+            ("get", ["show"], "Get current configuration", "nutrition.config.get_config", "configure_get_parser"),
+            ("set", [], "Set configuration", "nutrition.config.set_config", "configure_set_parser"),
+            ("remove", ["delete", "rm"], "Remove a configuration", "nutrition.config.remove_config", "configure_remove_parser"),
+            ("compact", [], "Fold change journals back into the YAML files", "nutrition.config.compact_config", "configure_compact_parser"),
+            ("import", [], "Import YAML data files into the configured storage", "nutrition.config.import_config", "configure_import_parser"),
+            ("export", [], "Export the configured storage to YAML data files", "nutrition.config.export_config", "configure_export_parser"),
+        ],
+    },
+    "export": {
+        "aliases": [],
+        "help": "Export items, meals with their totals and diets with their totals as CSV or JSON lines",
+        "command": ("nutrition.export", "configure_export_parser"),
+    },
+    "serve": {
+        "aliases": ["server"],
+        "help": "Keep the data in memory and answer get/calc commands from a background server",
+        "command": ("nutrition.server.serve", "configure_serve_parser"),
+    },
+}
 
-def main():
+
+class VersionAction(argparse.Action):
+    """Print the version, reading the package metadata only when asked for it."""
+
+    def __init__(self, option_strings, dest=argparse.SUPPRESS, default=argparse.SUPPRESS,
+                 help="show program's version number and exit"):
+        super().__init__(option_strings, dest=dest, default=default, nargs=0, help=help)
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        parser.exit(message=f"{get_version()}\n")
+
+
+def find_command(argv):
+    """Return the (object, action) named on the command line, None where not given or unknown."""
+    words = [arg for arg in argv if not arg.startswith("-")]
+    obj = resolve_name(words[0], {name: spec["aliases"] for name, spec in COMMANDS.items()}) if words else None
+    if obj is None or len(words) < 2 or "actions" not in COMMANDS[obj]:
+        return obj, None
+    actions = {name: aliases for name, aliases, *_ in COMMANDS[obj]["actions"]}
+    return obj, resolve_name(words[1], actions)
+
+
+def resolve_name(word, names):
+    """Map a command name or alias to the command name."""
+    for name, aliases in names.items():
+        if word == name or word in aliases:
+            return name
+    return None
+
+
+def configure_command(parser, module_name, configure):
+    """Import the module of an action and let it configure its parser."""
+    module = importlib.import_module(module_name)
+    getattr(module, configure)(parser)
+
+
+def build_parser(argv):
+    """Build the argument parser, configuring only the command named in argv."""
+    chosen_object, chosen_action = find_command(argv)
+
+    cli = argparse.ArgumentParser(description="Nutrition CLI")
+    cli.add_argument("--version", "-v", action=VersionAction)
+    subparsers = cli.add_subparsers(dest="object", help="Available commands")
+
+    for obj, spec in COMMANDS.items():
+        object_parser = subparsers.add_parser(obj, aliases=spec["aliases"], help=spec["help"])
+        if obj != chosen_object:
+            continue
+        if "command" in spec:
+            configure_command(object_parser, *spec["command"])
+            continue
+        action_subparsers = object_parser.add_subparsers(dest="action", help=spec["actions_help"])
+        for action, aliases, help_text, module_name, configure in spec["actions"]:
+            action_parser = action_subparsers.add_parser(action, aliases=aliases, help=help_text)
+            if action == chosen_action:
+                configure_command(action_parser, module_name, configure)
+    return cli
+
+
+def main(argv=None):
     """
     Main entry point for the Nutrition CLI
     """
-    cli = argparse.ArgumentParser(description="Nutrition CLI")
-    cli.add_argument("--version", "-v", action="version", version=get_version())
-    subparsers = cli.add_subparsers(dest="object", help="Available commands")
+    argv = sys.argv[1:] if argv is None else argv
+    try:
+        run(argv)
+    except BrokenPipeError:
+        # The reader went away, e.g. `nut export | head`: stop without a traceback, and keep
+        # the interpreter from failing again when it flushes stdout at exit
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        sys.exit(1)
+
 
+def run(argv):
+    """Run a command line, forwarding it to a running `nut serve` when it can answer it."""
+    # Let a running `nut serve` answer read-only commands from its in-memory data
+    if os.path.exists(SOCKET_FILE) and not any(arg in ("-h", "--help") for arg in argv):
+        from .server import FORWARDED, forward
+        if find_command(argv) in FORWARDED and forward(argv):
+            return
 
-    # Item subcommand
-    item_parser = subparsers.add_parser("item", aliases=["items"], help="Item management")
-    item_subparsers = item_parser.add_subparsers(dest="action", help="Actions")
-    # Item add subcommand
-    item_add_parser = item_subparsers.add_parser("add", aliases=["create"], help="Add a new food item")
-    nutitem.configure_add_parser(item_add_parser)
-    # Item get subcommand
-    item_get_parser = item_subparsers.add_parser("get", aliases=["show", "calc", "list"], help="Get food item information")
-    nutitem.configure_get_parser(item_get_parser)
-    # Item remove subcommand
-    item_remove_parser = item_subparsers.add_parser("remove", aliases=["delete", "rm"], help="Remove a food item")
-    nutitem.configure_remove_parser(item_remove_parser)
-    # Item update subcommand
-    item_update_parser = item_subparsers.add_parser("update", aliases=["edit"], help="Update a food item")
-    nutitem.configure_update_parser(item_update_parser)
-
-
-    # Meal subcommand
-    meal_parser = subparsers.add_parser("meal", aliases=["meals"], help="Meal management")
-    meal_subparsers = meal_parser.add_subparsers(dest="action", help="Actions")
-    # Meal add subcommand
-    meal_add_parser = meal_subparsers.add_parser("add", aliases=["create"], help="Add a new meal")
-    nutmeal.configure_add_parser(meal_add_parser)
-    # Meal get subcommand
-    meal_get_parser = meal_subparsers.add_parser("get", aliases=["show", "list"], help="Get meal information")
-    nutmeal.configure_get_parser(meal_get_parser)
-    # Meal remove subcommand
-    meal_remove_parser = meal_subparsers.add_parser("remove", aliases=["delete", "rm"], help="Remove a meal")
-    nutmeal.configure_remove_parser(meal_remove_parser)
-    # Meal update subcommand
-    meal_update_parser = meal_subparsers.add_parser("update", aliases=["edit"], help="Update a meal")
-    nutmeal.configure_update_parser(meal_update_parser)
-    # Meal calculate subcommand
-    meal_calculate_parser = meal_subparsers.add_parser("calculate", aliases=["calc"], help="Calculate nutrition for a meal")
-    nutmeal.configure_calculate_parser(meal_calculate_parser)
-
-
-    # Diet subcommand
-    diet_parser = subparsers.add_parser("diet", aliases=["diets"], help="Diet plan management")
-    diet_subparsers = diet_parser.add_subparsers(dest="action", help="Actions")
-    # Diet add subcommand
-    diet_add_parser = diet_subparsers.add_parser("add", aliases=["create"], help="Add a new diet plan")
-    nutdiet.configure_add_parser(diet_add_parser)
-    # Diet get subcommand
-    diet_get_parser = diet_subparsers.add_parser("get", aliases=["show", "list"], help="Get diet plan information")
-    nutdiet.configure_get_parser(diet_get_parser)
-    # Diet remove subcommand
-    diet_remove_parser = diet_subparsers.add_parser("remove", aliases=["delete", "rm"], help="Remove a diet plan")
-    nutdiet.configure_remove_parser(diet_remove_parser)
-    # Diet update subcommand
-    diet_update_parser = diet_subparsers.add_parser("update", aliases=["edit"], help="Update a diet plan")
-    nutdiet.configure_update_parser(diet_update_parser)
-    # Diet calculate subcommand
-    diet_calculate_parser = diet_subparsers.add_parser("calculate", aliases=["calc"], help="Calculate total nutrition for a diet plan")
-    nutdiet.configure_calculate_parser(diet_calculate_parser)
-
-
-    # Config subcommand
-    config_parser = subparsers.add_parser("config", help="Configuration management")
-    config_subparsers = config_parser.add_subparsers(dest="action", help="Config actions")
-    # Config add subcommand
-    config_add_parser = config_subparsers.add_parser("add", aliases=["create"], help="Create a new configuration")
-    nutcfg.configure_add_parser(config_add_parser)
-    # Config get subcommand
-    config_get_parser = config_subparsers.add_parser("get", aliases=["show"], help="Get current configuration")
-    nutcfg.configure_get_parser(config_get_parser)
-    # Config set subcommand
-    config_set_parser = config_subparsers.add_parser("set", help="Set configuration")
-    nutcfg.configure_set_parser(config_set_parser)
-    # Config remove subcommand
-    config_remove_parser = config_subparsers.add_parser("remove", aliases=["delete", "rm"], help="Remove a configuration")
-    nutcfg.configure_remove_parser(config_remove_parser)
-
-    args = cli.parse_args()
+    cli = build_parser(argv)
+    args = cli.parse_args(argv)
 
     if hasattr(args, 'func'):
         args.func(args)
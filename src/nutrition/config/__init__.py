@@ -1,4 +1,4 @@
-from .get_config import configure_get_parser, get_config
-from .set_config import configure_set_parser
-from .add_config import configure_add_parser
-from .remove_config import configure_remove_parser
+"""Config commands, one module each.
+
+Nothing is imported here, so running one command (see COMMANDS in cli.py) imports only its module.
+"""
@@ -1,21 +1,24 @@
 import os
 
 from ..console import print_success
+from ..storage import STORAGE_BACKENDS
 from ..utils import save_data, load_yaml
-from ..vars import SETTINGS_FILE
+from ..vars import SETTINGS_FILE, DATA_FILES
 
 def configure_add_parser(parser):
     """Configure arguments for config add command"""
     parser.add_argument("--name", "-n", required=True, help="Give a name of the configuration")
     parser.add_argument("--folder", "-f", help="Name of folder of data files")
     parser.add_argument("--set-current", "-s", required=False, help="Set this configuration as the current one", action="store_true")
+    parser.add_argument("--storage", choices=STORAGE_BACKENDS, default="yaml",
+                        help="Storage backend: rewrite YAML files, append changes to a journal, or a SQLite database")
     parser.set_defaults(func=handle_add)
 
 def handle_add(args):
     """Handle config add command"""
-    add_config(args.name, args.set_current, args.folder)
+    add_config(args.name, args.set_current, args.folder, args.storage)
 
-def add_config(name, set_current, folder):
+def add_config(name, set_current, folder, storage="yaml"):
     """Create a new configuration file"""
     if os.path.exists(SETTINGS_FILE):
         settings = load_yaml(SETTINGS_FILE)
@@ -33,10 +36,14 @@ def add_config(name, set_current, folder):
         folder = f".data-{name}"
     config = {
         "name": name,
-        "item": os.path.join(os.getcwd(), folder, "items.yaml"),
-        "meal": os.path.join(os.getcwd(), folder, "meals.yaml"),
-        "diet": os.path.join(os.getcwd(), folder, "diets.yaml")
+        "item": os.path.join(os.getcwd(), folder, DATA_FILES["item"]),
+        "meal": os.path.join(os.getcwd(), folder, DATA_FILES["meal"]),
+        "diet": os.path.join(os.getcwd(), folder, DATA_FILES["diet"])
     }
+    if storage != "yaml":
+        config["storage"] = storage
+    if storage == "sqlite":
+        config["database"] = os.path.join(os.getcwd(), folder, "nutrition.db")
     settings["configs"].append(config)
     if set_current:
         settings["current"] = name
@@ -0,0 +1,26 @@
+from ..console import print_info, print_success
+from ..storage import open_storage
+from .get_config import get_config
+
+
+def configure_compact_parser(parser):
+    """Configure arguments for config compact command"""
+    parser.set_defaults(func=handle_compact)
+
+
+def handle_compact(_args):
+    """Handle config compact command"""
+    compact_config()
+
+
+def compact_config():
+    """Fold the change journals of the current configuration back into its YAML files."""
+    config = get_config(verbose=0)
+    if config.get("storage", "yaml") != "journal":
+        print_info(f"Configuration '{config['name']}' does not use journal storage, nothing to compact.")
+        return
+
+    for identifier in ("item", "meal", "diet"):
+        storage = open_storage(config, identifier)
+        folded = storage.compact()
+        print_success(f"Compacted {folded} journal entries into {storage.file}")
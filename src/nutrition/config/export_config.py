@@ -0,0 +1,34 @@
+import os
+
+from ..console import print_success
+from ..storage import open_storage
+from ..utils import save_data
+from ..vars import DATA_FILES
+from .get_config import get_config
+
+
+def configure_export_parser(parser):
+    """Configure arguments for config export command"""
+    parser.add_argument("--folder", "-f", help="Folder to write items.yaml, meals.yaml and diets.yaml to "
+                                               "(defaults to the YAML files of the configuration)")
+    parser.set_defaults(func=handle_export)
+
+
+def handle_export(args):
+    """Handle config export command"""
+    export_config(args.folder)
+
+
+def export_config(folder=None):
+    """Write the data of the current configuration to YAML data files."""
+    config = get_config(verbose=0)
+    for identifier, filename in DATA_FILES.items():
+        target = os.path.join(folder, filename) if folder else config[identifier]
+        storage = open_storage(config, identifier)
+        records = storage.load()
+        if os.path.abspath(target) == os.path.abspath(storage.file):
+            # Exporting onto the backing file itself, e.g. to fold a journal
+            storage.replace(records)
+        else:
+            save_data(records, target)
+        print_success(f"Exported {len(records)} records from {storage.file} to {target}")
@@ -0,0 +1,30 @@
+import os
+
+from ..console import print_success
+from ..storage import open_storage
+from ..utils import load_existing_data
+from ..vars import DATA_FILES
+from .get_config import get_config
+
+
+def configure_import_parser(parser):
+    """Configure arguments for config import command"""
+    parser.add_argument("--folder", "-f", help="Folder with items.yaml, meals.yaml and diets.yaml "
+                                               "(defaults to the YAML files of the configuration)")
+    parser.set_defaults(func=handle_import)
+
+
+def handle_import(args):
+    """Handle config import command"""
+    import_config(args.folder)
+
+
+def import_config(folder=None):
+    """Replace the data of the current configuration with the contents of YAML data files."""
+    config = get_config(verbose=0)
+    for identifier, filename in DATA_FILES.items():
+        source = os.path.join(folder, filename) if folder else config[identifier]
+        records = load_existing_data(source)
+        storage = open_storage(config, identifier)
+        storage.replace(records)
+        print_success(f"Imported {len(records)} records from {source} into {storage.file}")
@@ -2,6 +2,8 @@
 
 import shutil
 
+from .matrix import NUTRIENT_LABELS, totals_to_vector
+
 
 def get_terminal_width():
     """Get the current terminal width, with fallback to 80."""
@@ -143,3 +145,152 @@ def format_with_unit(value, unit):
     if formatted_value == "-":
         return "-"
     return f"{formatted_value} {unit}"
+
+
+def print_table(headers, rows):
+    """Print rows as a table with left-aligned first column and right-aligned others.
+
+    Args:
+        headers: Column titles
+        rows: Lists of cell values, converted with str()
+    """
+    rows = [[str(cell) for cell in row] for row in rows]
+    widths = [len(header) for header in headers]
+    for row in rows:
+        for i, cell in enumerate(row):
+            widths[i] = max(widths[i], len(cell))
+
+    def format_row(cells):
+        first = cells[0].ljust(widths[0])
+        rest = (cell.rjust(width) for cell, width in zip(cells[1:], widths[1:]))
+        return "  ".join([first, *rest])
+
+    print(format_row(list(headers)))
+    print_separator(width=sum(widths) + 2 * (len(widths) - 1))
+    for row in rows:
+        print(format_row(row))
+
+
+def print_nutrition_totals(totals):
+    """Print the total nutrition values in a formatted way."""
+    indent = "  "
+    sub_indent = "    "
+
+    energy_formatted = format_with_unit(totals['energy']['value'], totals['energy']['unit'])
+    print_item_detail("Energy", energy_formatted, indent)
+
+    carbs_formatted = format_with_unit(totals['carbohydrates']['value'], totals['carbohydrates']['unit'])
+    sugar_formatted = format_with_unit(totals['carbohydrates']['sugar'], totals['carbohydrates']['unit'])
+    print_item_detail("Carbohydrates", carbs_formatted, indent)
+    print_sub_item_detail("Sugar", sugar_formatted, sub_indent)
+
+    fat_formatted = format_with_unit(totals['fat']['value'], totals['fat']['unit'])
+    fat_sat_formatted = format_with_unit(totals['fat']['saturated'], totals['fat']['unit'])
+    fat_unsat_formatted = format_with_unit(totals['fat']['unsaturated'], totals['fat']['unit'])
+    print_item_detail("Fat", fat_formatted, indent)
+    print_sub_item_detail("Saturated", fat_sat_formatted, sub_indent)
+    print_sub_item_detail("Unsaturated", fat_unsat_formatted, sub_indent)
+
+    protein_formatted = format_with_unit(totals['protein']['value'], totals['protein']['unit'])
+    salt_formatted = format_with_unit(totals['salt']['value'], totals['salt']['unit'])
+    print_item_detail("Protein", protein_formatted, indent)
+    print_item_detail("Salt", salt_formatted, indent)
+
+
+def print_totals_table(label, results):
+    """Print the totals of several meals or diets as one table.
+
+    Args:
+        label: Title of the name column (e.g., 'Meal', 'Diet')
+        results: Dicts with 'name', 'totals' and 'skipped'
+    """
+    print_table(
+        [label, *NUTRIENT_LABELS, "Skipped"],
+        [[result['name'], *map(format_number, totals_to_vector(result['totals'])), result['skipped']]
+         for result in results]
+    )
+
+
+def print_meal_result(result):
+    """Print a meal calculation result line by line, followed by its totals."""
+    items = result['items']
+    print_header(f"Calculating for MEAL: '{result['name']}'\n[Items in meal: {len(items)}]", '=')
+
+    for item in items:
+        line = f"{format_number(item['quantity'])} {item['unit']} of {item['name']}"
+        if item['status'] == 'missing':
+            print_warning(f"{line} - NOT FOUND")
+        elif item['status'] == 'conversion':
+            print_warning(f"{line} - UNIT CONVERSION ISSUE")
+        else:
+            print(f"✔️ {line} (×{format_number(item['multiplier'])})")
+
+    print_header("", "=")
+    print_header("💯 TOTAL NUTRITION FOR MEAL", '=', newline=False)
+    print_nutrition_totals(result['totals'])
+
+    print_separator()
+    calculated = sum(1 for item in items if item['status'] == 'ok')
+    print_success(f"Calculated nutrition for {calculated}/{len(items)} items")
+    if result['missing_items']:
+        print_warning(f"Missing nutrition data for {len(result['missing_items'])} items:")
+        for item_name in result['missing_items']:
+            print(f"   - {item_name}")
+    if result['conversion_issues']:
+        print_warning(f"Unit conversion issues for {len(result['conversion_issues'])} items "
+                      "(set piece_weight or density on the item, or use a known unit):")
+        for item_name in result['conversion_issues']:
+            print(f"   - {item_name}")
+    print_separator()
+
+
+def print_diet_result(result, summary_only=False):
+    """Print a diet calculation result meal by meal, followed by its totals.
+
+    Args:
+        result: Diet calculation result
+        summary_only: Skip the item lines and totals of every meal
+    """
+    meals = result['meals']
+    print_header(f"Calculating for DIET: '{result['name']}'\n[Meals in diet: {len(meals)}]", '¤')
+
+    if result.get('description') is not None:
+        print(f"Description: {result['description']}")
+        print_separator()
+
+    for i, meal in enumerate(meals, 1):
+        meal_info = f"Meal {i}: {meal['name']}"
+        if 'day' in meal:
+            meal_info += f" (Day: {meal['day']}"
+            if 'type' in meal:
+                meal_info += f", Type: {meal['type']}"
+            meal_info += ")"
+        elif 'type' in meal:
+            meal_info += f" (Type: {meal['type']})"
+
+        print_subheader(meal_info, '=')
+
+        if meal['status'] == 'ok':
+            if not summary_only:
+                print_meal_result(meal['result'])
+        elif meal['status'] == 'error':
+            print_warning(f"Error calculating nutrition for meal '{meal['name']}': {meal['error']}")
+        else:
+            if not summary_only:
+                print_error(meal['error'])
+            print_warning(f"Could not calculate nutrition for meal '{meal['name']}'")
+
+    print_header("", "¤")
+    print_header("🍽️  TOTAL NUTRITION FOR DIET", '¤', newline=False)
+    print_nutrition_totals(result['totals'])
+
+    print_separator()
+    calculated = len(meals) - len(result['missing_meals'])
+    print_success(f"Calculated nutrition for {calculated}/{len(meals)} meals")
+
+    if result['missing_meals']:
+        print_warning(f"Could not calculate nutrition for {len(result['missing_meals'])} meals:")
+        for meal_name in result['missing_meals']:
+            print(f"   - {meal_name}")
+
+    print_separator()
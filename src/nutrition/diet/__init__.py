@@ -1,6 +1,4 @@
-from .add_diet import add_diet, configure_add_parser
-from .get_diet import get_diet, configure_get_parser
-from .remove_diet import remove_diet, configure_remove_parser
-from .update_diet import update_diet, configure_update_parser
-from .calculate import calculate_diet, configure_calculate_parser
-from ..loader import load
+"""Diet commands, one module each.
+
+Nothing is imported here, so running one command (see COMMANDS in cli.py) imports only its module.
+"""
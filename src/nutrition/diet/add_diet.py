@@ -1,7 +1,6 @@
 """Script to add a new diet to a YAML file"""
 from ..console import print_section_title, print_success
-from ..utils import save_data
-from ..loader import load
+from ..loader import get_storage
 
 
 def configure_add_parser(parser):
@@ -68,14 +67,13 @@ def get_user_input():
 
 def add_diet():
     """Main function to add a new diet."""
-    existing_data, file = load("diet")
+    storage = get_storage("diet")
     new_diet = get_user_input()
 
     if new_diet is None:
         return
 
-    existing_data.append(new_diet)
-    save_data(existing_data, file)
+    storage.add(new_diet)
 
-    print_success(f"Successfully added diet '{new_diet['name']}' to {file}")
+    print_success(f"Successfully added diet '{new_diet['name']}' to {storage.file}")
     print_success(f"Diet contains {len(new_diet['meals'])} meals")
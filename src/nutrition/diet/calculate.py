@@ -1,22 +1,54 @@
 from ..console import *
-from ..meal.calculate import calculate_meal
-from .get_diet import get_diet
+from ..loader import current_context
+from ..matrix import NUTRIENT_COLUMNS, empty_vector, add_vectors, totals_from_vector, totals_to_vector
+from ..meal.calculate import compute_meal, cached_meal_vector, require_meal_items
+from ..meal.get_meal import resolve_meal
+from ..output import DIGITS, RecordWriter, TOTALS_COLUMNS, add_format_argument, nutrient_row, report_error, totals_rows
+from ..parallel import imap_records
+from .get_diet import resolve_diet
+
+# CSV columns of a diet calculation, one row per diet meal with its totals
+DIET_RESULT_COLUMNS = ["diet", "meal", "day", "type", "status", "error", *NUTRIENT_COLUMNS]
 
 
 def configure_calculate_parser(parser):
     """Configure arguments for diet calculate command"""
-    parser.add_argument("name", help="Name of the diet to calculate (accepts regex)")
+    parser.add_argument("name", nargs="?", default="", help="Name of the diet to calculate (accepts regex)")
     parser.add_argument("--summary", "-s", action="store_true", help="Show summary only")
+    parser.add_argument("--all", "-a", action="store_true", help="Calculate all diets in one table")
+    parser.add_argument("--jobs", "-j", type=int, default=1, help="Worker processes for calculating several diets")
+    add_format_argument(parser)
     parser.set_defaults(func=handle_calculate)
 
 def handle_calculate(args):
     """Handle diet calculate command"""
-    calculate_diet(args.name, args.summary)
-
-def calculate_diet(diet_name, summary_only=False):
-    """Calculate the total nutrition values for all meals in the specified diet."""
+    if not args.all and not args.name:
+        message = "Give the name of a diet to calculate, or use --all"
+        if args.format == "text":
+            print_error(message)
+        else:
+            report_error(message)
+        return
+    context = current_context()
+    several = args.all or context.index("diet").several(args.name)
+    pattern = "" if args.all else args.name
+    if args.format != "text":
+        if several:
+            write_diets_totals(pattern, args.format, context, args.jobs)
+        else:
+            write_diet_result(args.name, args.format, args.summary, context)
+    elif several:
+        calculate_diets(pattern, context, args.jobs)
+    else:
+        calculate_diet(args.name, args.summary, context)
+    context.meal_totals().save()
+
+def calculate_diet(diet_name, summary_only=False, context=None):
+    """Calculate and print the total nutrition values for all meals in the specified diet."""
+    # Parse items, meals and diets once and share them across all meals
+    context = context or current_context()
     # Get the diet plan
-    target_diet, idx = get_diet(name=diet_name, verbose=0)
+    idx = resolve_diet(diet_name, context)
 
     if idx is None:
         print_error(f"Diet '{diet_name}' not found")
@@ -25,145 +57,138 @@ def calculate_diet(diet_name, summary_only=False):
         print_error(f"Multiple diets matched with '{diet_name}'")
         return None
 
-    diet_name = target_diet["name"]
-    print_header(f"Calculating for DIET: '{diet_name}'\n[Meals in diet: {len(target_diet['meals'])}]", '¤')
-
-    if 'description' in target_diet:
-        print(f"Description: {target_diet['description']}")
-        print_separator()
+    result = compute_diet(context.diets[idx], context, detailed=not summary_only)
+    print_diet_result(result, summary_only)
+    return result['totals']
 
+def calculate_diets(pattern, context=None, jobs=1):
+    """Calculate the nutrition of every diet matching pattern and print one table."""
+    context = context or current_context()
+    results = compute_diets(pattern, context, jobs)
+    if not results:
+        print_error(f"No diets matched with '{pattern}'")
+        return []
 
-    # Initialize diet totals
-    diet_totals = {
-        'energy': {'value': 0, 'unit': 'kcal'},
-        'carbohydrates': {'value': 0, 'unit': 'g', 'sugar': 0},
-        'fat': {'value': 0, 'unit': 'g', 'saturated': 0, 'unsaturated': 0},
-        'protein': {'value': 0, 'unit': 'g'},
-        'salt': {'value': 0, 'unit': 'g'}
-    }
-
-    calculated_meals = []
+    print_totals_table("Diet", results)
+    print_separator()
+    print_success(f"Calculated nutrition for {len(results)} diets")
+    return [(result['name'], result['totals']) for result in results]
+
+def write_diet_result(diet_name, output_format, summary_only=False, context=None):
+    """Calculate the specified diet and write the result in a machine-readable format."""
+    context = context or current_context()
+    with RecordWriter(output_format, DIET_RESULT_COLUMNS, diet_result_rows, digits=DIGITS) as writer:
+        idx = resolve_diet(diet_name, context)
+        if idx is None:
+            report_error(f"Diet '{diet_name}' not found")
+            return None
+        elif idx == -1:
+            report_error(f"Multiple diets matched with '{diet_name}'")
+            return None
+        result = compute_diet(context.diets[idx], context, detailed=not summary_only)
+        writer.write(result)
+    return result['totals']
+
+def write_diets_totals(pattern, output_format, context=None, jobs=1):
+    """Calculate every diet matching pattern, writing each totals entry as soon as it is calculated."""
+    context = context or current_context()
+    with RecordWriter(output_format, TOTALS_COLUMNS, totals_rows, digits=DIGITS) as writer:
+        count = writer.write_all(iter_diets(pattern, context, jobs))
+    if not count:
+        report_error(f"No diets matched with '{pattern}'")
+    return count
+
+def diet_result_rows(result):
+    """CSV rows of a diet calculation, one per diet meal."""
+    return [{"diet": result['name'], "meal": meal['name'], "day": meal.get('day'), "type": meal.get('type'),
+             "status": meal['status'], "error": meal['error'], **nutrient_row(meal['totals'])}
+            for meal in result['meals']]
+
+def compute_diet(diet, context, detailed=True):
+    """Calculate the nutrition of a diet without printing anything.
+
+    Returns a dict with the diet 'name', 'description', nutrition 'totals', the names of
+    'missing_meals' and one entry per diet meal in 'meals' holding its 'name', optional 'day'
+    and 'type', 'status' ('ok', 'not_found', 'ambiguous' or 'error'), 'error' message and
+    'totals'. When detailed, each calculated entry also holds the full meal 'result'
+    (see compute_meal), calculated once per meal; otherwise memoized meal totals are used.
+    """
+    require_diet_items([diet], context)
+    resolved = {}
+    # Detailed results by meal index, for meals repeated in the diet
+    results = {}
+    diet_vector = empty_vector()
+    meals = []
     missing_meals = []
 
-    # Calculate nutrition for each meal in the diet
-    for i, diet_meal in enumerate(target_diet['meals'], 1):
-        meal_name = diet_meal['name']
-
-        # Display meal info
-        meal_info = f"Meal {i}: {meal_name}"
-        if 'day' in diet_meal:
-            meal_info += f" (Day: {diet_meal['day']}"
-            if 'type' in diet_meal:
-                meal_info += f", Type: {diet_meal['type']}"
-            meal_info += ")"
-        elif 'type' in diet_meal:
-            meal_info += f" (Type: {diet_meal['type']})"
-
-        print_subheader(meal_info, '=')
+    for diet_meal in diet.meals:
+        meal_name = diet_meal.name
+        entry = {'name': meal_name}
+        if diet_meal.day is not None:
+            entry['day'] = diet_meal.day
+        if diet_meal.type is not None:
+            entry['type'] = diet_meal.type
+        entry.update({'status': 'ok', 'error': None, 'totals': None, 'result': None})
 
         try:
-            # Calculate nutrition for this meal
-            if not summary_only:
-                meal_totals = calculate_meal(meal_name)
-            else:
-                # For summary mode, calculate silently
-                meal_totals = calculate_meal_silent(meal_name)
-
-            if meal_totals:
-                # Add meal totals to diet totals
-                add_to_totals(diet_totals, meal_totals)
-                calculated_meals.append(meal_name)
+            idx = resolve_meal(meal_name, context, resolved)
+            if idx is None:
+                entry.update(status='not_found', error=f"Meal '{meal_name}' not found")
+            elif idx == -1:
+                entry.update(status='ambiguous', error=f"Multiple meals matched with '{meal_name}'")
+            elif detailed:
+                if idx not in results:
+                    results[idx] = compute_meal(context.meals[idx], context)
+                entry['result'] = results[idx]
+                entry['totals'] = entry['result']['totals']
+                add_vectors(diet_vector, totals_to_vector(entry['totals']))
             else:
-                missing_meals.append(meal_name)
-                print_warning(f"Could not calculate nutrition for meal '{meal_name}'")
-
+                vector = cached_meal_vector(context, idx)[0]
+                entry['totals'] = totals_from_vector(vector)
+                add_vectors(diet_vector, vector)
         except Exception as e:
-            missing_meals.append(meal_name)
-            print_warning(f"Error calculating nutrition for meal '{meal_name}': {str(e)}")
-
-    # Display diet summary
-    print_header("","¤")
-    print_header("🍽️  TOTAL NUTRITION FOR DIET", '¤', newline=False)
-    print_nutrition_totals(diet_totals)
-
-    # Summary information
-    print_separator()
-    print_success(f"Calculated nutrition for {len(calculated_meals)}/{len(target_diet['meals'])} meals")
+            entry.update(status='error', error=str(e))
 
-    if missing_meals:
-        print_warning(f"Could not calculate nutrition for {len(missing_meals)} meals:")
-        for meal in missing_meals:
-            print(f"   - {meal}")
-
-    print_separator()
+        if entry['status'] != 'ok':
+            missing_meals.append(meal_name)
+        meals.append(entry)
+
+    return {
+        'name': diet.name,
+        'description': diet.description,
+        'totals': totals_from_vector(diet_vector),
+        'meals': meals,
+        'missing_meals': missing_meals
+    }
 
-    return diet_totals
-
-def add_to_totals(diet_totals, meal_totals):
-    """Add meal nutrition totals to diet totals."""
-    # Energy
-    if meal_totals['energy']['value'] is not None:
-        diet_totals['energy']['value'] += meal_totals['energy']['value']
-
-    # Carbohydrates
-    if meal_totals['carbohydrates']['value'] is not None:
-        diet_totals['carbohydrates']['value'] += meal_totals['carbohydrates']['value']
-    if meal_totals['carbohydrates']['sugar'] is not None:
-        diet_totals['carbohydrates']['sugar'] += meal_totals['carbohydrates']['sugar']
-
-    # Fat
-    if meal_totals['fat']['value'] is not None:
-        diet_totals['fat']['value'] += meal_totals['fat']['value']
-    if meal_totals['fat']['saturated'] is not None:
-        diet_totals['fat']['saturated'] += meal_totals['fat']['saturated']
-    if meal_totals['fat']['unsaturated'] is not None:
-        diet_totals['fat']['unsaturated'] += meal_totals['fat']['unsaturated']
-
-    # Protein
-    if meal_totals['protein']['value'] is not None:
-        diet_totals['protein']['value'] += meal_totals['protein']['value']
-
-    # Salt
-    if meal_totals['salt']['value'] is not None:
-        diet_totals['salt']['value'] += meal_totals['salt']['value']
-
-
-def print_nutrition_totals(totals):
-    """Print the total nutrition values in a formatted way."""
-    indent = "  "
-    sub_indent = "    "
-
-    energy_formatted = format_with_unit(totals['energy']['value'], totals['energy']['unit'])
-    print_item_detail("Energy", energy_formatted, indent)
-
-    carbs_formatted = format_with_unit(totals['carbohydrates']['value'], totals['carbohydrates']['unit'])
-    sugar_formatted = format_with_unit(totals['carbohydrates']['sugar'], totals['carbohydrates']['unit'])
-    print_item_detail("Carbohydrates", carbs_formatted, indent)
-    print_sub_item_detail("Sugar", sugar_formatted, sub_indent)
-
-    fat_formatted = format_with_unit(totals['fat']['value'], totals['fat']['unit'])
-    fat_sat_formatted = format_with_unit(totals['fat']['saturated'], totals['fat']['unit'])
-    fat_unsat_formatted = format_with_unit(totals['fat']['unsaturated'], totals['fat']['unit'])
-    print_item_detail("Fat", fat_formatted, indent)
-    print_sub_item_detail("Saturated", fat_sat_formatted, sub_indent)
-    print_sub_item_detail("Unsaturated", fat_unsat_formatted, sub_indent)
-
-    protein_formatted = format_with_unit(totals['protein']['value'], totals['protein']['unit'])
-    salt_formatted = format_with_unit(totals['salt']['value'], totals['salt']['unit'])
-    print_item_detail("Protein", protein_formatted, indent)
-    print_item_detail("Salt", salt_formatted, indent)
-
-def calculate_meal_silent(meal_name):
-    """Calculate meal nutrition without printing details (for summary mode)."""
-    import sys
-    from io import StringIO
-
-    # Capture stdout to suppress detailed output
-    old_stdout = sys.stdout
-    sys.stdout = StringIO()
-
-    try:
-        result = calculate_meal(meal_name)
-        return result
-    finally:
-        sys.stdout = old_stdout
+def compute_diets(pattern, context, jobs=1):
+    """Calculate the totals of every diet matching pattern without printing anything.
+
+    Returns one dict per diet with its 'name', 'totals' and number of 'skipped' meals.
+    With jobs above 1 the diets are spread over that many worker processes.
+    """
+    return list(iter_diets(pattern, context, jobs))
+
+def iter_diets(pattern, context, jobs=1):
+    """Like compute_diets, but yield every entry as soon as it is calculated."""
+    matched_idx = context.index("diet").search(pattern)
+    require_diet_items([context.diets[idx] for idx in matched_idx], context)
+    yield from imap_records(diet_entry, matched_idx, context, ("item", "meal", "diet"), jobs)
+
+def require_diet_items(diets, context):
+    """Read the items referenced by the meals of diets, when the context streams items."""
+    if not context.streams_items():
+        return
+    meals = []
+    resolved = {}
+    for diet in diets:
+        for diet_meal in diet.meals:
+            idx = resolve_meal(diet_meal.name, context, resolved)
+            if idx is not None and idx != -1:
+                meals.append(context.meals[idx])
+    require_meal_items(meals, context)
+
+def diet_entry(context, idx):
+    """Totals entry of the diet at idx, as returned by compute_diets."""
+    result = compute_diet(context.diets[idx], context, detailed=False)
+    return {'name': result['name'], 'totals': result['totals'], 'skipped': len(result['missing_meals'])}
@@ -1,28 +1,39 @@
-import re
-
 from ..console import print_list_header, print_error, print_item_detail
-from ..loader import load
+from ..loader import current_context
+from ..output import RecordWriter, add_format_argument
 from ..utils import vprint
 
+# CSV columns of diets, one row per diet meal
+DIET_COLUMNS = ["diet", "description", "meal", "day", "type"]
+
 
 def configure_get_parser(parser):
     """Configure arguments for diet get command"""
     parser.add_argument("name", nargs="?", default="", help="Name of the diet to retrieve (accepts regex)")
+    add_format_argument(parser)
     parser.set_defaults(func=handle_get)
 
 def handle_get(args):
     """Handle diet get command"""
-    get_diet(args.name)
+    if args.format != "text":
+        write_diets(args.name, args.format)
+        return
+    context = current_context()
+    # Exact names are read on their own, other names are matched against all diets
+    diet = context.find("diet", args.name) if args.name else None
+    if diet is None:
+        get_diet(args.name, context=context)
+    else:
+        print_list_header(1, "diet")
+        print_diet(diet)
 
-def get_diet(name=None, verbose=1):
+def get_diet(name=None, verbose=1, context=None):
     """Retrieve diet data from the specified YAML file."""
-    diets, _ = load("diet")
-    matched_diets = []
-    matched_diet_idx = -1
-    for i, diet in enumerate(diets):
-        if re.search(name, diet["name"], re.IGNORECASE):
-            matched_diet_idx = i
-            matched_diets.append(diet["name"])
+    context = context or current_context()
+    diets, _ = context.get("diet")
+    matched_idx = context.index("diet").search(name or "")
+    matched_diets = [diets[i].name for i in matched_idx]
+    matched_diet_idx = matched_idx[-1] if matched_idx else -1
 
     if verbose:
         print_list_header(len(matched_diets), "diet")
@@ -37,29 +48,58 @@ def get_diet(name=None, verbose=1):
         vprint("  " + "\n  ".join(matched_diets), verbose)
         return matched_diets, -1
 
+def resolve_diet(name, context):
+    """Index of the diet called name, -1 when ambiguous and None when not found.
+
+    Exact names use the name index, other names the pattern search of get_diet.
+    """
+    idx = context.index("diet").exact(name)
+    if idx is not None:
+        return idx
+    return get_diet(name=name, verbose=0, context=context)[1]
+
+
+def write_diets(name, output_format, context=None):
+    """Write every diet matching name in a machine-readable format."""
+    context = context or current_context()
+    diet = context.find("diet", name) if name else None
+    if diet is not None:
+        matched = [diet]
+    else:
+        matched = (context.diets[i] for i in context.index("diet").search(name or ""))
+    with RecordWriter(output_format, DIET_COLUMNS, diet_rows, to_json=lambda diet: diet.to_dict()) as writer:
+        return writer.write_all(matched)
+
+def diet_rows(diet):
+    """CSV rows of a diet, one per meal."""
+    if not diet.meals:
+        return [{"diet": diet.name, "description": diet.description}]
+    return [{"diet": diet.name, "description": diet.description, "meal": meal.name,
+             "day": meal.day, "type": meal.type} for meal in diet.meals]
+
 
 def print_diet(diet):
     """Print the details of a diet."""
-    print_item_detail("Diet", diet['name'], "")
+    print_item_detail("Diet", diet.name, "")
 
-    if 'description' in diet:
-        print_item_detail("Description", diet['description'], "")
+    if diet.description is not None:
+        print_item_detail("Description", diet.description, "")
 
-    print_item_detail(f"Meals ({len(diet['meals'])})", "", "")
+    print_item_detail(f"Meals ({len(diet.meals)})", "", "")
 
-    if not diet['meals']:
+    if not diet.meals:
         print("  No meals in this diet")
         return
 
     indent = "  "
-    for meal in diet['meals']:
-        meal_info = meal['name']
+    for meal in diet.meals:
+        meal_info = meal.name
 
         details = []
-        if 'day' in meal:
-            details.append(f"Day: {meal['day']}")
-        if 'type' in meal:
-            details.append(f"Type: {meal['type']}")
+        if meal.day is not None:
+            details.append(f"Day: {meal.day}")
+        if meal.type is not None:
+            details.append(f"Type: {meal.type}")
 
         if details:
             meal_info += f" ({', '.join(details)})"
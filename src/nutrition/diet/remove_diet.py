@@ -1,6 +1,5 @@
 from ..console import print_success, print_error
-from ..utils import save_data
-from ..loader import load
+from ..loader import get_storage
 
 
 def configure_remove_parser(parser):
@@ -19,26 +18,21 @@ def handle_remove(args):
 
 def remove_diet(diet_name):
     """Remove diet from the specified YAML file."""
-    diets, file = load("diet")
+    storage = get_storage("diet")
+    file = storage.file
 
     # Remove all diets
     if diet_name == "--all--":
-        diets.clear()
-        save_data(diets, file)
+        storage.clear()
         print_success(f"Successfully removed all diets from {file}")
         return None
 
     # Find and remove the diet
-    for i, diet in enumerate(diets):
-        if diet["name"] == diet_name:
-            removed_diet = diets.pop(i)
-
-            # Save the updated data
-            save_data(diets, file)
-
-            print_success(f"Successfully removed diet '{diet_name}' from {file}")
-            print_success(f"Removed diet had {len(removed_diet['meals'])} meals")
-            return removed_diet
+    removed_diet = storage.remove(diet_name)
+    if removed_diet is None:
+        print_error(f"Diet '{diet_name}' not found in {file}")
+        return None
 
-    print_error(f"Diet '{diet_name}' not found in {file}")
-    return None
+    print_success(f"Successfully removed diet '{diet_name}' from {file}")
+    print_success(f"Removed diet had {len(removed_diet['meals'])} meals")
+    return removed_diet
@@ -1,6 +1,6 @@
 from ..console import print_section_title, print_success, print_error
-from ..utils import save_data
-from ..loader import load
+from ..loader import DataContext, get_storage
+from ..models import Diet, DietMeal
 from .get_diet import get_diet
 
 
@@ -15,26 +15,26 @@ def handle_update(args):
 
 def get_user_input(existing_diet):
     """Collect user input for updating diet with existing values as defaults."""
-    title = f"Update diet: {existing_diet['name']}"
+    title = f"Update diet: {existing_diet.name}"
     print_section_title(title)
     print("Press Enter to keep existing values, or type new values to update.")
 
     # Basic information
-    name = input(f"Diet name [{existing_diet['name']}]: ").strip() or existing_diet['name']
+    name = input(f"Diet name [{existing_diet.name}]: ").strip() or existing_diet.name
 
-    current_description = existing_diet.get('description', '')
+    current_description = existing_diet.description or ''
     description = input(f"Description [{current_description}]: ").strip()
     if not description:
         description = current_description
 
-    print(f"\nCurrent meals in diet ({len(existing_diet['meals'])}):")
-    for i, meal in enumerate(existing_diet['meals'], 1):
-        meal_info = meal['name']
+    print(f"\nCurrent meals in diet ({len(existing_diet.meals)}):")
+    for i, meal in enumerate(existing_diet.meals, 1):
+        meal_info = meal.name
         details = []
-        if 'day' in meal:
-            details.append(f"Day: {meal['day']}")
-        if 'type' in meal:
-            details.append(f"Type: {meal['type']}")
+        if meal.day is not None:
+            details.append(f"Day: {meal.day}")
+        if meal.type is not None:
+            details.append(f"Type: {meal.type}")
         if details:
             meal_info += f" ({', '.join(details)})"
         print(f"  {i}. {meal_info}")
@@ -47,28 +47,20 @@ def get_user_input(existing_diet):
     choice = input("Choice [1]: ").strip() or "1"
 
     if choice == "1":
-        meals = existing_diet['meals'].copy()
+        meals = list(existing_diet.meals)
         print("\nAdd new meals (press Enter without typing anything to finish):")
         meals.extend(get_new_meals(len(meals)))
     elif choice == "2":
         print("\nAdd new meals (press Enter without typing anything to finish):")
         meals = get_new_meals()
     elif choice == "3":
-        meals = edit_existing_meals(existing_diet['meals'])
+        meals = edit_existing_meals(existing_diet.meals)
     else:
         print("Invalid choice, keeping existing meals")
-        meals = existing_diet['meals']
+        meals = existing_diet.meals
 
-    # Create the updated diet data structure
-    updated_diet = {
-        'name': name,
-        'meals': meals
-    }
-
-    if description:
-        updated_diet['description'] = description
-
-    return updated_diet
+    # Create the updated diet, keeping fields the prompts do not cover
+    return Diet(name, description or None, meals, existing_diet.extra)
 
 def get_new_meals(start_count=0):
     """Get new meals from user input."""
@@ -86,13 +78,7 @@ def get_new_meals(start_count=0):
         day = input("  Day (optional): ").strip()
         meal_type = input("  Meal type (optional): ").strip()
 
-        meal_entry = {'name': meal_name}
-        if day:
-            meal_entry['day'] = day
-        if meal_type:
-            meal_entry['type'] = meal_type
-
-        meals.append(meal_entry)
+        meals.append(DietMeal(meal_name, day or None, meal_type or None))
         print(f"  ✔️ Added meal '{meal_name}'")
 
     return meals
@@ -102,12 +88,12 @@ def edit_existing_meals(existing_meals):
     meals = []
 
     for i, meal in enumerate(existing_meals, 1):
-        meal_info = meal['name']
+        meal_info = meal.name
         details = []
-        if 'day' in meal:
-            details.append(f"Day: {meal['day']}")
-        if 'type' in meal:
-            details.append(f"Type: {meal['type']}")
+        if meal.day is not None:
+            details.append(f"Day: {meal.day}")
+        if meal.type is not None:
+            details.append(f"Type: {meal.type}")
         if details:
             meal_info += f" ({', '.join(details)})"
 
@@ -119,28 +105,22 @@ def edit_existing_meals(existing_meals):
         if action == "k":
             meals.append(meal)
         elif action == "e":
-            name = input(f"  Meal name [{meal['name']}]: ").strip() or meal['name']
+            name = input(f"  Meal name [{meal.name}]: ").strip() or meal.name
 
-            current_day = meal.get('day', '')
+            current_day = meal.day or ''
             day = input(f"  Day [{current_day}]: ").strip()
             if not day:
                 day = current_day
 
-            current_type = meal.get('type', '')
+            current_type = meal.type or ''
             meal_type = input(f"  Meal type [{current_type}]: ").strip()
             if not meal_type:
                 meal_type = current_type
 
-            meal_entry = {'name': name}
-            if day:
-                meal_entry['day'] = day
-            if meal_type:
-                meal_entry['type'] = meal_type
-
-            meals.append(meal_entry)
+            meals.append(DietMeal(name, day or None, meal_type or None, meal.extra))
             print(f"  ✔️ Updated meal '{name}'")
         elif action == "d":
-            print(f"  ✗ Deleted meal '{meal['name']}'")
+            print(f"  ✗ Deleted meal '{meal.name}'")
         elif action == "s":
             # Add remaining meals without changes
             meals.extend(existing_meals[i-1:])
@@ -150,18 +130,26 @@ def edit_existing_meals(existing_meals):
 
 def update_diet(diet_name):
     """Update diet in the specified YAML file."""
-    diets, file = load("diet")
-    diet, idx = get_diet(diet_name, verbose=0)
-    if idx is None:
-        print_error(f"Diet '{diet_name}' not found in {file}")
-        return None
-    elif idx == -1:
-        print_error(f"Multiple diets matched with '{diet_name}' in {file}")
-        return None
+    context = DataContext()
+    storage = get_storage("diet")
+    file = storage.file
+    # Exact names are read on their own, other names are matched against all diets
+    diet = context.find("diet", diet_name)
+    if diet is None:
+        diet, idx = get_diet(diet_name, verbose=0, context=context)
+        if idx is None:
+            print_error(f"Diet '{diet_name}' not found in {file}")
+            return None
+        elif idx == -1:
+            print_error(f"Multiple diets matched with '{diet_name}' in {file}")
+            return None
 
     updated_diet = get_user_input(diet)
-    diets[idx] = updated_diet
-    save_data(diets, file)
+
+    # Applied by name to the stored data, so concurrent changes made while prompting are kept
+    if not storage.update(diet.name, updated_diet.to_dict()):
+        print_error(f"Diet '{diet.name}' was removed from {file} while updating")
+        return None
     print_success(f"Successfully updated diet '{diet_name}' in {file}")
-    print_success(f"Diet now contains {len(updated_diet['meals'])} meals")
+    print_success(f"Diet now contains {len(updated_diet.meals)} meals")
     return updated_diet
@@ -0,0 +1,125 @@
+"""Export items, meals with their totals and diets with per-meal and overall totals.
+
+One pass over the parsed datasets: every meal is calculated once, through the shared item
+lookup, and diets add up the totals of their meals instead of calculating them again.
+"""
+import os
+import sys
+from contextlib import nullcontext
+
+from .console import print_success, print_error
+from .item.get_item import ITEM_COLUMNS, item_rows
+from .loader import current_context
+from .matrix import NUTRIENT_COLUMNS, empty_vector, add_vectors, totals_from_vector
+from .meal.calculate import cached_meal_vector, require_meal_items
+from .meal.get_meal import resolve_meal
+from .output import RecordWriter, nutrient_row, round_floats
+
+# Export format: output format of the record writer
+EXPORT_FORMATS = {"jsonl": "ndjson", "csv": "csv"}
+DATASETS = ["item", "meal", "diet"]
+# CSV columns of meals, one row per meal
+MEAL_EXPORT_COLUMNS = ["name", "items", *NUTRIENT_COLUMNS, "skipped"]
+# CSV columns of diets, one row per diet meal and a 'total' row per diet
+DIET_EXPORT_COLUMNS = ["diet", "meal", "day", "type", "status", *NUTRIENT_COLUMNS]
+
+
+def configure_export_parser(parser):
+    """Configure arguments for export command"""
+    parser.add_argument("--format", "-f", choices=list(EXPORT_FORMATS), default="jsonl", help="Output format")
+    parser.add_argument("--folder", "-o", help="Folder to write items, meals and diets files to "
+                                               "(defaults to stdout, JSON lines tagged with their 'dataset')")
+    parser.add_argument("--dataset", "-d", choices=DATASETS, action="append",
+                        help="Dataset to export, may be repeated (defaults to all)")
+    parser.set_defaults(func=handle_export)
+
+
+def handle_export(args):
+    """Handle export command"""
+    export(args.format, args.folder, args.dataset or DATASETS)
+
+
+def export(output_format="jsonl", folder=None, datasets=DATASETS):
+    """Export the datasets of the current configuration; returns the number of records per dataset."""
+    if folder is None and output_format == "csv" and len(datasets) > 1:
+        print_error("CSV exports of several datasets need a --folder, or pick one with --dataset")
+        return None
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+
+    context = current_context()
+    exporters = {
+        "item": (ITEM_COLUMNS, item_rows, lambda item: item.to_dict(), lambda: iter(context.items)),
+        "meal": (MEAL_EXPORT_COLUMNS, meal_export_rows, None, lambda: meal_records(context)),
+        "diet": (DIET_EXPORT_COLUMNS, diet_export_rows, None, lambda: diet_records(context)),
+    }
+
+    counts = {}
+    for dataset in DATASETS:
+        if dataset not in datasets:
+            continue
+        columns, rows, to_json, records = exporters[dataset]
+        if folder is None:
+            to_json = tag_dataset(dataset, to_json)
+        target = os.path.join(folder, f"{dataset}s.{output_format}") if folder else None
+        with open(target, "w", encoding="utf-8", newline="") if target else nullcontext(sys.stdout) as stream:
+            with RecordWriter(EXPORT_FORMATS[output_format], columns, rows, to_json, stream) as writer:
+                counts[dataset] = writer.write_all(records())
+        if target:
+            print_success(f"Exported {counts[dataset]} {dataset}s to {target}")
+    context.meal_totals().save()
+    return counts
+
+
+def tag_dataset(dataset, to_json):
+    """Add the dataset name to the JSON records of a combined export."""
+    def tagged(record):
+        return {"dataset": dataset, **(to_json(record) if to_json else record)}
+    return tagged
+
+
+def meal_records(context):
+    """Yield every meal with its items, totals and number of skipped items."""
+    meals = context.meals
+    require_meal_items(meals, context)
+    for idx, meal in enumerate(meals):
+        vector, skipped = cached_meal_vector(context, idx)
+        yield {**meal.to_dict(), "totals": round_floats(totals_from_vector(vector)), "skipped": skipped}
+
+
+def diet_records(context):
+    """Yield every diet with the totals of each of its meals and overall."""
+    require_meal_items(context.meals, context)
+    resolved = {}
+    for diet in context.diets:
+        total = empty_vector()
+        meals = []
+        for diet_meal in diet.meals:
+            entry = diet_meal.to_dict()
+            idx = resolve_meal(diet_meal.name, context, resolved)
+            if idx is None:
+                entry.update(status="not_found", totals=None)
+            elif idx == -1:
+                entry.update(status="ambiguous", totals=None)
+            else:
+                vector = cached_meal_vector(context, idx)[0]
+                add_vectors(total, vector)
+                entry.update(status="ok", totals=round_floats(totals_from_vector(vector)))
+            meals.append(entry)
+        skipped = sum(1 for entry in meals if entry["status"] != "ok")
+        yield {"name": diet.name, "description": diet.description, "meals": meals,
+               "totals": round_floats(totals_from_vector(total)), "skipped": skipped}
+
+
+def meal_export_rows(record):
+    """CSV row of an exported meal."""
+    return [{"name": record["name"], "items": len(record["items"]), **nutrient_row(record["totals"]),
+             "skipped": record["skipped"]}]
+
+
+def diet_export_rows(record):
+    """CSV rows of an exported diet, one per meal followed by the diet total."""
+    rows = [{"diet": record["name"], "meal": meal["name"], "day": meal.get("day"), "type": meal.get("type"),
+             "status": meal["status"], **nutrient_row(meal["totals"])} for meal in record["meals"]]
+    rows.append({"diet": record["name"], "status": "total", **nutrient_row(record["totals"])})
+    return rows
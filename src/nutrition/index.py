@@ -0,0 +1,71 @@
+"""Name indexes for fast lookups of items, meals and diets."""
+import bisect
+import re
+from functools import lru_cache
+
+REGEX_METACHARACTERS = re.compile(r"[.^$*+?{}\[\]\\|()]")
+
+
+@lru_cache(maxsize=128)
+def compile_pattern(pattern):
+    """Compile a case-insensitive name pattern once."""
+    return re.compile(pattern, re.IGNORECASE)
+
+
+class NameIndex:
+    """Exact, case-folded and prefix lookups over the names of a list of records."""
+
+    def __init__(self, names):
+        self.names = list(names)
+        self.folded_names = [name.casefold() for name in self.names]
+        # Lowercase ASCII names, None for the others (see search)
+        self._ascii_names = [name.lower() if name.isascii() else None for name in self.names]
+        self._exact = {}
+        self._folded = {}
+        for i, (name, folded) in enumerate(zip(self.names, self.folded_names)):
+            self._exact.setdefault(name, i)
+            self._folded.setdefault(folded, []).append(i)
+        self._sorted = sorted(zip(self.folded_names, range(len(self.names))))
+
+    def __len__(self):
+        return len(self.names)
+
+    def exact(self, name):
+        """Index of the first record named exactly `name`, or None."""
+        return self._exact.get(name)
+
+    def folded(self, name):
+        """Indices of records whose name equals `name` ignoring case."""
+        return list(self._folded.get(name.casefold(), ()))
+
+    def prefix(self, prefix):
+        """Indices of records whose name starts with `prefix` ignoring case, in name order."""
+        prefix = prefix.casefold()
+        start = bisect.bisect_left(self._sorted, (prefix, -1))
+        matches = []
+        for folded, i in self._sorted[start:]:
+            if not folded.startswith(prefix):
+                break
+            matches.append(i)
+        return matches
+
+    def several(self, pattern):
+        """Whether pattern matches several records; an exact name is one record even when it
+        is also part of other names."""
+        return self.exact(pattern) is None and len(self.search(pattern)) > 1
+
+    def search(self, pattern):
+        """Indices of records matching `pattern` the way re.search(pattern, name, re.IGNORECASE) does.
+
+        Plain ASCII text skips the regex engine for ASCII names with a lowercase substring test.
+        Other names keep the regex, whose case rules differ from str.lower() and str.casefold()
+        beyond ASCII: 'ss' does not match 'ß' and 'i' matches 'İ'.
+        """
+        if not pattern:
+            return list(range(len(self.names)))
+        regex = compile_pattern(pattern)
+        if pattern.isascii() and not REGEX_METACHARACTERS.search(pattern):
+            lowered = pattern.lower()
+            return [i for i, (name, ascii_name) in enumerate(zip(self.names, self._ascii_names))
+                    if (lowered in ascii_name if ascii_name is not None else regex.search(name))]
+        return [i for i, name in enumerate(self.names) if regex.search(name)]
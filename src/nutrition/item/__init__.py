@@ -1,5 +1,4 @@
-from .add_item import add_item, configure_add_parser
-from .get_item import get_item, configure_get_parser
-from .remove_item import remove_item, configure_remove_parser
-from .update_item import update_item, configure_update_parser
-from ..loader import load
+"""Item commands, one module each.
+
+Nothing is imported here, so running one command (see COMMANDS in cli.py) imports only its module.
+"""
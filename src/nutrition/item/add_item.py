@@ -1,7 +1,6 @@
 """  Script to add a new nutrition item to a YAML file """
 from ..console import print_section_title, print_subsection_title, print_success
-from ..utils import save_data
-from ..loader import load
+from ..loader import get_storage
 
 def configure_add_parser(parser):
     """Configure arguments for item add command"""
@@ -20,6 +19,10 @@ def get_user_input():
     name = input("Item name: ").strip()
     item_type = input("Item type (e.g., Bread, Fruit, Vegetable): ").strip()
     per = input("Values are per (e.g., 100g, 1 piece) [100g]: ").strip() or "100g"
+    piece_weight = input("Weight of one piece in g (optional): ").strip()
+    piece_weight = float(piece_weight) if piece_weight else None
+    density = input("Density in g/ml, for volumes (optional): ").strip()
+    density = float(density) if density else None
 
     nutrition_title = f"Nutrition information (per {per})"
     print_subsection_title(nutrition_title)
@@ -60,30 +63,34 @@ def get_user_input():
         'name': name,
         'type': item_type,
         'per': per,
-        'nutrition': {
-            'energy': {
-                'value': energy_value,
-                'unit': energy_unit
-            },
-            'carbohydrates': {
-                'value': carbs_value,
-                'unit': carbs_unit,
-                'sugar': sugar_value
-            },
-            'fat': {
-                'value': fat_value,
-                'unit': fat_unit,
-                'saturated': fat_saturated,
-                'unsaturated': fat_unsaturated
-            },
-            'protein': {
-                'value': protein_value,
-                'unit': protein_unit
-            },
-            'salt': {
-                'value': salt_value,
-                'unit': salt_unit
-            }
+    }
+    if piece_weight is not None:
+        new_item['piece_weight'] = piece_weight
+    if density is not None:
+        new_item['density'] = density
+    new_item['nutrition'] = {
+        'energy': {
+            'value': energy_value,
+            'unit': energy_unit
+        },
+        'carbohydrates': {
+            'value': carbs_value,
+            'unit': carbs_unit,
+            'sugar': sugar_value
+        },
+        'fat': {
+            'value': fat_value,
+            'unit': fat_unit,
+            'saturated': fat_saturated,
+            'unsaturated': fat_unsaturated
+        },
+        'protein': {
+            'value': protein_value,
+            'unit': protein_unit
+        },
+        'salt': {
+            'value': salt_value,
+            'unit': salt_unit
         }
     }
 
@@ -91,9 +98,8 @@ def get_user_input():
 
 def add_item():
     """Main function to add a new nutrition item."""
-    existing_data, file = load("item")
+    storage = get_storage("item")
     new_item = get_user_input()
-    existing_data.append(new_item)
-    save_data(existing_data, file)
+    storage.add(new_item)
 
-    print_success(f"Successfully added '{new_item['name']}' to {file}")
+    print_success(f"Successfully added '{new_item['name']}' to {storage.file}")
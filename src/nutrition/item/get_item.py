@@ -1,28 +1,43 @@
-import re
-
 from ..console import print_list_header, format_with_unit, print_item_detail, print_sub_item_detail
-from ..loader import load
+from ..loader import current_context
+from ..output import RecordWriter, add_format_argument
 from ..utils import vprint
 
+# CSV columns of items
+ITEM_COLUMNS = [
+    "name", "type", "per", "piece_weight", "density",
+    "energy", "energy_unit", "carbohydrates", "sugar", "carbohydrates_unit",
+    "fat", "saturated", "unsaturated", "fat_unit", "protein", "protein_unit", "salt", "salt_unit",
+]
+
 
 def configure_get_parser(parser):
     """Configure arguments for item get command"""
     parser.add_argument("name", nargs="?", default="", help="Name of the food item to retrieve (accepts regex)")
+    add_format_argument(parser)
     parser.set_defaults(func=handle_get)
 
 def handle_get(args):
     """Handle item get command"""
-    get_item(args.name)
+    if args.format != "text":
+        write_items(args.name, args.format)
+        return
+    context = current_context()
+    # Exact names are read on their own, other names are matched against all items
+    item = context.find("item", args.name) if args.name else None
+    if item is None:
+        get_item(args.name, context=context)
+    else:
+        print_list_header(1, "item")
+        print_item(item, indent=3)
 
-def get_item(name=None, verbose=1):
+def get_item(name=None, verbose=1, context=None):
     """Retrieve item data from the specified YAML file."""
-    items, _ = load("item")
-    matched_items = []
-    matched_item_idx = -1
-    for i, item in enumerate(items):
-        if re.search(name, item["name"], re.IGNORECASE):
-            matched_item_idx = i
-            matched_items.append(item["name"])
+    context = context or current_context()
+    items, _ = context.get("item")
+    matched_idx = context.index("item").search(name or "")
+    matched_items = [items[i].name for i in matched_idx]
+    matched_item_idx = matched_idx[-1] if matched_idx else -1
 
     if verbose:
         print_list_header(len(matched_items), "item")
@@ -38,32 +53,52 @@ def get_item(name=None, verbose=1):
         return matched_items, -1
 
 
+def write_items(name, output_format, context=None):
+    """Write every item matching name in a machine-readable format."""
+    context = context or current_context()
+    item = context.find("item", name) if name else None
+    if item is not None:
+        matched = [item]
+    else:
+        matched = (context.items[i] for i in context.index("item").search(name or ""))
+    with RecordWriter(output_format, ITEM_COLUMNS, item_rows, to_json=lambda item: item.to_dict()) as writer:
+        return writer.write_all(matched)
+
+def item_rows(item):
+    """CSV row of an item."""
+    return [{column: getattr(item, column) for column in ITEM_COLUMNS}]
+
+
 def print_item(item, indent=2):
     """Print the details of a nutrition item."""
 
-    print_item_detail("Name", item['name'], "")
-    print_item_detail("Type", item['type'], "")
-    print_item_detail(f"[Nutrition per {item['per']}]", "", "")
+    print_item_detail("Name", item.name, "")
+    print_item_detail("Type", item.type, "")
+    if item.piece_weight is not None:
+        print_item_detail("Piece weight", format_with_unit(item.piece_weight, "g"), "")
+    if item.density is not None:
+        print_item_detail("Density", format_with_unit(item.density, "g/ml"), "")
+    print_item_detail(f"[Nutrition per {item.per}]", "", "")
 
     base_indent = " " * indent
     sub_indent = " " * (indent * 2)
 
-    energy_formatted = format_with_unit(item['nutrition']['energy']['value'], item['nutrition']['energy']['unit'])
+    energy_formatted = format_with_unit(item.energy, item.energy_unit)
     print_item_detail("Energy", energy_formatted, base_indent)
 
-    carbs_formatted = format_with_unit(item['nutrition']['carbohydrates']['value'], item['nutrition']['carbohydrates']['unit'])
-    sugar_formatted = format_with_unit(item['nutrition']['carbohydrates']['sugar'], item['nutrition']['carbohydrates']['unit'])
+    carbs_formatted = format_with_unit(item.carbohydrates, item.carbohydrates_unit)
+    sugar_formatted = format_with_unit(item.sugar, item.carbohydrates_unit)
     print_item_detail("Carbohydrates", carbs_formatted, base_indent)
     print_sub_item_detail("Sugar", sugar_formatted, sub_indent)
 
-    fat_formatted = format_with_unit(item['nutrition']['fat']['value'], item['nutrition']['fat']['unit'])
-    fat_sat_formatted = format_with_unit(item['nutrition']['fat']['saturated'], item['nutrition']['fat']['unit'])
-    fat_unsat_formatted = format_with_unit(item['nutrition']['fat']['unsaturated'], item['nutrition']['fat']['unit'])
+    fat_formatted = format_with_unit(item.fat, item.fat_unit)
+    fat_sat_formatted = format_with_unit(item.saturated, item.fat_unit)
+    fat_unsat_formatted = format_with_unit(item.unsaturated, item.fat_unit)
     print_item_detail("Fat", fat_formatted, base_indent)
     print_sub_item_detail("Saturated", fat_sat_formatted, sub_indent)
     print_sub_item_detail("Unsaturated", fat_unsat_formatted, sub_indent)
 
-    protein_formatted = format_with_unit(item['nutrition']['protein']['value'], item['nutrition']['protein']['unit'])
-    salt_formatted = format_with_unit(item['nutrition']['salt']['value'], item['nutrition']['salt']['unit'])
+    protein_formatted = format_with_unit(item.protein, item.protein_unit)
+    salt_formatted = format_with_unit(item.salt, item.salt_unit)
     print_item_detail("Protein", protein_formatted, base_indent)
     print_item_detail("Salt", salt_formatted, base_indent)
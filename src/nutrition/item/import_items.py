@@ -0,0 +1,179 @@
+"""  Import food items in bulk from CSV, JSON or YAML files """
+import csv
+import json
+import os
+
+from yaml import YAMLError
+
+from ..console import print_success, print_warning, print_error
+from ..loader import get_storage, get_data_config
+from ..models import Item
+from ..totals_cache import invalidate_meal_totals
+from ..units import parse_per
+from ..utils import iter_records
+from .get_item import ITEM_COLUMNS
+
+IMPORT_FORMATS = ("csv", "jsonl", "json", "yaml")
+# Nutrient and conversion fields that must be non-negative numbers when given
+NUMBER_FIELDS = ("piece_weight", "density", "energy", "carbohydrates", "sugar", "fat",
+                 "saturated", "unsaturated", "protein", "salt")
+# Nutrient values every record needs, as prompted by item add
+REQUIRED_FIELDS = ("energy", "carbohydrates", "fat", "protein", "salt")
+# Units used when a record leaves them out, as prompted by item add
+UNIT_DEFAULTS = {"energy_unit": "kcal", "carbohydrates_unit": "g", "fat_unit": "g",
+                 "protein_unit": "g", "salt_unit": "g"}
+# Invalid records listed in full, the rest are only counted
+MAX_REPORTED_ERRORS = 20
+
+
+def configure_import_parser(parser):
+    """Configure arguments for item import command"""
+    parser.add_argument("file", help="CSV (columns as in 'item get --format csv'), JSON lines, JSON or YAML file")
+    parser.add_argument("--format", "-f", choices=IMPORT_FORMATS,
+                        help="Format of the file (defaults to its extension)")
+    parser.add_argument("--skip-existing", action="store_true",
+                        help="Keep items that already exist instead of replacing them")
+    parser.add_argument("--dry-run", action="store_true", help="Validate the file without importing")
+    parser.set_defaults(func=handle_import)
+
+def handle_import(args):
+    """Handle item import command"""
+    import_items(args.file, args.format, args.skip_existing, args.dry_run)
+
+def detect_format(filename):
+    """Import format of a file from its extension."""
+    extension = os.path.splitext(filename)[1].lower()
+    if extension in (".csv", ".tsv"):
+        return "csv"
+    if extension in (".jsonl", ".ndjson"):
+        return "jsonl"
+    if extension == ".json":
+        return "json"
+    return "yaml"
+
+def read_records(filename, file_format):
+    """Yield the records of an import file one at a time; CSV rows as flat dicts."""
+    if file_format == "csv":
+        with open(filename, "r", encoding="utf-8-sig", newline="") as file:
+            dialect = "excel-tab" if filename.lower().endswith(".tsv") else "excel"
+            yield from csv.DictReader(file, dialect=dialect)
+    elif file_format == "jsonl":
+        with open(filename, "r", encoding="utf-8") as file:
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+    elif file_format == "json":
+        with open(filename, "r", encoding="utf-8") as file:
+            data = json.load(file)
+        yield from data if isinstance(data, list) else [data]
+    else:
+        yield from iter_records(filename)
+
+def to_number(value, field):
+    """Convert a field value to a non-negative number, None when empty.
+
+    Whole numbers written without a decimal part stay integers, as in hand-written item files.
+    """
+    if value is None or value == "":
+        return None
+    if isinstance(value, bool):
+        raise ValueError(f"'{field}' is not a number: {value!r}")
+    if isinstance(value, str):
+        text = value.strip().replace(",", ".")
+        try:
+            value = int(text) if text.lstrip("+-").isdigit() else float(text)
+        except ValueError:
+            raise ValueError(f"'{field}' is not a number: {value!r}") from None
+    if not isinstance(value, (int, float)) or value != value:
+        raise ValueError(f"'{field}' is not a number: {value!r}")
+    if value < 0:
+        raise ValueError(f"'{field}' is negative: {value}")
+    return value
+
+def item_from_record(record):
+    """Validate an imported record and return it as an Item; raises ValueError when invalid.
+
+    Records use either the nested layout of the item files or the flat columns of
+    'item get --format csv'.
+    """
+    if not isinstance(record, dict):
+        raise ValueError("not a mapping of item fields")
+    if None in record:
+        # Where csv.DictReader puts the cells of rows longer than the header
+        raise ValueError(f"more cells than columns: {record[None]!r}")
+    if "nutrition" in record:
+        if not isinstance(record["nutrition"], dict):
+            raise ValueError("'nutrition' is not a mapping")
+        if not all(isinstance(section, dict) for section in record["nutrition"].values() if section is not None):
+            raise ValueError("every 'nutrition' section must be a mapping")
+        item = Item.from_dict({"name": None, **record})
+    else:
+        fields = {column: record.get(column) for column in ITEM_COLUMNS}
+        fields = {key: (None if value == "" else value) for key, value in fields.items()}
+        extra = {key: value for key, value in record.items() if key not in ITEM_COLUMNS and value not in ("", None)}
+        item = Item(**fields, extra=extra or None)
+
+    item.name = item.name.strip() if isinstance(item.name, str) else item.name
+    if not item.name or not isinstance(item.name, str):
+        raise ValueError("missing 'name'")
+    for field in NUMBER_FIELDS:
+        setattr(item, field, to_number(getattr(item, field), field))
+    missing = [field for field in REQUIRED_FIELDS if getattr(item, field) is None]
+    if missing:
+        raise ValueError(f"missing {', '.join(repr(field) for field in missing)}")
+    for field, unit in UNIT_DEFAULTS.items():
+        if getattr(item, field) is None:
+            setattr(item, field, unit)
+
+    item.per = str(item.per).strip() if item.per not in (None, "") else "100g"
+    item.per_amount, item.per_unit = parse_per(item.per)
+    if not item.per_amount:
+        raise ValueError(f"'per' must be a positive amount: {item.per!r}")
+    return item
+
+def import_items(filename, file_format=None, skip_existing=False, dry_run=False):
+    """Import the items of a file into the configured storage with a single write.
+
+    Invalid records are reported and skipped; items are upserted by name, the last record
+    of a name in the file wins. Returns the number of (added, updated) items.
+    """
+    if not os.path.exists(filename):
+        print_error(f"File '{filename}' not found")
+        return None
+    file_format = file_format or detect_format(filename)
+
+    items = {}
+    errors = 0
+    try:
+        for number, record in enumerate(read_records(filename, file_format), 1):
+            try:
+                item = item_from_record(record)
+            except (ValueError, TypeError) as e:
+                errors += 1
+                if errors <= MAX_REPORTED_ERRORS:
+                    print_warning(f"Record {number}: {e}")
+                continue
+            # Re-insert so a repeated name keeps the position of its last record
+            items.pop(item.name, None)
+            items[item.name] = item
+    except (ValueError, csv.Error, YAMLError) as e:
+        print_error(f"Could not read '{filename}' as {file_format}: {e}")
+        return None
+    if errors > MAX_REPORTED_ERRORS:
+        print_warning(f"... and {errors - MAX_REPORTED_ERRORS} more invalid records")
+
+    storage = get_storage("item")
+    if skip_existing and items:
+        existing = {record["name"] for record in storage.load()}
+        items = {name: item for name, item in items.items() if name not in existing}
+
+    if dry_run:
+        print_success(f"{len(items)} valid items in {filename}, {errors} invalid records (dry run, nothing imported)")
+        return 0, 0
+
+    added, updated = storage.upsert([item.to_dict() for item in items.values()]) if items else (0, 0)
+    if updated:
+        invalidate_meal_totals(get_data_config()["meal"], set(items))
+    print_success(f"Imported {added + updated} items from {filename} into {storage.file} "
+                  f"({added} added, {updated} updated, {errors} invalid records skipped)")
+    return added, updated
@@ -0,0 +1,79 @@
+from ..console import print_list_header, print_table, print_info, print_error, format_number
+from ..loader import current_context
+from ..matrix import NUTRIENT_COLUMNS, NUTRIENT_LABELS
+from ..output import RecordWriter, add_format_argument
+from ..query import NutrientColumns, parse_query, column_index
+
+# CSV columns of query results, nutrients per 100 g or per the item's 'per' when raw
+QUERY_COLUMNS = ["name", "type", "per", *NUTRIENT_COLUMNS]
+
+
+def configure_query_parser(parser):
+    """Configure arguments for item query command"""
+    parser.add_argument("query", nargs="?", default="",
+                        help="Nutrient conditions such as 'protein>=20 and salt<0.5', "
+                             "combined with and/or and parentheses (defaults to every item)")
+    parser.add_argument("--sort", "-s", help="Nutrient to order the matches by")
+    parser.add_argument("--desc", action="store_true", help="Sort from the highest value")
+    parser.add_argument("--limit", "-l", type=int, default=0, help="Number of matches to show (0 for all)")
+    parser.add_argument("--type", "-t", help="Only items of this type")
+    parser.add_argument("--raw", action="store_true",
+                        help="Compare values per each item's own 'per' instead of per 100 g")
+    add_format_argument(parser)
+    parser.set_defaults(func=handle_query)
+
+def handle_query(args):
+    """Handle item query command"""
+    query_items(args.query, args.sort, args.desc, args.limit, args.type, args.raw, args.format)
+
+def query_scales(context, raw=False):
+    """Multiplier of every item's values to the query basis, None when an item has no weight to convert."""
+    if raw:
+        return [1.0] * len(context.items)
+    return [100 * factors["g"] if "g" in factors else None for factors in context.item_factors()]
+
+def query_items(query="", sort=None, descending=False, limit=0, item_type=None, raw=False,
+                output_format="text", context=None):
+    """Find items whose nutrients meet the query; returns the matched item indexes in output order."""
+    try:
+        node = parse_query(query)
+        sort_column = column_index(sort) if sort else None
+    except ValueError as e:
+        print_error(str(e))
+        return None
+
+    context = context or current_context()
+    items = context.items
+    scales = query_scales(context, raw)
+    columns = NutrientColumns(context.matrix(), scales)
+
+    matched = columns.evaluate(node)
+    if item_type:
+        item_type = item_type.casefold()
+        matched = [i for i in matched if (items[i].type or "").casefold() == item_type]
+    if sort_column is not None:
+        matched = columns.sort(matched, sort_column, descending, limit)
+    elif limit:
+        matched = matched[:limit]
+
+    def record(i):
+        values = [None if value != value else round(value, 3) for value in columns.row(i)]
+        return {"name": items[i].name, "type": items[i].type, "per": items[i].per if raw else "100g",
+                **dict(zip(NUTRIENT_COLUMNS, values))}
+
+    if output_format != "text":
+        with RecordWriter(output_format, QUERY_COLUMNS, lambda row: [row]) as writer:
+            writer.write_all(record(i) for i in matched)
+        return matched
+
+    print_list_header(len(matched), "item")
+    if matched:
+        rows = [record(i) for i in matched]
+        print_table(["Name", *NUTRIENT_LABELS],
+                    [[row["name"], *(format_number(row[column]) for column in NUTRIENT_COLUMNS)] for row in rows])
+    unconverted = scales.count(None)
+    if unconverted:
+        print_info(f"{unconverted} items without a weight for their 'per' were left out, use --raw to include them")
+    elif not raw:
+        print_info("Values per 100 g")
+    return matched
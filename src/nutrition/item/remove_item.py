@@ -1,6 +1,6 @@
 from ..console import print_success, print_error
-from ..utils import save_data
-from ..loader import load
+from ..loader import get_storage, get_data_config
+from ..totals_cache import invalidate_meal_totals
 
 def configure_remove_parser(parser):
     """Configure arguments for item remove command"""
@@ -18,21 +18,21 @@ def handle_remove(args):
 
 def remove_item(name):
     """Remove item from the specified YAML file."""
-    items, file = load("item")
+    storage = get_storage("item")
+    file = storage.file
+
     # Remove all items
     if name == "--all--":
-        items.clear()
-        save_data(items, file)
+        storage.clear()
         print_success(f"Successfully removed all items from {file}")
         return None
 
     # Find and remove the item
-    for i, item in enumerate(items):
-        if item["name"] == name:
-            removed_item = items.pop(i)
-            save_data(items, file)
-            print_success(f"Successfully removed '{name}' from {file}")
-            return removed_item
+    removed_item = storage.remove(name)
+    if removed_item is None:
+        print_error(f"Item '{name}' not found in {file}")
+        return None
+    invalidate_meal_totals(get_data_config()["meal"], {name})
 
-    print_error(f"Item '{name}' not found in {file}")
-    return None
+    print_success(f"Successfully removed '{name}' from {file}")
+    return removed_item
@@ -0,0 +1,40 @@
+from ..console import print_list_header, print_table, format_number
+from ..loader import get_storage
+from ..output import RecordWriter, add_format_argument
+from ..search import load_trigram_index
+
+# CSV columns of search results
+SEARCH_COLUMNS = ["name", "type", "score"]
+
+
+def configure_search_parser(parser):
+    """Configure arguments for item search command"""
+    parser.add_argument("query", help="Words to look for in item names, typos allowed")
+    parser.add_argument("--type", "-t", help="Only items of this type")
+    parser.add_argument("--limit", "-l", type=int, default=10, help="Number of matches to show (0 for all)")
+    parser.add_argument("--threshold", type=float, default=0.5,
+                        help="Minimum word similarity (0 to 1) of names that do not contain the query")
+    add_format_argument(parser)
+    parser.set_defaults(func=handle_search)
+
+def handle_search(args):
+    """Handle item search command"""
+    search_items(args.query, args.type, args.limit, args.threshold, args.format)
+
+def search_items(query, item_type=None, limit=10, threshold=0.5, output_format="text"):
+    """Find items by name with ranked fuzzy matching; returns the (name, type, score) matches."""
+    index = load_trigram_index(get_storage("item"))
+    matches = [(index.names[i], index.types[i], score)
+               for i, score in index.search(query, limit, threshold, item_type)]
+
+    if output_format != "text":
+        with RecordWriter(output_format, SEARCH_COLUMNS, lambda record: [record]) as writer:
+            writer.write_all({"name": name, "type": match_type, "score": round(score, 3)}
+                             for name, match_type, score in matches)
+        return matches
+
+    print_list_header(len(matches), "item")
+    if matches:
+        print_table(["Name", "Type", "Score"],
+                    [[name, match_type or "-", format_number(score)] for name, match_type, score in matches])
+    return matches
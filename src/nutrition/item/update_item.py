@@ -1,6 +1,7 @@
 from ..console import print_section_title, print_subsection_title, print_success, print_error
-from ..utils import save_data
-from ..loader import load
+from ..loader import DataContext, get_storage, get_data_config
+from ..models import Item
+from ..totals_cache import invalidate_meal_totals
 from .get_item import get_item
 
 
@@ -15,20 +16,36 @@ def handle_update(args):
 
 def get_user_input(existing_item):
     """Collect user input for updating nutrition item fields with existing values as defaults."""
-    title = f"Update nutrition item: {existing_item['name']}"
+    title = f"Update nutrition item: {existing_item.name}"
     print_section_title(title)
     print("Press Enter to keep existing values, or type new values to update.")
 
     # Basic information
-    name = input(f"Item name [{existing_item['name']}]: ").strip() or existing_item['name']
-    item_type = input(f"Item type [{existing_item['type']}]: ").strip() or existing_item['type']
-    per = input(f"Values are per [{existing_item['per']}]: ").strip() or existing_item['per']
+    name = input(f"Item name [{existing_item.name}]: ").strip() or existing_item.name
+    item_type = input(f"Item type [{existing_item.type}]: ").strip() or existing_item.type
+    per = input(f"Values are per [{existing_item.per}]: ").strip() or existing_item.per
+
+    current_piece_weight = existing_item.piece_weight
+    piece_weight_display = current_piece_weight if current_piece_weight is not None else "None"
+    piece_weight_input = input(f"Weight of one piece in g [{piece_weight_display}]: ").strip()
+    if piece_weight_input:
+        piece_weight = float(piece_weight_input) if piece_weight_input.lower() != 'none' else None
+    else:
+        piece_weight = current_piece_weight
+
+    current_density = existing_item.density
+    density_display = current_density if current_density is not None else "None"
+    density_input = input(f"Density in g/ml [{density_display}]: ").strip()
+    if density_input:
+        density = float(density_input) if density_input.lower() != 'none' else None
+    else:
+        density = current_density
 
     nutrition_title = f"Nutrition information (per {per})"
     print_subsection_title(nutrition_title)
 
     # Energy
-    current_energy = existing_item['nutrition']['energy']['value']
+    current_energy = existing_item.energy
     energy_display = current_energy if current_energy is not None else "None"
     energy_input = input(f"Energy [{energy_display}]: ").strip()
     if energy_input:
@@ -36,11 +53,11 @@ def get_user_input(existing_item):
     else:
         energy_value = current_energy
 
-    current_energy_unit = existing_item['nutrition']['energy']['unit']
+    current_energy_unit = existing_item.energy_unit
     energy_unit = input(f"  Unit [{current_energy_unit}]: ").strip() or current_energy_unit
 
     # Carbohydrates
-    current_carbs = existing_item['nutrition']['carbohydrates']['value']
+    current_carbs = existing_item.carbohydrates
     carbs_display = current_carbs if current_carbs is not None else "None"
     carbs_input = input(f"Carbohydrates [{carbs_display}]: ").strip()
     if carbs_input:
@@ -48,10 +65,10 @@ def get_user_input(existing_item):
     else:
         carbs_value = current_carbs
 
-    current_carbs_unit = existing_item['nutrition']['carbohydrates']['unit']
+    current_carbs_unit = existing_item.carbohydrates_unit
     carbs_unit = input(f"  Unit [{current_carbs_unit}]: ").strip() or current_carbs_unit
 
-    current_sugar = existing_item['nutrition']['carbohydrates']['sugar']
+    current_sugar = existing_item.sugar
     sugar_display = current_sugar if current_sugar is not None else "None"
     sugar_input = input(f"  Sugar [{sugar_display}]: ").strip()
     if sugar_input:
@@ -60,7 +77,7 @@ def get_user_input(existing_item):
         sugar_value = current_sugar
 
     # Fat
-    current_fat = existing_item['nutrition']['fat']['value']
+    current_fat = existing_item.fat
     fat_display = current_fat if current_fat is not None else "None"
     fat_input = input(f"Fat [{fat_display}]: ").strip()
     if fat_input:
@@ -68,10 +85,10 @@ def get_user_input(existing_item):
     else:
         fat_value = current_fat
 
-    current_fat_unit = existing_item['nutrition']['fat']['unit']
+    current_fat_unit = existing_item.fat_unit
     fat_unit = input(f"  Unit [{current_fat_unit}]: ").strip() or current_fat_unit
 
-    current_fat_sat = existing_item['nutrition']['fat']['saturated']
+    current_fat_sat = existing_item.saturated
     fat_sat_display = current_fat_sat if current_fat_sat is not None else "None"
     fat_sat_input = input(f"  Saturated [{fat_sat_display}]: ").strip()
     if fat_sat_input:
@@ -79,7 +96,7 @@ def get_user_input(existing_item):
     else:
         fat_saturated = current_fat_sat
 
-    current_fat_unsat = existing_item['nutrition']['fat']['unsaturated']
+    current_fat_unsat = existing_item.unsaturated
     fat_unsat_display = current_fat_unsat if current_fat_unsat is not None else "None"
     fat_unsat_input = input(f"  Unsaturated [{fat_unsat_display}]: ").strip()
     if fat_unsat_input:
@@ -88,7 +105,7 @@ def get_user_input(existing_item):
         fat_unsaturated = current_fat_unsat
 
     # Protein
-    current_protein = existing_item['nutrition']['protein']['value']
+    current_protein = existing_item.protein
     protein_display = current_protein if current_protein is not None else "None"
     protein_input = input(f"Protein [{protein_display}]: ").strip()
     if protein_input:
@@ -96,11 +113,11 @@ def get_user_input(existing_item):
     else:
         protein_value = current_protein
 
-    current_protein_unit = existing_item['nutrition']['protein']['unit']
+    current_protein_unit = existing_item.protein_unit
     protein_unit = input(f"  Unit [{current_protein_unit}]: ").strip() or current_protein_unit
 
     # Salt
-    current_salt = existing_item['nutrition']['salt']['value']
+    current_salt = existing_item.salt
     salt_display = current_salt if current_salt is not None else "None"
     salt_input = input(f"Salt [{salt_display}]: ").strip()
     if salt_input:
@@ -108,56 +125,57 @@ def get_user_input(existing_item):
     else:
         salt_value = current_salt
 
-    current_salt_unit = existing_item['nutrition']['salt']['unit']
+    current_salt_unit = existing_item.salt_unit
     salt_unit = input(f"  Unit [{current_salt_unit}]: ").strip() or current_salt_unit
 
-    # Create the updated data structure
-    updated_item = {
-        'name': name,
-        'type': item_type,
-        'per': per,
-        'nutrition': {
-            'energy': {
-                'value': energy_value,
-                'unit': energy_unit
-            },
-            'carbohydrates': {
-                'value': carbs_value,
-                'unit': carbs_unit,
-                'sugar': sugar_value
-            },
-            'fat': {
-                'value': fat_value,
-                'unit': fat_unit,
-                'saturated': fat_saturated,
-                'unsaturated': fat_unsaturated
-            },
-            'protein': {
-                'value': protein_value,
-                'unit': protein_unit
-            },
-            'salt': {
-                'value': salt_value,
-                'unit': salt_unit
-            }
-        }
-    }
+    # Create the updated item, keeping fields the prompts do not cover
+    updated_item = Item(
+        name=name,
+        type=item_type,
+        per=per,
+        energy=energy_value,
+        energy_unit=energy_unit,
+        carbohydrates=carbs_value,
+        sugar=sugar_value,
+        carbohydrates_unit=carbs_unit,
+        fat=fat_value,
+        saturated=fat_saturated,
+        unsaturated=fat_unsaturated,
+        fat_unit=fat_unit,
+        protein=protein_value,
+        protein_unit=protein_unit,
+        salt=salt_value,
+        salt_unit=salt_unit,
+        piece_weight=piece_weight,
+        density=density,
+        extra=existing_item.extra,
+        nutrition_layout=existing_item.nutrition_layout
+    )
 
     return updated_item
 
 def update_item(item_name):
     """Update item in the specified YAML file."""
-    items, file = load("item")
-    item, idx = get_item(item_name, verbose=0)
-    if idx is None:
-        print_error(f"Item '{item_name}' not found in {file}")
-        return None
-    elif idx == -1:
-        print_error(f"Multiple items matched with '{item_name}' in {file}")
-        return None
+    context = DataContext()
+    storage = get_storage("item")
+    file = storage.file
+    # Exact names are read on their own, other names are matched against all items
+    item = context.find("item", item_name)
+    if item is None:
+        item, idx = get_item(item_name, verbose=0, context=context)
+        if idx is None:
+            print_error(f"Item '{item_name}' not found in {file}")
+            return None
+        elif idx == -1:
+            print_error(f"Multiple items matched with '{item_name}' in {file}")
+            return None
 
     updated_item = get_user_input(item)
-    items[idx] = updated_item
-    save_data(items, file)
+
+    # Applied by name to the stored data, so concurrent changes made while prompting are kept
+    if not storage.update(item.name, updated_item.to_dict()):
+        print_error(f"Item '{item.name}' was removed from {file} while updating")
+        return None
+    invalidate_meal_totals(get_data_config()["meal"], {item.name, updated_item.name})
     print_success(f"Successfully updated '{item_name}' in {file}")
     return updated_item
@@ -1,10 +1,168 @@
-from .config import get_config
-from .utils import load_existing_data
+import os
+
+from .config.get_config import get_config
+from .index import NameIndex
+from .matrix import NutrientMatrix
+from .models import from_records
+from .storage import open_storage
+from .totals_cache import MealTotalsCache
+from .units import UnitRegistry
+from .vars import MEAL_CACHE_ENABLED, STREAM_ITEMS, STREAM_THRESHOLD
+
+_config = None
+_shared_context = None
+
+
+def get_data_config():
+    """Read the current configuration once per process."""
+    global _config
+    if _config is None:
+        _config = get_config(verbose=0)
+    return _config
+
+
+def reset_data_config():
+    """Forget the configuration read by get_data_config, so the next call reads it again."""
+    global _config
+    _config = None
+
+
+def get_storage(identifier:str):
+    """Storage backend of a dataset in the current configuration."""
+    return open_storage(get_data_config(), identifier)
 
 
 def load(identifier:str):
-    """Load data from the YAML file."""
-    config = get_config(verbose=0)
-    file = config[identifier]
-    data = load_existing_data(file)
-    return data, file
+    """Load all records of a dataset from its storage backend, as model objects."""
+    storage = get_storage(identifier)
+    return from_records(identifier, storage.load()), storage.file
+
+
+class DataContext:
+    """Parsed datasets shared by one invocation, each YAML file is read at most once.
+
+    Records are model objects (see models.py). datasets optionally preloads
+    {identifier: (records, file)} pairs, as in worker processes;
+    such contexts keep memoized meal totals in memory only. stream_items overrides
+    NUTRITION_STREAM_ITEMS, see require_items, and units the unit registry of the configuration.
+    """
+
+    def __init__(self, datasets=None, stream_items=None, units=None):
+        self._preloaded = datasets is not None
+        self._datasets = dict(datasets or {})
+        self._indexes = {}
+        self._matrix = None
+        self._units = units
+        self._item_factors = None
+        self._meal_totals = None
+        self._stream_items = False if self._preloaded else stream_items
+        # Names of the items loaded by require_items, None while the whole catalogue is used
+        self._item_names = None
+
+    def get(self, identifier:str):
+        """Return the (data, file) pair for a dataset, loading it on first use."""
+        if identifier not in self._datasets:
+            self._datasets[identifier] = load(identifier)
+        return self._datasets[identifier]
+
+    def find(self, identifier:str, name):
+        """Return the record called exactly name, or None.
+
+        Indexed storage backends (SQLite) read just that record while the dataset is not
+        loaded; otherwise the name index of the loaded dataset is used.
+        """
+        if identifier not in self._datasets or (identifier == "item" and self._item_names is not None):
+            storage = get_storage(identifier)
+            if storage.indexed:
+                records = storage.find([name])
+                return from_records(identifier, records)[0] if records else None
+        idx = self.index(identifier).exact(name)
+        return None if idx is None else self.get(identifier)[0][idx]
+
+    def require_items(self, names):
+        """Make sure the items called names can be looked up before a calculation.
+
+        When items are streamed (large item files, or NUTRITION_STREAM_ITEMS=1) only these
+        items are read, and lookups afterwards see just the items required so far.
+        Otherwise the whole catalogue is loaded on first use as usual.
+        """
+        if not self.streams_items():
+            return
+        names = set(names)
+        if self._item_names is not None and names <= self._item_names:
+            return
+        names |= self._item_names or set()
+        storage = get_storage("item")
+        self._datasets["item"] = (from_records("item", storage.find(names)), storage.file)
+        self._item_names = names
+        self._indexes.pop("item", None)
+        self._matrix = None
+        self._item_factors = None
+
+    def streams_items(self):
+        """Whether calculations read only the items they reference."""
+        if "item" in self._datasets and self._item_names is None:
+            # The whole catalogue is loaded already
+            return False
+        if self._stream_items is None:
+            if STREAM_ITEMS == "auto":
+                sources = get_storage("item").sources()
+                self._stream_items = os.path.exists(sources[0]) and os.path.getsize(sources[0]) > STREAM_THRESHOLD
+            else:
+                self._stream_items = STREAM_ITEMS in ("1", "true", "yes", "on")
+        return self._stream_items
+
+    def index(self, identifier:str):
+        """Return the name index of a dataset, built once per loaded dataset."""
+        if identifier not in self._indexes:
+            self._indexes[identifier] = NameIndex(record.name for record in self.get(identifier)[0])
+        return self._indexes[identifier]
+
+    def matrix(self):
+        """Return the nutrient matrix of the item catalogue, rows aligned with the items."""
+        if self._matrix is None:
+            self._matrix = NutrientMatrix(self.items)
+        return self._matrix
+
+    def units(self):
+        """Return the unit registry, with the `units` of the configuration unless preloaded."""
+        if self._units is None:
+            self._units = UnitRegistry(None if self._preloaded else get_data_config().get("units"))
+        return self._units
+
+    def item_factors(self):
+        """Return the unit conversion table of every item (see UnitRegistry.conversions), aligned with the items."""
+        if self._item_factors is None:
+            conversions = self.units().conversions
+            self._item_factors = [conversions(item) for item in self.items]
+        return self._item_factors
+
+    def meal_totals(self):
+        """Return the memoized meal totals, persisted next to the meals file if enabled."""
+        if self._meal_totals is None:
+            meals_file = get_data_config()["meal"] if MEAL_CACHE_ENABLED and not self._preloaded else None
+            self._meal_totals = MealTotalsCache(meals_file)
+        return self._meal_totals
+
+    @property
+    def items(self):
+        return self.get("item")[0]
+
+    @property
+    def meals(self):
+        return self.get("meal")[0]
+
+    @property
+    def diets(self):
+        return self.get("diet")[0]
+
+
+def share_context(context):
+    """Make current_context return context (None to stop sharing), used by long running servers."""
+    global _shared_context
+    _shared_context = context
+
+
+def current_context():
+    """Return the shared data context if there is one, otherwise a new one for this invocation."""
+    return _shared_context if _shared_context is not None else DataContext()
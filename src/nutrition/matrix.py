@@ -0,0 +1,167 @@
+"""Columnar item × nutrient matrix used to compute meal and diet totals.
+
+NumPy is used when it is installed, otherwise the matrix is a flat `array('d')`.
+Missing values are stored as NaN and count as zero in totals.
+"""
+import math
+from array import array
+
+_numpy = False
+
+
+def get_numpy():
+    """Return the numpy module, or None if it is not installed; imported on first use."""
+    global _numpy
+    if _numpy is False:
+        try:
+            import numpy
+        except ImportError:
+            numpy = None
+        _numpy = numpy
+    return _numpy
+
+
+# (section, field) of every nutrient, in column order
+NUTRIENTS = [
+    ("energy", "value"),
+    ("carbohydrates", "value"),
+    ("carbohydrates", "sugar"),
+    ("fat", "value"),
+    ("fat", "saturated"),
+    ("fat", "unsaturated"),
+    ("protein", "value"),
+    ("salt", "value"),
+]
+NUTRIENT_LABELS = [
+    "Energy (kcal)",
+    "Carbs (g)",
+    "Sugar (g)",
+    "Fat (g)",
+    "Saturated (g)",
+    "Unsaturated (g)",
+    "Protein (g)",
+    "Salt (g)",
+]
+# Flat column names of the nutrients, for machine-readable output
+NUTRIENT_COLUMNS = [
+    "energy",
+    "carbohydrates",
+    "sugar",
+    "fat",
+    "saturated",
+    "unsaturated",
+    "protein",
+    "salt",
+]
+TOTAL_UNITS = {
+    "energy": "kcal",
+    "carbohydrates": "g",
+    "fat": "g",
+    "protein": "g",
+    "salt": "g",
+}
+
+
+def to_float(value):
+    """Convert a nutrient value to float, with NaN for missing or non-numeric values."""
+    if value is None or isinstance(value, bool):
+        return math.nan
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def nutrient_vector(nutrition):
+    """Read the nutrients of a nested nutrition dict into a list in column order."""
+    return [to_float((nutrition.get(section) or {}).get(field)) for section, field in NUTRIENTS]
+
+
+def empty_vector():
+    """Vector with every nutrient at zero."""
+    return [0.0] * len(NUTRIENTS)
+
+
+def add_vectors(total, vector):
+    """Add vector to total in place, skipping missing (NaN) values."""
+    for j, value in enumerate(vector):
+        if value == value:
+            total[j] += value
+    return total
+
+
+def sum_vectors(vectors):
+    """Sum a sequence of nutrient vectors."""
+    total = empty_vector()
+    for vector in vectors:
+        add_vectors(total, vector)
+    return total
+
+
+def totals_from_vector(vector):
+    """Convert a nutrient vector to the nested totals dict used for display."""
+    totals = {section: {"value": 0, "unit": unit} for section, unit in TOTAL_UNITS.items()}
+    for (section, field), value in zip(NUTRIENTS, vector):
+        totals[section][field] = value
+    return totals
+
+
+def totals_to_vector(totals):
+    """Convert a nested totals dict to a nutrient vector."""
+    return nutrient_vector(totals)
+
+
+class NutrientMatrix:
+    """Nutrient values of every item in a catalogue, one row per item."""
+
+    def __init__(self, items):
+        np = self._np = get_numpy()
+        self.rows = len(items)
+        self.cols = len(NUTRIENTS)
+        values = array("d")
+        for item in items:
+            values.extend(map(to_float, item.nutrient_values()))
+
+        if np is not None:
+            self.values = np.frombuffer(values, dtype=np.float64).reshape(self.rows, self.cols)
+            self._filled = np.where(np.isnan(self.values), 0.0, self.values)
+        else:
+            self.values = values
+            self._filled = array("d", (0.0 if value != value else value for value in values))
+
+    def row(self, i):
+        """Nutrient values of one item, NaN where missing."""
+        if self._np is not None:
+            return self.values[i].tolist()
+        return self.values[i * self.cols:(i + 1) * self.cols].tolist()
+
+    def weighted_sum(self, rows, weights):
+        """Sum of the given rows scaled by weights (the quantity multipliers), as a list."""
+        if not rows:
+            return empty_vector()
+        np = self._np
+        if np is not None:
+            return (np.asarray(weights, dtype=np.float64) @ self._filled[list(rows)]).tolist()
+
+        total = empty_vector()
+        cols = self.cols
+        filled = self._filled
+        for i, weight in zip(rows, weights):
+            base = i * cols
+            for j in range(cols):
+                total[j] += filled[base + j] * weight
+        return total
+
+    def weighted_columns(self, rows, weights, columns):
+        """Values of the given columns for the given rows scaled by weights, missing as zero.
+
+        Returns one list per column with a value per row, the transpose of the selected rows.
+        """
+        np = self._np
+        if np is not None:
+            selected = self._filled[np.ix_(list(rows), list(columns))]
+            return (selected * np.asarray(weights, dtype=np.float64)[:, None]).T.tolist()
+
+        cols = self.cols
+        filled = self._filled
+        return [[filled[i * cols + j] * weight for i, weight in zip(rows, weights)] for j in columns]
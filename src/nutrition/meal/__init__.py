@@ -1,6 +1,4 @@
-from .add_meal import add_meal, configure_add_parser
-from .get_meal import get_meal, configure_get_parser
-from .remove_meal import remove_meal, configure_remove_parser
-from .update_meal import update_meal, configure_update_parser
-from .calculate import calculate_meal, configure_calculate_parser
-from ..loader import load
+"""Meal commands, one module each.
+
+Nothing is imported here, so running one command (see COMMANDS in cli.py) imports only its module.
+"""
@@ -1,7 +1,6 @@
 """Script to add a new meal to a YAML file"""
 from ..console import print_section_title, print_success
-from ..utils import save_data
-from ..loader import load
+from ..loader import get_storage
 
 def configure_add_parser(parser):
     """Configure arguments for meal add command"""
@@ -69,14 +68,13 @@ def get_user_input():
 
 def add_meal():
     """Main function to add a new meal."""
-    existing_data, file = load("meal")
+    storage = get_storage("meal")
     new_meal = get_user_input()
 
     if new_meal is None:
         return
 
-    existing_data.append(new_meal)
-    save_data(existing_data, file)
+    storage.add(new_meal)
 
-    print_success(f"Successfully added meal '{new_meal['name']}' to {file}")
+    print_success(f"Successfully added meal '{new_meal['name']}' to {storage.file}")
     print_success(f"Meal contains {len(new_meal['items'])} items")
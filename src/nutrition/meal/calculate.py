@@ -1,172 +1,216 @@
-import re
-
 from ..console import *
-from ..loader import load
-from .get_meal import get_meal
+from ..loader import current_context
+from ..matrix import NUTRIENT_COLUMNS, totals_from_vector
+from ..output import DIGITS, RecordWriter, TOTALS_COLUMNS, add_format_argument, nutrient_row, report_error, totals_rows
+from ..parallel import imap_records
+from .get_meal import resolve_meal
+
+# CSV columns of a meal calculation, one row per meal item with its contribution
+MEAL_RESULT_COLUMNS = ["meal", "item", "quantity", "unit", "status", "multiplier", *NUTRIENT_COLUMNS]
 
 def configure_calculate_parser(parser):
     """Configure arguments for meal calculate command"""
-    parser.add_argument("name", help="Name of the meal to calculate (accepts regex)")
+    parser.add_argument("name", nargs="?", default="", help="Name of the meal to calculate (accepts regex)")
+    parser.add_argument("--all", "-a", action="store_true", help="Calculate all meals in one table")
+    parser.add_argument("--jobs", "-j", type=int, default=1, help="Worker processes for calculating several meals")
+    add_format_argument(parser)
     parser.set_defaults(func=handle_calculate)
 
 def handle_calculate(args):
     """Handle meal calculate command"""
-    calculate_meal(args.name)
+    if not args.all and not args.name:
+        message = "Give the name of a meal to calculate, or use --all"
+        if args.format == "text":
+            print_error(message)
+        else:
+            report_error(message)
+        return
+    context = current_context()
+    several = args.all or context.index("meal").several(args.name)
+    pattern = "" if args.all else args.name
+    if args.format != "text":
+        if several:
+            write_meals_totals(pattern, args.format, context, args.jobs)
+        else:
+            write_meal_result(args.name, args.format, context)
+    elif several:
+        calculate_meals(pattern, context, args.jobs)
+    else:
+        calculate_meal(args.name, context)
+    context.meal_totals().save()
 
-def calculate_meal(meal_name):
-    """Calculate the total nutrition values for the specified meal."""
-    items, _ = load("item")
+def calculate_meal(meal_name, context=None):
+    """Calculate and print the total nutrition values for the specified meal."""
+    context = context or current_context()
     # Find the specified meal
-    target_meal, idx = get_meal(name=meal_name, verbose=0)
+    idx = resolve_meal(meal_name, context)
     if idx is None:
         print_error(f"Meal '{meal_name}' not found")
         return None
     elif idx == -1:
         print_error(f"Multiple meals matched with '{meal_name}'")
         return None
-    # Create a lookup dictionary for items
-    item_lookup = {item["name"]: item for item in items}
-
-    # Initialize totals
-    totals = {
-        'energy': {'value': 0, 'unit': 'kcal'},
-        'carbohydrates': {'value': 0, 'unit': 'g', 'sugar': 0},
-        'fat': {'value': 0, 'unit': 'g', 'saturated': 0, 'unsaturated': 0},
-        'protein': {'value': 0, 'unit': 'g'},
-        'salt': {'value': 0, 'unit': 'g'}
-    }
 
-    missing_items = []
-    calculated_items = []
-
-    meal_name = target_meal["name"]
-    print_header(f"Calculating for MEAL: '{meal_name}'\n[Items in meal: {len(target_meal['items'])}]", '=')
-
-    # Calculate nutrition for each item in the meal
-    for meal_item in target_meal['items']:  # type: ignore
-        item_name = meal_item['name']
-        quantity = meal_item['quantity']
-        unit = meal_item['unit']
-
-        if item_name not in item_lookup:
-            missing_items.append(item_name)
-            print_warning(f"{format_number(quantity)} {unit} of {item_name} - NOT FOUND")
-            continue
-
-        food_item = item_lookup[item_name]
-
-        # Calculate multiplier based on quantity
-        # Assume nutrition data is per 100g and convert accordingly
-        base_amount = get_base_amount(food_item['per'])
-        multiplier = calculate_multiplier(quantity, unit, base_amount)
-
-        if multiplier is None:
-            print_warning(f"{format_number(quantity)} {unit} of {item_name} - UNIT CONVERSION ISSUE")
-            continue
-
-        # Add to totals
-        nutrition = food_item['nutrition']
-
-        # Energy
-        if nutrition['energy']['value'] is not None:
-            totals['energy']['value'] += nutrition['energy']['value'] * multiplier
-
-        # Carbohydrates
-        if nutrition['carbohydrates']['value'] is not None:
-            totals['carbohydrates']['value'] += nutrition['carbohydrates']['value'] * multiplier
-        if nutrition['carbohydrates']['sugar'] is not None:
-            totals['carbohydrates']['sugar'] += nutrition['carbohydrates']['sugar'] * multiplier
-
-        # Fat
-        if nutrition['fat']['value'] is not None:
-            totals['fat']['value'] += nutrition['fat']['value'] * multiplier
-        if nutrition['fat']['saturated'] is not None:
-            totals['fat']['saturated'] += nutrition['fat']['saturated'] * multiplier
-        if nutrition['fat']['unsaturated'] is not None:
-            totals['fat']['unsaturated'] += nutrition['fat']['unsaturated'] * multiplier
-
-        # Protein
-        if nutrition['protein']['value'] is not None:
-            totals['protein']['value'] += nutrition['protein']['value'] * multiplier
-
-        # Salt
-        if nutrition['salt']['value'] is not None:
-            totals['salt']['value'] += nutrition['salt']['value'] * multiplier
-
-        calculated_items.append(item_name)
-        print(f"✔️ {format_number(quantity)} {unit} of {item_name} (×{format_number(multiplier)})")
-
-    # Display results
-    # print_separator()
-    print_header("","=")
-    print_header("💯 TOTAL NUTRITION FOR MEAL", '=', newline=False)
-    print_nutrition_totals(totals)
+    result = compute_meal(context.meals[idx], context)
+    print_meal_result(result)
+    return result['totals']
 
-    print_separator()
-    print_success(f"Calculated nutrition for {len(calculated_items)}/{len(target_meal['items'])} items")
-    if missing_items:
-        print_warning(f"Missing nutrition data for {len(missing_items)} items:")
-        for item in missing_items:
-            print(f"   - {item}")
-    print_separator()
-
-    return totals
-
-def get_base_amount(per_string):
-    """Extract the base amount from the 'per' field (e.g., '100g' -> 100)."""
-    match = re.search(r'(\d+)', per_string)
-    return float(match.group(1)) if match else 100.0
-
-def calculate_multiplier(quantity, unit, base_amount):
-    """Calculate the multiplier for nutrition values based on quantity and unit."""
-    # Convert everything to grams for simplicity
-    # This is a basic conversion - you might want to extend this
-
-    quantity_in_grams = quantity
-
-    # Basic unit conversions to grams
-    if unit.lower() in ['kg', 'kilogram', 'kilograms']:
-        quantity_in_grams = quantity * 1000
-    elif unit.lower() in ['g', 'gram', 'grams']:
-        quantity_in_grams = quantity
-    elif unit.lower() in ['mg', 'milligram', 'milligrams']:
-        quantity_in_grams = quantity / 1000
-    elif unit.lower() in ['oz', 'ounce', 'ounces']:
-        quantity_in_grams = quantity * 28.35
-    elif unit.lower() in ['lb', 'pound', 'pounds']:
-        quantity_in_grams = quantity * 453.6
-    elif unit.lower() in ['pcs', 'piece', 'pieces', 'pc']:
-        # For pieces, assume each piece is 100g (you might want to make this configurable)
-        quantity_in_grams = quantity * 100
-    else:
-        # Unknown unit, assume it's already in the correct proportion
-        return quantity / base_amount
+def calculate_meals(pattern, context=None, jobs=1):
+    """Calculate the nutrition of every meal matching pattern and print one table."""
+    context = context or current_context()
+    results = compute_meals(pattern, context, jobs)
+    if not results:
+        print_error(f"No meals matched with '{pattern}'")
+        return []
 
-    # Calculate multiplier based on base amount (usually 100g)
-    return quantity_in_grams / base_amount
-
-
-def print_nutrition_totals(totals):
-    """Print the total nutrition values in a formatted way."""
-    indent = "  "
-    sub_indent = "    "
-
-    energy_formatted = format_with_unit(totals['energy']['value'], totals['energy']['unit'])
-    print_item_detail("Energy", energy_formatted, indent)
-
-    carbs_formatted = format_with_unit(totals['carbohydrates']['value'], totals['carbohydrates']['unit'])
-    sugar_formatted = format_with_unit(totals['carbohydrates']['sugar'], totals['carbohydrates']['unit'])
-    print_item_detail("Carbohydrates", carbs_formatted, indent)
-    print_sub_item_detail("Sugar", sugar_formatted, sub_indent)
-
-    fat_formatted = format_with_unit(totals['fat']['value'], totals['fat']['unit'])
-    fat_sat_formatted = format_with_unit(totals['fat']['saturated'], totals['fat']['unit'])
-    fat_unsat_formatted = format_with_unit(totals['fat']['unsaturated'], totals['fat']['unit'])
-    print_item_detail("Fat", fat_formatted, indent)
-    print_sub_item_detail("Saturated", fat_sat_formatted, sub_indent)
-    print_sub_item_detail("Unsaturated", fat_unsat_formatted, sub_indent)
+    print_totals_table("Meal", results)
+    print_separator()
+    print_success(f"Calculated nutrition for {len(results)} meals")
+    return [(result['name'], result['totals']) for result in results]
+
+def write_meal_result(meal_name, output_format, context=None):
+    """Calculate the specified meal and write the result in a machine-readable format."""
+    context = context or current_context()
+    with RecordWriter(output_format, MEAL_RESULT_COLUMNS, meal_result_rows, digits=DIGITS) as writer:
+        idx = resolve_meal(meal_name, context)
+        if idx is None:
+            report_error(f"Meal '{meal_name}' not found")
+            return None
+        elif idx == -1:
+            report_error(f"Multiple meals matched with '{meal_name}'")
+            return None
+        result = compute_meal(context.meals[idx], context)
+        writer.write(result)
+    return result['totals']
+
+def write_meals_totals(pattern, output_format, context=None, jobs=1):
+    """Calculate every meal matching pattern, writing each totals entry as soon as it is calculated."""
+    context = context or current_context()
+    with RecordWriter(output_format, TOTALS_COLUMNS, totals_rows, digits=DIGITS) as writer:
+        count = writer.write_all(iter_meals(pattern, context, jobs))
+    if not count:
+        report_error(f"No meals matched with '{pattern}'")
+    return count
+
+def meal_result_rows(result):
+    """CSV rows of a meal calculation, one per meal item."""
+    return [{"meal": result['name'], "item": item['name'], "quantity": item['quantity'], "unit": item['unit'],
+             "status": item['status'], "multiplier": item['multiplier'], **nutrient_row(item['contribution'])}
+            for item in result['items']]
+
+def compute_meal(meal, context):
+    """Calculate the nutrition of a meal without printing anything.
+
+    Returns a dict with the meal 'name', its nutrition 'totals', the names of 'missing_items'
+    and of items with 'conversion_issues', and one entry per meal item in 'items' holding its
+    'name', 'quantity', 'unit', 'status' ('ok', 'missing' or 'conversion'), 'multiplier'
+    and 'contribution' to the totals.
+    """
+    require_meal_items([meal], context)
+    lines = resolve_meal_items(meal, context)
+    matrix = context.matrix()
+    items = []
+    missing_items = []
+    conversion_issues = []
+    for meal_item, item_idx, multiplier in lines:
+        entry = {
+            'name': meal_item.name,
+            'quantity': meal_item.quantity,
+            'unit': meal_item.unit,
+            'status': 'ok',
+            'multiplier': multiplier,
+            'contribution': None
+        }
+        if item_idx is None:
+            entry['status'] = 'missing'
+            missing_items.append(meal_item.name)
+        elif multiplier is None:
+            entry['status'] = 'conversion'
+            conversion_issues.append(meal_item.name)
+        else:
+            entry['contribution'] = totals_from_vector(matrix.weighted_sum([item_idx], [multiplier]))
+        items.append(entry)
+
+    return {
+        'name': meal.name,
+        'totals': totals_from_vector(meal_vector(lines, context)),
+        'items': items,
+        'missing_items': missing_items,
+        'conversion_issues': conversion_issues
+    }
 
-    protein_formatted = format_with_unit(totals['protein']['value'], totals['protein']['unit'])
-    salt_formatted = format_with_unit(totals['salt']['value'], totals['salt']['unit'])
-    print_item_detail("Protein", protein_formatted, indent)
-    print_item_detail("Salt", salt_formatted, indent)
+def compute_meals(pattern, context, jobs=1):
+    """Calculate the totals of every meal matching pattern without printing anything.
+
+    Returns one dict per meal with its 'name', 'totals' and number of 'skipped' items.
+    With jobs above 1 the meals are spread over that many worker processes.
+    """
+    return list(iter_meals(pattern, context, jobs))
+
+def iter_meals(pattern, context, jobs=1):
+    """Like compute_meals, but yield every entry as soon as it is calculated."""
+    matched_idx = context.index("meal").search(pattern)
+    require_meal_items([context.meals[idx] for idx in matched_idx], context)
+    yield from imap_records(meal_entry, matched_idx, context, ("item", "meal"), jobs)
+
+def meal_entry(context, idx):
+    """Totals entry of the meal at idx, as returned by compute_meals."""
+    vector, skipped = cached_meal_vector(context, idx)
+    return {'name': context.meals[idx].name, 'totals': totals_from_vector(vector), 'skipped': skipped}
+
+def require_meal_items(meals, context):
+    """Read the items referenced by meals, when the context streams items instead of loading them all."""
+    if context.streams_items():
+        context.require_items(meal_item.name for meal in meals for meal_item in meal.items)
+
+def resolve_meal_items(meal, context):
+    """Match the items of a meal with the catalogue.
+
+    Returns (meal_item, item_idx, multiplier) for every item in the meal; item_idx is None
+    when the item is not in the catalogue and multiplier is None on unit conversion issues.
+    """
+    item_index = context.index("item")
+    factors = context.item_factors()
+    lookup = context.units().lookup
+    lines = []
+    for meal_item in meal.items:
+        item_idx = item_index.exact(meal_item.name)
+        multiplier = None
+        if item_idx is not None:
+            multiplier = calculate_multiplier(meal_item.quantity, lookup(meal_item.unit), factors[item_idx])
+        lines.append((meal_item, item_idx, multiplier))
+    return lines
+
+def meal_vector(lines, context):
+    """Sum the resolved items of a meal over the nutrient matrix."""
+    rows = []
+    multipliers = []
+    for _, item_idx, multiplier in lines:
+        if item_idx is not None and multiplier is not None:
+            rows.append(item_idx)
+            multipliers.append(multiplier)
+    return context.matrix().weighted_sum(rows, multipliers)
+
+def cached_meal_vector(context, idx):
+    """Return (vector, skipped items) of the meal at idx, calculated once per data context."""
+    cache = context.meal_totals()
+    cached = cache.get(idx, context)
+    if cached is not None:
+        return cached
+
+    lines = resolve_meal_items(context.meals[idx], context)
+    vector = meal_vector(lines, context)
+    skipped = sum(1 for _, item_idx, multiplier in lines if item_idx is None or multiplier is None)
+    cache.put(idx, context, vector, skipped)
+    return vector, skipped
+
+def calculate_multiplier(quantity, unit, factors):
+    """Calculate the multiplier for nutrition values of a quantity in a unit.
+
+    unit is the (base unit, amount) from the unit registry and factors the conversion table
+    of the item, see DataContext.item_factors. Returns None when the unit does not convert
+    for the item, e.g. pieces of an item without a piece_weight.
+    """
+    base, amount = unit
+    factor = factors.get(base)
+    return quantity * amount * factor if factor is not None else None
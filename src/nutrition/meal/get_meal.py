@@ -2,28 +2,41 @@ import re
 
 from ..console import format_number, print_item_detail
 from ..console import print_list_header, print_error
-from ..loader import load
+from ..loader import current_context
+from ..output import RecordWriter, add_format_argument
 from ..utils import vprint
 
+# CSV columns of meals, one row per meal item
+MEAL_COLUMNS = ["meal", "item", "quantity", "unit"]
+
 
 def configure_get_parser(parser):
     """Configure arguments for meal get command"""
     parser.add_argument("name", nargs="?", default="", help="Name of the meal to retrieve (accepts regex)")
+    add_format_argument(parser)
     parser.set_defaults(func=handle_get)
 
 def handle_get(args):
     """Handle meal get command"""
-    get_meal(args.name)
+    if args.format != "text":
+        write_meals(args.name, args.format)
+        return
+    context = current_context()
+    # Exact names are read on their own, other names are matched against all meals
+    meal = context.find("meal", args.name) if args.name else None
+    if meal is None:
+        get_meal(args.name, context=context)
+    else:
+        print_list_header(1, "meal")
+        print_meal(meal)
 
-def get_meal(name=None, verbose=1):
+def get_meal(name=None, verbose=1, context=None):
     """Retrieve meal data from the specified YAML file."""
-    meals, _ = load("meal")
-    matched_meals = []
-    matched_meal_idx = -1
-    for i, meal in enumerate(meals):
-        if re.search(name, meal["name"], re.IGNORECASE):
-            matched_meal_idx = i
-            matched_meals.append(meal["name"])
+    context = context or current_context()
+    meals, _ = context.get("meal")
+    matched_idx = context.index("meal").search(name or "")
+    matched_meals = [meals[i].name for i in matched_idx]
+    matched_meal_idx = matched_idx[-1] if matched_idx else -1
 
     if verbose:
         print_list_header(len(matched_meals), "meal")
@@ -38,19 +51,54 @@ def get_meal(name=None, verbose=1):
         vprint("  " + "\n  ".join(matched_meals), verbose)
         return matched_meals, -1
 
+def resolve_meal(name, context, resolved=None):
+    """Index of the meal a diet refers to, -1 when ambiguous and None when not found.
+
+    Exact names use the name index; other names fall back to the pattern search of
+    get_meal, once per distinct name when resolved caches the results.
+    """
+    idx = context.index("meal").exact(name)
+    if idx is not None:
+        return idx
+    resolved = {} if resolved is None else resolved
+    if name not in resolved:
+        try:
+            resolved[name] = get_meal(name=name, verbose=0, context=context)[1]
+        except re.error:
+            resolved[name] = None
+    return resolved[name]
+
+def write_meals(name, output_format, context=None):
+    """Write every meal matching name in a machine-readable format."""
+    context = context or current_context()
+    meal = context.find("meal", name) if name else None
+    if meal is not None:
+        matched = [meal]
+    else:
+        matched = (context.meals[i] for i in context.index("meal").search(name or ""))
+    with RecordWriter(output_format, MEAL_COLUMNS, meal_rows, to_json=lambda meal: meal.to_dict()) as writer:
+        return writer.write_all(matched)
+
+def meal_rows(meal):
+    """CSV rows of a meal, one per item."""
+    if not meal.items:
+        return [{"meal": meal.name}]
+    return [{"meal": meal.name, "item": item.name, "quantity": item.quantity, "unit": item.unit}
+            for item in meal.items]
+
 def print_meal(meal):
     """Print the details of a meal."""
-    print_item_detail("Meal", meal['name'], "")
-    print_item_detail(f"Items ({len(meal['items'])})", "", "")
+    print_item_detail("Meal", meal.name, "")
+    print_item_detail(f"Items ({len(meal.items)})", "", "")
 
-    if not meal['items']:
+    if not meal.items:
         print("  No items in this meal")
         return
 
     indent = "  "
-    for item in meal['items']:
-        quantity = format_number(item['quantity'])
-        print(f"{indent}{quantity} {item['unit']} of {item['name']}")
+    for item in meal.items:
+        quantity = format_number(item.quantity)
+        print(f"{indent}{quantity} {item.unit} of {item.name}")
 
 def format_number(value):
     """Format a number to remove trailing zeros."""
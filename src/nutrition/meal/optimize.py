@@ -0,0 +1,180 @@
+import argparse
+import math
+import re
+
+from ..console import *
+from ..item.query_item import query_scales
+from ..loader import current_context, get_storage
+from ..matrix import NUTRIENT_COLUMNS
+from ..models import Meal, MealItem
+from ..output import DIGITS, RecordWriter, add_format_argument, report_error
+from ..query import NutrientColumns, parse_query
+from ..solver import OBJECTIVES, SOLVERS, solve_targets
+from .calculate import MEAL_RESULT_COLUMNS, calculate_multiplier, compute_meal, meal_result_rows
+
+# Target option: nutrient column
+TARGETS = {
+    "energy": "energy",
+    "protein": "protein",
+    "fat": "fat",
+    "carbs": "carbohydrates",
+    "salt": "salt",
+}
+# Quantities below this share of a unit are left out of the meal
+MIN_QUANTITY = 0.05
+
+
+def parse_range(text):
+    """Parse a target range 'MIN:MAX', 'MIN:' or ':MAX' (or a single value) into (low, high)."""
+    low, separator, high = text.partition(":")
+    try:
+        low = float(low) if low.strip() else 0.0
+        high = float(high) if high.strip() else math.inf
+        if not separator:
+            high = low
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid range '{text}', use MIN:MAX, MIN: or :MAX") from None
+    if low < 0 or high < low:
+        raise argparse.ArgumentTypeError(f"invalid range '{text}', need 0 <= MIN <= MAX")
+    return low, high
+
+def configure_optimize_parser(parser):
+    """Configure arguments for meal optimize command"""
+    parser.add_argument("items", nargs="*", help="Candidate items (accepts regex)")
+    parser.add_argument("--query", "-q", help="Candidate items by nutrients, as for 'item query'")
+    parser.add_argument("--type", "-t", help="Candidate items of this type")
+    for option, column in TARGETS.items():
+        unit = "kcal" if column == "energy" else "g"
+        parser.add_argument(f"--{option}", type=parse_range, metavar="MIN:MAX",
+                            help=f"Target range of {column} in {unit}, either side may be left out")
+    parser.add_argument("--objective", choices=OBJECTIVES, default="deviation",
+                        help="Minimize the deviation from the targets, or the total weight meeting them")
+    parser.add_argument("--unit", "-u", default="g", help="Unit of the quantities")
+    parser.add_argument("--max-quantity", type=float, help="Largest quantity of a single item")
+    parser.add_argument("--solver", choices=SOLVERS, default="auto",
+                        help="Linear program solver, auto uses SciPy when installed")
+    parser.add_argument("--name", "-n", default="Optimized meal", help="Name of the resulting meal")
+    parser.add_argument("--save", action="store_true", help="Add the resulting meal to the meals")
+    parser.add_argument("--force", action="store_true", help="With --save, replace a meal of the same name")
+    add_format_argument(parser)
+    parser.set_defaults(func=handle_optimize)
+
+def handle_optimize(args):
+    """Handle meal optimize command"""
+    targets = {column: getattr(args, option) for option, column in TARGETS.items()
+               if getattr(args, option) is not None}
+    optimize_meal(args.items, targets, args.query, args.type, args.objective, args.unit,
+                  args.max_quantity, args.solver, args.name, args.save, args.format, force=args.force)
+
+def candidate_items(patterns, query=None, item_type=None, context=None):
+    """Indexes of the catalogue items matching any of patterns, the nutrient query and the type."""
+    context = context or current_context()
+    items = context.items
+    item_index = context.index("item")
+    if patterns:
+        matched = set()
+        for pattern in patterns:
+            idx = item_index.exact(pattern)
+            matched.update([idx] if idx is not None else item_index.search(pattern))
+        candidates = sorted(matched)
+    else:
+        candidates = range(len(items))
+    if query:
+        columns = NutrientColumns(context.matrix(), query_scales(context))
+        queried = set(columns.evaluate(parse_query(query)))
+        candidates = [i for i in candidates if i in queried]
+    if item_type:
+        item_type = item_type.casefold()
+        candidates = [i for i in candidates if (items[i].type or "").casefold() == item_type]
+    return list(candidates)
+
+def optimize_meal(patterns, targets, query=None, item_type=None, objective="deviation", unit="g",
+                  max_quantity=None, solver="auto", name="Optimized meal", save=False, output_format="text",
+                  context=None, force=False):
+    """Find quantities of candidate items meeting nutrient target ranges and show them as a meal.
+
+    targets maps nutrient columns to (low, high) ranges. Returns the meal calculation result,
+    see compute_meal, with the 'targets' and 'solver' added, or None on errors. save adds the
+    meal to the meals, replacing a meal of the same name only with force.
+    """
+    fail = print_error if output_format == "text" else report_error
+    if not targets:
+        fail(f"Give at least one target: {', '.join('--' + option for option in TARGETS)}")
+        return None
+    if not (patterns or query or item_type):
+        fail("Give candidate items, a --query or a --type")
+        return None
+
+    context = context or current_context()
+    if save and not force and context.find("meal", name) is not None:
+        fail(f"Meal '{name}' already exists, use --force to replace it or pick another --name")
+        return None
+    try:
+        candidates = candidate_items(patterns, query, item_type, context)
+    except (ValueError, re.error) as e:
+        fail(str(e))
+        return None
+
+    # Multiplier of a unit of every candidate, as meal calculate uses for its items
+    factors = context.item_factors()
+    unit_amount = context.units().lookup(unit)
+    multipliers = [calculate_multiplier(1, unit_amount, factors[i]) for i in candidates]
+    unconverted = [context.items[i].name for i, multiplier in zip(candidates, multipliers) if multiplier is None]
+    rows = [i for i, multiplier in zip(candidates, multipliers) if multiplier is not None]
+    if not rows:
+        fail(f"No candidate items that can be measured in {unit}")
+        return None
+
+    columns = [NUTRIENT_COLUMNS.index(column) for column in targets]
+    coefficients = context.matrix().weighted_columns(rows, [m for m in multipliers if m is not None], columns)
+    try:
+        solution = solve_targets(coefficients, list(targets.values()), objective, max_quantity, solver)
+    except ValueError as e:
+        fail(str(e))
+        return None
+
+    meal_items = [MealItem(context.items[i].name, round(quantity, 1), unit)
+                  for i, quantity in zip(rows, solution['quantities']) if quantity >= MIN_QUANTITY]
+    meal = Meal(name, meal_items)
+    result = compute_meal(meal, context)
+    result['solver'] = solution['solver']
+    result['targets'] = target_rows(targets, result['totals'])
+
+    if output_format != "text":
+        with RecordWriter(output_format, MEAL_RESULT_COLUMNS, meal_result_rows, digits=DIGITS) as writer:
+            writer.write(result)
+    else:
+        print_meal_result(result)
+        print_table(["Target", "Min", "Max", "Total", "Status"],
+                    [[row['nutrient'], format_number(row['min']), format_number(row['max']),
+                      format_number(row['total']), row['status']] for row in result['targets']])
+        print_separator()
+        print_info(f"{len(rows)} candidate items, solved with {solution['solver']}")
+        if unconverted:
+            print_warning(f"{len(unconverted)} candidate items cannot be measured in {unit} and were left out")
+        if not solution['feasible']:
+            print_warning("The targets cannot all be met with these items, showing the closest meal")
+
+    if save:
+        storage = get_storage("meal")
+        if force:
+            added, _ = storage.upsert([meal.to_dict()])
+        else:
+            storage.add(meal.to_dict())
+            added = 1
+        if output_format == "text":
+            action = "added" if added else "replaced"
+            print_success(f"Successfully {action} meal '{name}' in {storage.file}")
+    return result
+
+def target_rows(targets, totals):
+    """Target ranges with the total reached and whether it is 'ok', 'low' or 'high'."""
+    rows = []
+    for column, (low, high) in targets.items():
+        total = totals[column]['value']
+        # Totals are of rounded quantities, allow for the rounding
+        slack = max(abs(high if high < math.inf else low) * 0.005, 1e-6)
+        status = "low" if total < low - slack else "high" if total > high + slack else "ok"
+        rows.append({'nutrient': column, 'min': low, 'max': None if high == math.inf else high,
+                     'total': round(total, 3), 'status': status})
+    return rows
@@ -1,6 +1,5 @@
 from ..console import print_success, print_error
-from ..utils import save_data
-from ..loader import load
+from ..loader import get_storage
 
 
 def configure_remove_parser(parser):
@@ -19,26 +18,21 @@ def handle_remove(args):
 
 def remove_meal(meal_name):
     """Remove meal from the specified YAML file."""
-    meals, file = load("meal")
+    storage = get_storage("meal")
+    file = storage.file
 
     # Remove all meals
     if meal_name == "--all--":
-        meals.clear()
-        save_data(meals, file)
+        storage.clear()
         print_success(f"Successfully removed all meals from {file}")
         return None
 
     # Find and remove the meal
-    for i, meal in enumerate(meals):
-        if meal["name"] == meal_name:
-            removed_meal = meals.pop(i)
-
-            # Save the updated data
-            save_data(meals, file)
-
-            print_success(f"Successfully removed meal '{meal_name}' from {file}")
-            print_success(f"Removed meal had {len(removed_meal['items'])} items")
-            return removed_meal
+    removed_meal = storage.remove(meal_name)
+    if removed_meal is None:
+        print_error(f"Meal '{meal_name}' not found in {file}")
+        return None
 
-    print_error(f"Meal '{meal_name}' not found in {file}")
-    return None
+    print_success(f"Successfully removed meal '{meal_name}' from {file}")
+    print_success(f"Removed meal had {len(removed_meal['items'])} items")
+    return removed_meal
@@ -1,6 +1,6 @@
 from ..console import print_section_title, format_number, print_success, print_error
-from ..utils import save_data
-from ..loader import load
+from ..loader import DataContext, get_storage
+from ..models import Meal, MealItem
 from .get_meal import get_meal
 
 def configure_update_parser(parser):
@@ -14,17 +14,17 @@ def handle_update(args):
 
 def get_user_input(existing_meal):
     """Collect user input for updating meal with existing values as defaults."""
-    title = f"Update meal: {existing_meal['name']}"
+    title = f"Update meal: {existing_meal.name}"
     print_section_title(title)
     print("Press Enter to keep existing values, or type new values to update.")
 
     # Basic information
-    name = input(f"Meal name [{existing_meal['name']}]: ").strip() or existing_meal['name']
+    name = input(f"Meal name [{existing_meal.name}]: ").strip() or existing_meal.name
 
-    print(f"\nCurrent items in meal ({len(existing_meal['items'])}):")
-    for i, item in enumerate(existing_meal['items'], 1):
-        quantity = format_number(item['quantity'])
-        print(f"  {i}. {quantity} {item['unit']} of {item['name']}")
+    print(f"\nCurrent items in meal ({len(existing_meal.items)}):")
+    for i, item in enumerate(existing_meal.items, 1):
+        quantity = format_number(item.quantity)
+        print(f"  {i}. {quantity} {item.unit} of {item.name}")
 
     print("\nChoose an option:")
     print("1. Keep existing items and add new ones")
@@ -34,23 +34,20 @@ def get_user_input(existing_meal):
     choice = input("Choice [1]: ").strip() or "1"
 
     if choice == "1":
-        items = existing_meal['items'].copy()
+        items = list(existing_meal.items)
         print("\nAdd new items (press Enter without typing anything to finish):")
         items.extend(get_new_items(len(items)))
     elif choice == "2":
         print("\nAdd new items (press Enter without typing anything to finish):")
         items = get_new_items()
     elif choice == "3":
-        items = edit_existing_items(existing_meal['items'])
+        items = edit_existing_items(existing_meal.items)
     else:
         print("Invalid choice, keeping existing items")
-        items = existing_meal['items']
+        items = existing_meal.items
 
-    # Create the updated meal data structure
-    updated_meal = {
-        'name': name,
-        'items': items
-    }
+    # Create the updated meal, keeping fields the prompts do not cover
+    updated_meal = Meal(name, items, existing_meal.extra)
 
     return updated_meal
 
@@ -76,11 +73,7 @@ def get_new_items(start_count=0):
 
         unit = input("  Unit [g]: ").strip() or "g"
 
-        items.append({
-            'name': item_name,
-            'quantity': quantity,
-            'unit': unit
-        })
+        items.append(MealItem(item_name, quantity, unit))
 
         print(f"  ✔️ Added {format_number(quantity)} {unit} of {item_name}")
 
@@ -91,7 +84,7 @@ def edit_existing_items(existing_items):
     items = []
 
     for i, item in enumerate(existing_items, 1):
-        print(f"\nItem {i}: {format_number(item['quantity'])} {item['unit']} of {item['name']}")
+        print(f"\nItem {i}: {format_number(item.quantity)} {item.unit} of {item.name}")
         print("Options: [k]eep, [e]dit, [d]elete, [s]kip to finish")
 
         action = input("Action [k]: ").strip().lower() or "k"
@@ -99,29 +92,25 @@ def edit_existing_items(existing_items):
         if action == "k":
             items.append(item)
         elif action == "e":
-            name = input(f"  Item name [{item['name']}]: ").strip() or item['name']
+            name = input(f"  Item name [{item.name}]: ").strip() or item.name
 
-            quantity_display = format_number(item['quantity'])
+            quantity_display = format_number(item.quantity)
             quantity_input = input(f"  Quantity [{quantity_display}]: ").strip()
             if quantity_input:
                 try:
                     quantity = float(quantity_input)
                 except ValueError:
                     print("  Invalid quantity, keeping existing")
-                    quantity = item['quantity']
+                    quantity = item.quantity
             else:
-                quantity = item['quantity']
+                quantity = item.quantity
 
-            unit = input(f"  Unit [{item['unit']}]: ").strip() or item['unit']
+            unit = input(f"  Unit [{item.unit}]: ").strip() or item.unit
 
-            items.append({
-                'name': name,
-                'quantity': quantity,
-                'unit': unit
-            })
+            items.append(MealItem(name, quantity, unit, item.extra))
             print(f"  ✔️ Updated to {format_number(quantity)} {unit} of {name}")
         elif action == "d":
-            print(f"  ✗ Deleted {item['name']}")
+            print(f"  ✗ Deleted {item.name}")
         elif action == "s":
             # Add remaining items without changes
             items.extend(existing_items[i-1:])
@@ -132,18 +121,26 @@ def edit_existing_items(existing_items):
 
 def update_meal(meal_name):
     """Update meal in the specified YAML file."""
-    meals, file = load("meal")
-    meal, idx = get_meal(meal_name, verbose=0)
-    if idx is None:
-        print_error(f"Meal '{meal_name}' not found in {file}")
-        return None
-    elif idx == -1:
-        print_error(f"Multiple meals matched with '{meal_name}' in {file}")
-        return None
+    context = DataContext()
+    storage = get_storage("meal")
+    file = storage.file
+    # Exact names are read on their own, other names are matched against all meals
+    meal = context.find("meal", meal_name)
+    if meal is None:
+        meal, idx = get_meal(meal_name, verbose=0, context=context)
+        if idx is None:
+            print_error(f"Meal '{meal_name}' not found in {file}")
+            return None
+        elif idx == -1:
+            print_error(f"Multiple meals matched with '{meal_name}' in {file}")
+            return None
 
     updated_meal = get_user_input(meal)
-    meals[idx] = updated_meal
-    save_data(meals, file)
+
+    # Applied by name to the stored data, so concurrent changes made while prompting are kept
+    if not storage.update(meal.name, updated_meal.to_dict()):
+        print_error(f"Meal '{meal.name}' was removed from {file} while updating")
+        return None
     print_success(f"Successfully updated meal '{meal_name}' in {file}")
-    print_success(f"Meal now contains {len(updated_meal['items'])} items")
+    print_success(f"Meal now contains {len(updated_meal.items)} items")
     return updated_meal
@@ -0,0 +1,292 @@
+"""Typed records for items, meals and diets.
+
+The data files keep the nested YAML layout; datasets are converted to these classes when
+they are loaded (from_dict) and back at the storage boundary (to_dict). Nutrients are flat
+fields, units and other repeated strings are interned, and fields the classes do not know
+are kept in `extra` (and the nutrition sections of items as read in `nutrition_layout`) so
+records round-trip unchanged.
+"""
+import sys
+from dataclasses import dataclass, field
+
+from .units import parse_per
+
+
+def intern(value):
+    """Share one copy of repeated strings such as units."""
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def extra_fields(record, known):
+    """Fields of a record that have no attribute, or None."""
+    extra = {key: value for key, value in record.items() if key not in known}
+    return extra or None
+
+
+# Nutrition section: {key: Item attribute}, in the order Item.to_dict writes them
+NUTRITION_SECTIONS = {
+    "energy": {"value": "energy", "unit": "energy_unit"},
+    "carbohydrates": {"value": "carbohydrates", "unit": "carbohydrates_unit", "sugar": "sugar"},
+    "fat": {"value": "fat", "unit": "fat_unit", "saturated": "saturated", "unsaturated": "unsaturated"},
+    "protein": {"value": "protein", "unit": "protein_unit"},
+    "salt": {"value": "salt", "unit": "salt_unit"},
+}
+DEFAULT_LAYOUT = [(name, list(keys)) for name, keys in NUTRITION_SECTIONS.items()]
+
+
+def nutrition_layout(nutrition):
+    """Sections and keys of a nutrition mapping, or None when it has exactly the default ones.
+
+    Known keys map to None, their values are the attributes of the item; unknown keys and
+    sections keep their values.
+    """
+    if [(name, list(section) if isinstance(section, dict) else section)
+            for name, section in nutrition.items()] == DEFAULT_LAYOUT:
+        return None
+    layout = {}
+    for name, section in nutrition.items():
+        keys = NUTRITION_SECTIONS.get(name)
+        if keys is None or not isinstance(section, dict):
+            layout[name] = section
+        else:
+            layout[name] = {key: None if key in keys else value for key, value in section.items()}
+    return layout
+
+
+@dataclass(slots=True)
+class Item:
+    """A food item with its nutrition per `per`, parsed into per_amount and per_unit.
+
+    The optional piece_weight (g) and density (g/ml) let amounts in pieces and volumes convert.
+    """
+
+    name: str
+    type: str | None = None
+    per: str | None = None
+    energy: float | None = None
+    energy_unit: str | None = None
+    carbohydrates: float | None = None
+    sugar: float | None = None
+    carbohydrates_unit: str | None = None
+    fat: float | None = None
+    saturated: float | None = None
+    unsaturated: float | None = None
+    fat_unit: str | None = None
+    protein: float | None = None
+    protein_unit: str | None = None
+    salt: float | None = None
+    salt_unit: str | None = None
+    piece_weight: float | None = None
+    density: float | None = None
+    extra: dict | None = None
+    nutrition_layout: dict | None = field(default=None, repr=False)
+    per_amount: float = field(init=False, repr=False, compare=False)
+    per_unit: str | None = field(init=False, repr=False, compare=False)
+
+    FIELDS = frozenset(("name", "type", "per", "piece_weight", "density", "nutrition"))
+
+    def __post_init__(self):
+        self.per_amount, self.per_unit = parse_per(self.per)
+
+    @classmethod
+    def from_dict(cls, record):
+        nutrition = record.get("nutrition") or {}
+        layout = nutrition_layout(nutrition) if "nutrition" in record else {}
+        energy = nutrition.get("energy") or {}
+        carbohydrates = nutrition.get("carbohydrates") or {}
+        fat = nutrition.get("fat") or {}
+        protein = nutrition.get("protein") or {}
+        salt = nutrition.get("salt") or {}
+        return cls(
+            name=record["name"],
+            type=intern(record.get("type")),
+            per=intern(record.get("per")),
+            energy=energy.get("value"),
+            energy_unit=intern(energy.get("unit")),
+            carbohydrates=carbohydrates.get("value"),
+            sugar=carbohydrates.get("sugar"),
+            carbohydrates_unit=intern(carbohydrates.get("unit")),
+            fat=fat.get("value"),
+            saturated=fat.get("saturated"),
+            unsaturated=fat.get("unsaturated"),
+            fat_unit=intern(fat.get("unit")),
+            protein=protein.get("value"),
+            protein_unit=intern(protein.get("unit")),
+            salt=salt.get("value"),
+            salt_unit=intern(salt.get("unit")),
+            piece_weight=record.get("piece_weight"),
+            density=record.get("density"),
+            extra=extra_fields(record, cls.FIELDS),
+            nutrition_layout=layout,
+        )
+
+    def to_dict(self):
+        record = {"name": self.name}
+        if self.type is not None:
+            record["type"] = self.type
+        if self.per is not None:
+            record["per"] = self.per
+        if self.piece_weight is not None:
+            record["piece_weight"] = self.piece_weight
+        if self.density is not None:
+            record["density"] = self.density
+        nutrition = self.nutrition()
+        if nutrition or self.nutrition_layout is None:
+            record["nutrition"] = nutrition
+        if self.extra:
+            record.update(self.extra)
+        return record
+
+    def nutrition(self):
+        """The nutrition sections of the YAML layout, as read or with every section by default.
+
+        Sections missing from the layout are added when they were given values since.
+        """
+        layout = self.nutrition_layout
+        if layout is None:
+            return {name: {key: getattr(self, attribute) for key, attribute in keys.items()}
+                    for name, keys in NUTRITION_SECTIONS.items()}
+        nutrition = {}
+        for name, section in layout.items():
+            keys = NUTRITION_SECTIONS.get(name)
+            nutrition[name] = section if keys is None else self._section(keys, section)
+        for name, keys in NUTRITION_SECTIONS.items():
+            if name not in nutrition:
+                section = self._section(keys, None)
+                if section:
+                    nutrition[name] = section
+        return nutrition
+
+    def _section(self, keys, section):
+        """A known nutrition section laid out as read, with the values set since."""
+        values = {key: getattr(self, keys[key]) if key in keys else value
+                  for key, value in (section or {}).items()}
+        for key, attribute in keys.items():
+            if key not in values and getattr(self, attribute) is not None:
+                values[key] = getattr(self, attribute)
+        return values if values or section is not None else None
+
+    def nutrient_values(self):
+        """Nutrient values in the column order of matrix.NUTRIENTS."""
+        return (self.energy, self.carbohydrates, self.sugar, self.fat,
+                self.saturated, self.unsaturated, self.protein, self.salt)
+
+
+@dataclass(slots=True)
+class MealItem:
+    """An item of a meal and its amount."""
+
+    name: str
+    quantity: float | None = None
+    unit: str | None = None
+    extra: dict | None = None
+
+    FIELDS = frozenset(("name", "quantity", "unit"))
+
+    @classmethod
+    def from_dict(cls, record):
+        return cls(record["name"], record.get("quantity"), intern(record.get("unit")),
+                   extra_fields(record, cls.FIELDS))
+
+    def to_dict(self):
+        record = {"name": self.name, "quantity": self.quantity, "unit": self.unit}
+        if self.extra:
+            record.update(self.extra)
+        return record
+
+
+@dataclass(slots=True)
+class Meal:
+    """A meal made of catalogue items."""
+
+    name: str
+    items: list = field(default_factory=list)
+    extra: dict | None = None
+
+    FIELDS = frozenset(("name", "items"))
+
+    @classmethod
+    def from_dict(cls, record):
+        return cls(
+            name=record["name"],
+            items=[MealItem.from_dict(item) for item in record.get("items") or []],
+            extra=extra_fields(record, cls.FIELDS),
+        )
+
+    def to_dict(self):
+        record = {"name": self.name, "items": [item.to_dict() for item in self.items]}
+        if self.extra:
+            record.update(self.extra)
+        return record
+
+
+@dataclass(slots=True)
+class DietMeal:
+    """A meal of a diet, with the optional day and meal type."""
+
+    name: str
+    day: str | None = None
+    type: str | None = None
+    extra: dict | None = None
+
+    FIELDS = frozenset(("name", "day", "type"))
+
+    @classmethod
+    def from_dict(cls, record):
+        return cls(record["name"], intern(record.get("day")), intern(record.get("type")),
+                   extra_fields(record, cls.FIELDS))
+
+    def to_dict(self):
+        record = {"name": self.name}
+        if self.day is not None:
+            record["day"] = self.day
+        if self.type is not None:
+            record["type"] = self.type
+        if self.extra:
+            record.update(self.extra)
+        return record
+
+
+@dataclass(slots=True)
+class Diet:
+    """A diet plan made of meals."""
+
+    name: str
+    description: str | None = None
+    meals: list = field(default_factory=list)
+    extra: dict | None = None
+
+    FIELDS = frozenset(("name", "description", "meals"))
+
+    @classmethod
+    def from_dict(cls, record):
+        return cls(
+            name=record["name"],
+            description=record.get("description"),
+            meals=[DietMeal.from_dict(meal) for meal in record.get("meals") or []],
+            extra=extra_fields(record, cls.FIELDS),
+        )
+
+    def to_dict(self):
+        record = {"name": self.name}
+        if self.description is not None:
+            record["description"] = self.description
+        record["meals"] = [meal.to_dict() for meal in self.meals]
+        if self.extra:
+            record.update(self.extra)
+        return record
+
+
+# Record class of every dataset
+MODELS = {"item": Item, "meal": Meal, "diet": Diet}
+
+
+def from_records(identifier, records):
+    """Convert the YAML layout records of a dataset to model objects."""
+    from_dict = MODELS[identifier].from_dict
+    return [from_dict(record) for record in records]
+
+
+def to_records(records):
+    """Convert model objects back to the YAML layout."""
+    return [record.to_dict() for record in records]
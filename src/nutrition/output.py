@@ -0,0 +1,110 @@
+"""Machine-readable output of get and calculate commands: JSON, CSV or NDJSON.
+
+Records are written one at a time as they are produced. JSON output is one array of
+records, NDJSON one record per line and CSV a header followed by the flat rows of each
+record, as given by the command.
+"""
+import csv
+import json
+import sys
+
+from .matrix import NUTRIENT_COLUMNS, totals_to_vector
+
+FORMATS = ("text", "json", "csv", "ndjson")
+# Decimals of calculated values, as console.format_number shows them
+DIGITS = 2
+
+
+def add_format_argument(parser):
+    """Add the --format option to a get or calculate parser."""
+    parser.add_argument("--format", "-f", choices=FORMATS, default="text",
+                        help="Output format, text for people or json, csv and ndjson for other tools")
+
+
+def nutrient_row(totals):
+    """Flat nutrient columns of a totals dict, blank when there are none."""
+    if totals is None:
+        return dict.fromkeys(NUTRIENT_COLUMNS)
+    return dict(zip(NUTRIENT_COLUMNS, totals_to_vector(totals)))
+
+
+# CSV columns of totals tables (meal and diet calculate --all)
+TOTALS_COLUMNS = ["name", *NUTRIENT_COLUMNS, "skipped"]
+
+
+def totals_rows(entry):
+    """CSV row of a totals table entry with its 'name', 'totals' and 'skipped' count."""
+    return [{"name": entry["name"], **nutrient_row(entry["totals"]), "skipped": entry["skipped"]}]
+
+
+def round_floats(value, digits=DIGITS):
+    """Round the floats of a record, so sums such as 0.1 + 0.2 are written as 0.3."""
+    if isinstance(value, float):
+        return round(value, digits)
+    if isinstance(value, dict):
+        return {key: round_floats(item, digits) for key, item in value.items()}
+    if isinstance(value, list):
+        return [round_floats(item, digits) for item in value]
+    return value
+
+
+def report_error(message):
+    """Report an error on stderr, so it does not mix with the records on stdout."""
+    print(f"❌ {message}", file=sys.stderr)
+
+
+class RecordWriter:
+    """Write records to a stream in one of the machine-readable formats.
+
+    columns are the CSV columns and rows(record) returns the CSV rows of a record, as dicts;
+    JSON and NDJSON write to_json(record), the record itself by default. With digits the
+    floats of calculated records are rounded to that many decimals. Use as a context manager
+    to close the output.
+    """
+
+    def __init__(self, output_format, columns, rows, to_json=None, stream=None, digits=None):
+        self.format = output_format
+        self.columns = columns
+        self.rows = rows
+        self.to_json = to_json
+        self.stream = stream or sys.stdout
+        self.digits = digits
+        self.count = 0
+        if self.format == "csv":
+            self._csv = csv.DictWriter(self.stream, fieldnames=columns, extrasaction="ignore", lineterminator="\n")
+            self._csv.writeheader()
+        elif self.format == "json":
+            self.stream.write("[")
+
+    def write(self, record):
+        """Write one record."""
+        if self.format == "csv":
+            rows = self.rows(record)
+            self._csv.writerows(rows if self.digits is None else round_floats(rows, self.digits))
+        else:
+            data = self.to_json(record) if self.to_json else record
+            if self.digits is not None:
+                data = round_floats(data, self.digits)
+            encoded = json.dumps(data, default=str, ensure_ascii=False)
+            if self.format == "json":
+                self.stream.write(",\n" if self.count else "\n")
+            self.stream.write(encoded if self.format == "json" else f"{encoded}\n")
+        self.count += 1
+
+    def write_all(self, records):
+        """Write records as they are produced; returns the number written."""
+        for record in records:
+            self.write(record)
+        return self.count
+
+    def close(self):
+        """Finish the output."""
+        if self.format == "json":
+            self.stream.write("\n]\n" if self.count else "]\n")
+        self.stream.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
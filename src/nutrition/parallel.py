@@ -0,0 +1,63 @@
+"""Spread batch calculations over worker processes.
+
+Each worker receives the parsed datasets once, through the pool initializer, and builds its
+own DataContext (nutrient matrix and name indexes) from them. Work is sent in chunks of
+record indexes and the results are merged back in input order, along with the meal totals
+the workers calculated, so the parent does not calculate them again.
+"""
+from concurrent.futures import ProcessPoolExecutor
+
+from .loader import DataContext
+
+# Chunks per worker, more chunks balance uneven records better at a small messaging cost
+CHUNKS_PER_JOB = 4
+
+_context = None
+
+
+def init_worker(datasets, units):
+    """Build the data context of a worker process from the datasets and units shipped by the parent."""
+    global _context
+    _context = DataContext(datasets, units=units)
+
+
+def run_chunk(function, indexes):
+    """Apply function to a chunk of record indexes in a worker process.
+
+    Returns the results and the meal totals calculated for them (see MealTotalsCache.calculated).
+    """
+    results = [function(_context, idx) for idx in indexes]
+    return results, _context.meal_totals().calculated()
+
+
+def split(indexes, count):
+    """Split indexes into at most count contiguous chunks of similar size."""
+    size = max(1, -(-len(indexes) // count))
+    return [indexes[start:start + size] for start in range(0, len(indexes), size)]
+
+
+def map_records(function, indexes, context, identifiers, jobs=1):
+    """Return [function(context, idx) for idx in indexes], computed by `jobs` processes when above 1.
+
+    function must be a module level function so it can be sent to the workers, and identifiers
+    names the datasets it reads. Results are always in the order of indexes.
+    """
+    return list(imap_records(function, indexes, context, identifiers, jobs))
+
+
+def imap_records(function, indexes, context, identifiers, jobs=1):
+    """Like map_records, but yield the results in order as soon as they are computed."""
+    indexes = list(indexes)
+    if jobs <= 1 or len(indexes) < 2:
+        for idx in indexes:
+            yield function(context, idx)
+        return
+
+    datasets = {identifier: context.get(identifier) for identifier in identifiers}
+    chunks = split(indexes, jobs * CHUNKS_PER_JOB)
+    meal_totals = context.meal_totals()
+    with ProcessPoolExecutor(max_workers=min(jobs, len(chunks)), initializer=init_worker,
+                             initargs=(datasets, context.units())) as pool:
+        for chunk_results, totals in pool.map(run_chunk, [function] * len(chunks), chunks):
+            meal_totals.merge(totals, context)
+            yield from chunk_results
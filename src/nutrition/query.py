@@ -0,0 +1,188 @@
+"""Nutrient range queries over the item catalogue, e.g. 'protein>=20 and salt<0.5'.
+
+A query compares nutrient columns with numbers, combined with `and`, `or` and parentheses.
+Values are compared per 100 g, or per each item's own `per` basis when raw. With NumPy the
+comparisons are vectorized masks over the columns of the nutrient matrix; without it every
+comparison is one pass over its column, as building the columns is a pass over the catalogue
+anyway.
+"""
+import heapq
+import math
+import operator
+import re
+
+from .matrix import NUTRIENT_COLUMNS
+
+# Other names accepted for nutrient columns
+FIELD_ALIASES = {
+    "kcal": "energy",
+    "calories": "energy",
+    "carbs": "carbohydrates",
+    "carb": "carbohydrates",
+    "sugars": "sugar",
+    "sat": "saturated",
+    "unsat": "unsaturated",
+}
+OPERATORS = {
+    ">=": operator.ge,
+    "<=": operator.le,
+    ">": operator.gt,
+    "<": operator.lt,
+    "==": operator.eq,
+    "=": operator.eq,
+    "!=": operator.ne,
+}
+# Operator with the sides swapped, for comparisons written as 'number op field'
+FLIPPED = {">=": "<=", "<=": ">=", ">": "<", "<": ">", "==": "==", "=": "=", "!=": "!="}
+TOKEN = re.compile(r"\s*(?:(?P<number>-?(?:\d+(?:\.\d*)?|\.\d+))|(?P<op>>=|<=|==|!=|=|<|>)|(?P<paren>[()])|(?P<word>\w+))")
+
+
+def column_index(name):
+    """Column of a nutrient name or alias in the nutrient matrix; raises ValueError if unknown."""
+    name = FIELD_ALIASES.get(name.lower(), name.lower())
+    if name not in NUTRIENT_COLUMNS:
+        raise ValueError(f"Unknown nutrient '{name}', use one of: {', '.join(NUTRIENT_COLUMNS)}")
+    return NUTRIENT_COLUMNS.index(name)
+
+
+def tokenize(text):
+    """Split a query into (kind, text) tokens."""
+    tokens = []
+    position = 0
+    text = text.rstrip()
+    while position < len(text):
+        match = TOKEN.match(text, position)
+        if match is None or match.end() == position:
+            raise ValueError(f"Unexpected '{text[position:].strip()}' in query")
+        tokens.append((match.lastgroup, match.group(match.lastgroup)))
+        position = match.end()
+    return tokens
+
+
+def parse_query(text):
+    """Parse a query into nested ('and' | 'or', left, right) and ('compare', column, op, value) tuples.
+
+    `and` binds tighter than `or`. An empty query is None and matches every item.
+    """
+    tokens = tokenize(text)
+    if not tokens:
+        return None
+    position = 0
+
+    def peek():
+        return tokens[position] if position < len(tokens) else (None, None)
+
+    def take(kind=None):
+        nonlocal position
+        token = peek()
+        if token[0] is None or (kind is not None and token[0] != kind):
+            found = f"'{token[1]}'" if token[1] is not None else "end of query"
+            raise ValueError(f"Expected {kind or 'more'} in query, found {found}")
+        position += 1
+        return token[1]
+
+    def parse_or():
+        node = parse_and()
+        while peek() in (("word", "or"), ("word", "OR")):
+            take()
+            node = ("or", node, parse_and())
+        return node
+
+    def parse_and():
+        node = parse_term()
+        while peek() in (("word", "and"), ("word", "AND")):
+            take()
+            node = ("and", node, parse_term())
+        return node
+
+    def parse_term():
+        if peek() == ("paren", "("):
+            take()
+            node = parse_or()
+            if take("paren") != ")":
+                raise ValueError("Expected ')' in query")
+            return node
+        if peek()[0] == "number":
+            value = float(take())
+            op = FLIPPED[take("op")]
+            return ("compare", column_index(take("word")), op, value)
+        column = column_index(take("word"))
+        op = take("op")
+        return ("compare", column, op, float(take("number")))
+
+    node = parse_or()
+    if position < len(tokens):
+        raise ValueError(f"Unexpected '{tokens[position][1]}' in query")
+    return node
+
+
+class NutrientColumns:
+    """Nutrient columns of the catalogue, each item's values multiplied by its scale.
+
+    Missing values, and items whose scale is None (no conversion to the query basis), are NaN
+    and never match a comparison.
+    """
+
+    def __init__(self, matrix, scales):
+        self._np = np = matrix._np
+        self.rows = matrix.rows
+        if np is not None:
+            scale = np.array([math.nan if s is None else s for s in scales], dtype=np.float64)
+            self.values = matrix.values * scale[:, None]
+        else:
+            cols = matrix.cols
+            self.values = [
+                [value * scale if scale is not None else math.nan
+                 for value, scale in zip(matrix.values[j::cols], scales)]
+                for j in range(cols)
+            ]
+
+    def column(self, j):
+        """Values of column j, one per item."""
+        return self.values[:, j] if self._np is not None else self.values[j]
+
+    def row(self, i):
+        """Values of item i."""
+        if self._np is not None:
+            return self.values[i].tolist()
+        return [column[i] for column in self.values]
+
+    def evaluate(self, node):
+        """Rows matching a parsed query, in catalogue order."""
+        if node is None:
+            return list(range(self.rows))
+        matched = self._evaluate(node)
+        if self._np is not None:
+            return self._np.flatnonzero(matched).tolist()
+        return sorted(matched)
+
+    def _evaluate(self, node):
+        """Boolean mask (NumPy) or set of rows matching node."""
+        kind = node[0]
+        if kind == "and":
+            return self._evaluate(node[1]) & self._evaluate(node[2])
+        if kind == "or":
+            return self._evaluate(node[1]) | self._evaluate(node[2])
+        _, j, op, value = node
+        if self._np is not None:
+            column = self.values[:, j]
+            mask = OPERATORS[op](column, value)
+            return mask & ~self._np.isnan(column) if op == "!=" else mask
+        compare = OPERATORS[op]
+        # NaN never equals itself, so missing values are left out of != as well
+        return {i for i, v in enumerate(self.values[j]) if v == v and compare(v, value)}
+
+    def sort(self, rows, j, descending=False, limit=0):
+        """Order rows by their value in column j, missing values last; the first limit rows when given."""
+        column = self.column(j)
+        np = self._np
+        if np is not None:
+            rows = np.asarray(rows, dtype=np.intp)
+            order = np.argsort(-column[rows] if descending else column[rows], kind="stable")
+            return rows[order[:limit or None]].tolist()
+
+        sign = -1 if descending else 1
+        def key(i):
+            value = column[i]
+            return (False, sign * value) if value == value else (True, 0)
+        return heapq.nsmallest(limit, rows, key) if limit else sorted(rows, key=key)
@@ -0,0 +1,98 @@
+"""Trigram index of item names for fuzzy, ranked search.
+
+Names are split into words and every word padded as '  word ' is cut into trigrams, as
+PostgreSQL's pg_trgm does. Names are scored by word similarity, the share of the query
+trigrams found in the name, so the query is compared with its best matching words rather
+than the whole name: a typo such as 'chiken' still finds 'Chicken Breast'. Ties go to the
+similarity of the whole name (shared / union of the trigrams). The index is persisted in
+the cache folder next to the item file and rebuilt when the files of the item storage change.
+"""
+import heapq
+import re
+from array import array
+from collections import Counter
+from itertools import chain
+
+from .cache import cached_sources, sources_key
+
+INDEX_SUFFIX = "trigrams.pickle"
+WORD = re.compile(r"\w+")
+
+# Indexes loaded by this process, by first source file: (sources key, index)
+_loaded = {}
+
+
+def trigrams(text):
+    """Set of trigrams of the words of text."""
+    grams = set()
+    for word in WORD.findall(text.casefold()):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class TrigramIndex:
+    """Posting lists of the trigrams of record names, with the record types for filtering."""
+
+    def __init__(self, names, types):
+        self.names = list(names)
+        self.types = list(types)
+        self.sizes = array("I")
+        self.postings = {}
+        for i, name in enumerate(self.names):
+            grams = trigrams(name)
+            self.sizes.append(len(grams))
+            for gram in grams:
+                self.postings.setdefault(gram, array("I")).append(i)
+
+    def __len__(self):
+        return len(self.names)
+
+    def search(self, query, limit=10, threshold=0.5, record_type=None):
+        """Return (index, word similarity) of the best matches of query, best first.
+
+        Names containing the query rank first, then names by word similarity; other names
+        need a word similarity of at least threshold. record_type keeps records of that type
+        (ignoring case) and a limit of 0 returns every match.
+        """
+        grams = trigrams(query)
+        if not grams:
+            return []
+        # Trigrams in common with the query, for every name sharing at least one
+        shared_counts = Counter(chain.from_iterable(self.postings.get(gram, ()) for gram in grams))
+        folded = query.casefold().strip()
+        record_type = record_type.casefold() if record_type else None
+        # A name containing a query word of 3 letters or more shares its inner trigrams; shorter
+        # words may share none, e.g. 'ic' in 'Rice', so every name is checked for those
+        long_words = any(len(word) >= 3 for word in WORD.findall(folded))
+        candidates = shared_counts if long_words else range(len(self))
+
+        matches = []
+        for i in candidates:
+            if record_type is not None and (self.types[i] or "").casefold() != record_type:
+                continue
+            shared = shared_counts.get(i, 0)
+            score = shared / len(grams)
+            contains = folded in self.names[i].casefold()
+            if contains or score >= threshold:
+                similarity = shared / (len(grams) + self.sizes[i] - shared)
+                matches.append((contains, score, similarity, -i))
+        best = heapq.nlargest(limit, matches) if limit else sorted(matches, reverse=True)
+        return [(-i, score) for _, score, _, i in best]
+
+
+def load_trigram_index(storage):
+    """Trigram index of the records of a storage backend, rebuilt only when its files change."""
+    sources = storage.sources()
+    key = sources_key(sources)
+    loaded = _loaded.get(sources[0])
+    if loaded is not None and loaded[0] == key:
+        return loaded[1]
+
+    def build():
+        records = storage.load()
+        return TrigramIndex((record["name"] for record in records), (record.get("type") for record in records))
+
+    index = cached_sources(sources, build, INDEX_SUFFIX)
+    _loaded[sources[0]] = (key, index)
+    return index
@@ -0,0 +1,2 @@
+# Only the client is imported here, it runs before every forwarded command and must stay light
+from .client import FORWARDED, forward, request
@@ -0,0 +1,242 @@
+import asyncio
+import json
+import re
+import signal
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from urllib.parse import parse_qsl, urlsplit
+
+from ..console import print_info, print_success
+from ..diet.calculate import compute_diet, compute_diets
+from ..diet.get_diet import resolve_diet
+from ..loader import current_context, get_data_config
+from ..meal.calculate import compute_meal, compute_meals
+from ..meal.get_meal import resolve_meal
+from .serve import ServerState
+
+# Largest request body accepted, in bytes
+MAX_BODY = 16 * 1024 * 1024
+# Errors caused by the parameters of a request, such as a name that is not a valid regex
+CLIENT_ERRORS = (re.error, ValueError)
+
+
+def serve_http(host="127.0.0.1", port=8080):
+    """Serve the JSON API over HTTP until interrupted, reloading data files when they change."""
+    state = ServerState()
+    state.refresh()
+    print_success(f"Serving configuration '{get_data_config()['name']}' on http://{host}:{port}")
+    try:
+        asyncio.run(run_http(host, port, state))
+    except KeyboardInterrupt:
+        pass
+    print_info("Server stopped")
+
+
+async def run_http(host, port, state, ready=None):
+    """Accept connections until SIGINT or SIGTERM.
+
+    ready is called with the port listened on once connections are accepted, which is
+    how callers learn the port chosen for port 0.
+    """
+    # Calculations run one at a time on a worker thread: the event loop keeps accepting
+    # and reading requests while they run, and the shared data context is never used
+    # by two calculations at once
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="nutrition-api")
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(signum, stop.set)
+        except (NotImplementedError, RuntimeError):
+            # Not supported on Windows, Ctrl+C raises KeyboardInterrupt instead
+            pass
+
+    async def handle(reader, writer):
+        await handle_connection(reader, writer, executor, state)
+
+    server = await asyncio.start_server(handle, host, port)
+    if ready is not None:
+        ready(server.sockets[0].getsockname()[1])
+    try:
+        async with server:
+            await stop.wait()
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def handle_connection(reader, writer, executor, state):
+    """Answer the HTTP/1.1 requests of one connection, keeping it open between requests."""
+    loop = asyncio.get_running_loop()
+    try:
+        while True:
+            request_line = await reader.readline()
+            if not request_line.strip():
+                break
+            try:
+                method, target, version = request_line.decode("latin-1").split()
+            except ValueError:
+                await send(writer, HTTPStatus.BAD_REQUEST, {"error": "Malformed request line"}, False)
+                break
+
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if not line.strip():
+                    break
+                key, _, value = line.decode("latin-1").partition(":")
+                headers[key.strip().lower()] = value.strip()
+
+            length = int(headers.get("content-length") or 0)
+            if length > MAX_BODY:
+                await send(writer, HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {"error": "Request body too large"}, False)
+                break
+            body = await reader.readexactly(length) if length else b""
+
+            status, payload = await loop.run_in_executor(executor, dispatch, state, method, target, body)
+            keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+            await send(writer, status, payload, keep_alive)
+            if not keep_alive:
+                break
+    except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+        pass
+    finally:
+        writer.close()
+
+
+async def send(writer, status, payload, keep_alive):
+    """Write a JSON response."""
+    body = json.dumps(payload, default=str).encode("utf-8")
+    head = (
+        f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+        "Content-Type: application/json; charset=utf-8\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+        "\r\n"
+    )
+    writer.write(head.encode("latin-1") + body)
+    await writer.drain()
+
+
+def dispatch(state, method, target, body):
+    """Route one request; returns (status, payload). Runs on the worker thread."""
+    url = urlsplit(target)
+    route = find_route(url.path)
+    if route is None:
+        return HTTPStatus.NOT_FOUND, {"error": f"No endpoint at '{url.path}'"}
+    if method != route[0]:
+        return HTTPStatus.METHOD_NOT_ALLOWED, {"error": f"Use {route[0]} for '{url.path}'"}
+
+    try:
+        data = json.loads(body) if body else None
+    except ValueError:
+        return HTTPStatus.BAD_REQUEST, {"error": "Request body is not valid JSON"}
+
+    try:
+        state.refresh()
+        status, payload = route[1](dict(parse_qsl(url.query)), data)
+        # Calculations only memoize meal totals, persisting them is up to the server
+        current_context().meal_totals().save()
+        return status, payload
+    except SystemExit:
+        # Raised by get_config when there is no usable configuration
+        return HTTPStatus.INTERNAL_SERVER_ERROR, {"error": "No usable nutrition configuration"}
+    except CLIENT_ERRORS as e:
+        return HTTPStatus.BAD_REQUEST, {"error": str(e)}
+    except Exception as e:
+        traceback.print_exc()
+        return HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(e)}
+
+
+def find_route(path):
+    """(method, endpoint) of a path, ignoring trailing slashes; None if there is none."""
+    return ROUTES.get(path.rstrip("/") or "/")
+
+
+def is_set(value):
+    """Whether a query flag such as `all=1` is set."""
+    return str(value).lower() in ("1", "true", "yes", "on")
+
+
+def get_records(identifier, key):
+    """Endpoint listing the records of a dataset whose name matches the `name` pattern."""
+    def route(params, _data):
+        context = current_context()
+        records = context.get(identifier)[0]
+        matched_idx = context.index(identifier).search(params.get("name", ""))
+        return HTTPStatus.OK, {"count": len(matched_idx), key: [records[i].to_dict() for i in matched_idx]}
+    return route
+
+
+def calculate_meal(params, _data):
+    """Nutrition of one meal, or a totals table when `all` is set or the name matches several meals."""
+    context = current_context()
+    name = params.get("name", "")
+    if not is_set(params.get("all")) and not name:
+        return HTTPStatus.BAD_REQUEST, {"error": "Give the name of a meal to calculate, or set all=1"}
+    if is_set(params.get("all")) or context.index("meal").several(name):
+        return HTTPStatus.OK, {"meals": compute_meals("" if is_set(params.get("all")) else name, context)}
+
+    idx = resolve_meal(name, context)
+    if idx is None:
+        return HTTPStatus.NOT_FOUND, {"error": f"Meal '{name}' not found"}
+    return HTTPStatus.OK, {"meal": compute_meal(context.meals[idx], context)}
+
+
+def calculate_diet(params, _data):
+    """Nutrition of one diet, or a totals table when `all` is set or the name matches several diets."""
+    context = current_context()
+    name = params.get("name", "")
+    if not is_set(params.get("all")) and not name:
+        return HTTPStatus.BAD_REQUEST, {"error": "Give the name of a diet to calculate, or set all=1"}
+    if is_set(params.get("all")) or context.index("diet").several(name):
+        return HTTPStatus.OK, {"diets": compute_diets("" if is_set(params.get("all")) else name, context)}
+
+    idx = resolve_diet(name, context)
+    if idx is None:
+        return HTTPStatus.NOT_FOUND, {"error": f"Diet '{name}' not found"}
+    return HTTPStatus.OK, {"diet": compute_diet(context.diets[idx], context, detailed=not is_set(params.get("summary")))}
+
+
+def batch(_params, data):
+    """Run several GET endpoints in one request.
+
+    The body is {"requests": [{"path": "/meals/calculate", "params": {"name": "Breakfast"}}, ...]}
+    and the answer holds one {"status", "body"} entry per request, in the same order.
+    """
+    requests = (data or {}).get("requests") if isinstance(data, dict) else None
+    if not isinstance(requests, list):
+        return HTTPStatus.BAD_REQUEST, {"error": "Expected a JSON object with a 'requests' list"}
+
+    results = []
+    for request in requests:
+        route = find_route(str(request.get("path", ""))) if isinstance(request, dict) else None
+        if route is None or route[0] != "GET":
+            status, payload = HTTPStatus.BAD_REQUEST, {"error": "Each request needs the 'path' of a GET endpoint"}
+        else:
+            params = {key: str(value) for key, value in (request.get("params") or {}).items()}
+            try:
+                status, payload = route[1](params, None)
+            except CLIENT_ERRORS as e:
+                status, payload = HTTPStatus.BAD_REQUEST, {"error": str(e)}
+            except Exception as e:
+                status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(e)}
+        results.append({"status": status.value, "body": payload})
+    return HTTPStatus.OK, {"results": results}
+
+
+def index(_params, _data):
+    """List the endpoints."""
+    return HTTPStatus.OK, {"endpoints": [f"{method} {path}" for path, (method, _) in ROUTES.items()]}
+
+
+# Path: (method, endpoint)
+ROUTES = {
+    "/": ("GET", index),
+    "/items": ("GET", get_records("item", "items")),
+    "/meals": ("GET", get_records("meal", "meals")),
+    "/diets": ("GET", get_records("diet", "diets")),
+    "/meals/calculate": ("GET", calculate_meal),
+    "/diets/calculate": ("GET", calculate_diet),
+    "/batch": ("POST", batch),
+}
@@ -0,0 +1,57 @@
+import json
+import os
+import socket
+import sys
+
+from ..vars import FORWARD_CONNECT_TIMEOUT, FORWARD_TIMEOUT, SOCKET_FILE
+
+# Commands the daemon answers; everything else runs in the calling process
+FORWARDED = {
+    ("item", "get"),
+    ("item", "search"),
+    ("item", "query"),
+    ("meal", "get"),
+    ("meal", "calculate"),
+    ("diet", "get"),
+    ("diet", "calculate"),
+}
+
+
+def request(message, socket_file=SOCKET_FILE, timeout=FORWARD_TIMEOUT, connect_timeout=FORWARD_CONNECT_TIMEOUT):
+    """Send one JSON message to the server and return its JSON answer.
+
+    Returns None if no server is running, or it does not accept the connection within
+    connect_timeout, stalls for more than timeout seconds while answering or sends an answer
+    that is not valid JSON.
+    """
+    if not hasattr(socket, "AF_UNIX") or not os.path.exists(socket_file):
+        return None
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+            connection.settimeout(min(connect_timeout, timeout))
+            connection.connect(socket_file)
+            connection.settimeout(timeout)
+            connection.sendall(json.dumps(message).encode("utf-8"))
+            connection.shutdown(socket.SHUT_WR)
+            with connection.makefile("rb") as answer:
+                data = answer.read()
+        return json.loads(data) if data else None
+    except (OSError, ValueError):
+        # ValueError: a truncated or garbled answer
+        return None
+
+
+def forward(argv, socket_file=SOCKET_FILE, timeout=FORWARD_TIMEOUT):
+    """Run a command line on the server and print its output; returns False to run it locally.
+
+    Commands the server does not answer in time run locally as well, they only read data.
+    """
+    answer = request({"command": "run", "argv": list(argv)}, socket_file, timeout)
+    if answer is None or answer.get("fallback"):
+        return False
+    sys.stdout.write(answer["stdout"])
+    sys.stderr.write(answer["stderr"])
+    sys.stdout.flush()
+    if answer["status"]:
+        sys.exit(answer["status"])
+    return True
@@ -0,0 +1,194 @@
+import contextlib
+import io
+import json
+import os
+import signal
+import socket
+import socketserver
+import traceback
+
+from ..console import print_error, print_info, print_success
+from ..loader import DataContext, get_data_config, get_storage, reset_data_config, share_context
+from ..vars import SETTINGS_FILE, SOCKET_FILE
+from .client import FORWARDED, request
+
+
+def configure_serve_parser(parser):
+    """Configure arguments for serve command"""
+    parser.add_argument("--socket", default=SOCKET_FILE, help=f"Unix socket to listen on (default: {SOCKET_FILE})")
+    action = parser.add_mutually_exclusive_group()
+    action.add_argument("--stop", action="store_true", help="Stop the running server")
+    action.add_argument("--status", action="store_true", help="Show whether a server is running")
+    action.add_argument("--http", type=int, metavar="PORT", help="Serve the JSON API over HTTP on PORT instead")
+    parser.add_argument("--host", default="127.0.0.1", help="Address of the HTTP API (default: 127.0.0.1)")
+    parser.set_defaults(func=handle_serve)
+
+
+def handle_serve(args):
+    """Handle serve command"""
+    if args.stop:
+        stop_server(args.socket)
+    elif args.status:
+        server_status(args.socket)
+    elif args.http is not None:
+        # Imported here, the API needs the calculation modules and asyncio
+        from .api import serve_http
+        serve_http(args.host, args.http)
+    else:
+        serve(args.socket)
+
+
+def serve(socket_file=SOCKET_FILE):
+    """Answer get/calc commands from memory until stopped, reloading data files when they change."""
+    if not hasattr(socket, "AF_UNIX"):
+        print_error("'nut serve' needs Unix domain sockets, which this platform does not support")
+        return
+    if request({"command": "status"}, socket_file, timeout=5) is not None:
+        print_error(f"A server is already listening on {socket_file}")
+        return
+    if os.path.exists(socket_file):
+        # Left behind by a server that did not shut down cleanly
+        os.remove(socket_file)
+
+    state = ServerState()
+    state.refresh()
+    server = CommandServer(socket_file, state)
+    # Stop cleanly on `kill` as well as on Ctrl+C
+    signal.signal(signal.SIGTERM, lambda *_: server.stop())
+    print_success(f"Serving configuration '{get_data_config()['name']}' on {socket_file}")
+    try:
+        while not server.stopping:
+            server.handle_request()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if os.path.exists(socket_file):
+            os.remove(socket_file)
+        share_context(None)
+    print_info("Server stopped")
+
+
+def stop_server(socket_file=SOCKET_FILE):
+    """Ask the server listening on socket_file to stop."""
+    if request({"command": "stop"}, socket_file, timeout=5) is None:
+        print_info(f"No server is listening on {socket_file}")
+    else:
+        print_success(f"Stopped the server on {socket_file}")
+
+
+def server_status(socket_file=SOCKET_FILE):
+    """Print whether a server is listening on socket_file and what it serves."""
+    status = request({"command": "status"}, socket_file, timeout=5)
+    if status is None:
+        print_info(f"No server is listening on {socket_file}")
+    else:
+        print_success(f"Server (pid {status['pid']}) is serving configuration '{status['config']}' "
+                      f"on {socket_file}, {status['requests']} requests answered")
+
+
+class ServerState:
+    """The shared data context of the server and the signature of the files it was loaded from."""
+
+    def __init__(self):
+        self.settings = None
+        self.data = None
+        self.requests = 0
+
+    def refresh(self):
+        """Start a new data context if the settings or any data file changed since the last request."""
+        settings = file_signature([SETTINGS_FILE])
+        if settings != self.settings:
+            # The active configuration may have changed, read it again
+            self.settings = settings
+            self.data = None
+            reset_data_config()
+        data = file_signature(watched_files())
+        if data != self.data:
+            self.data = data
+            # The server keeps the whole catalogue in memory
+            share_context(DataContext(stream_items=False))
+
+
+def watched_files():
+    """Files of every dataset in the current configuration."""
+    files = []
+    for identifier in ("item", "meal", "diet"):
+        files.extend(get_storage(identifier).sources())
+    return files
+
+
+def file_signature(files):
+    """(path, mtime, size) of every file, None for missing files."""
+    signature = []
+    for path in files:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            signature.append((path, None))
+        else:
+            signature.append((path, stat.st_mtime_ns, stat.st_size))
+    return signature
+
+
+class CommandServer(socketserver.UnixStreamServer):
+    """Unix socket server answering one request at a time, so commands can share the data context."""
+
+    def __init__(self, socket_file, state):
+        super().__init__(socket_file, CommandHandler)
+        self.state = state
+        self.stopping = False
+
+    def stop(self):
+        self.stopping = True
+
+
+class CommandHandler(socketserver.StreamRequestHandler):
+    """Read one JSON request and write one JSON answer."""
+
+    def handle(self):
+        message = json.loads(self.rfile.read() or "{}")
+        command = message.get("command")
+        if command == "run":
+            answer = run_command(message.get("argv") or [], self.server.state)
+        elif command == "status":
+            answer = {
+                "pid": os.getpid(),
+                "config": get_data_config()["name"],
+                "requests": self.server.state.requests,
+            }
+        elif command == "stop":
+            self.server.stop()
+            answer = {"stopped": True}
+        else:
+            answer = {"fallback": True}
+        self.wfile.write(json.dumps(answer).encode("utf-8"))
+
+
+def run_command(argv, state):
+    """Run a forwarded command line against the shared data context and capture its output.
+
+    Returns the captured 'stdout', 'stderr' and exit 'status', or 'fallback' when the command
+    is not served here or fails unexpectedly, so the client runs it by itself.
+    """
+    # Imported here, cli imports this package to forward commands
+    from ..cli import build_parser, find_command
+
+    if find_command(argv) not in FORWARDED:
+        return {"fallback": True}
+
+    stdout, stderr = io.StringIO(), io.StringIO()
+    status = 0
+    try:
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            try:
+                state.refresh()
+                args = build_parser(argv).parse_args(argv)
+                args.func(args)
+            except SystemExit as exit_:
+                status = exit_.code if isinstance(exit_.code, int) else int(exit_.code is not None)
+    except Exception:
+        traceback.print_exc()
+        return {"fallback": True}
+    state.requests += 1
+    return {"stdout": stdout.getvalue(), "stderr": stderr.getvalue(), "status": status}
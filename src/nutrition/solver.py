@@ -0,0 +1,241 @@
+"""Linear programs for item quantities that meet nutrient ranges, solved offline.
+
+Every target range [low, high] of a nutrient becomes rows of the program, scaled by the size
+of the target so that kcal and grams weigh alike:
+
+    sum(a_i * x_i) + short  - surplus = low      (when low > 0)
+    sum(a_i * x_i) - excess + slack   = high     (when high is finite)
+
+with the quantities x_i between 0 and an optional maximum. Minimizing short + excess gives
+the closest quantities to the targets; minimizing the total quantity with short and excess
+fixed at zero gives the lightest quantities that meet them. The deviation variables and
+slacks are a feasible starting basis, so no artificial variables are needed.
+
+SciPy's HiGHS solver is used when SciPy is installed, otherwise a bounded-variable primal
+simplex on a dense tableau. The tableau has one row per target bound and is cheap to pivot
+for hundreds of candidate items.
+"""
+import math
+
+OBJECTIVES = ("deviation", "weight")
+SOLVERS = ("auto", "simplex", "scipy")
+# Pivot and optimality tolerance of the simplex
+EPSILON = 1e-9
+# Cost of a unit of quantity when minimizing deviation, so ties go to the lighter quantities
+TIE_BREAK = 1e-6
+# Largest relative deviation still counted as meeting the targets
+FEASIBILITY = 1e-6
+
+_scipy = False
+
+
+def get_scipy():
+    """Return scipy.optimize, or None if SciPy is not installed; imported on first use."""
+    global _scipy
+    if _scipy is False:
+        try:
+            from scipy import optimize
+        except ImportError:
+            optimize = None
+        _scipy = optimize
+    return _scipy
+
+
+class BoundedSimplex:
+    """Primal simplex for min c.x subject to A x = b and 0 <= x <= upper.
+
+    Nonbasic variables sit at one of their bounds, so upper bounds need no rows of their own.
+    basis holds, for every row, a column that is a unit vector with +1 in that row and whose
+    value b makes a feasible start.
+    """
+
+    def __init__(self, rows, rhs, upper, basis):
+        self.tableau = [[float(value) for value in row] for row in rows]
+        self.upper = list(upper)
+        self.basis = list(basis)
+        self.values = [0.0] * len(self.upper)
+        self.at_upper = [False] * len(self.upper)
+        for r, column in enumerate(self.basis):
+            self.values[column] = float(rhs[r])
+        self.iterations = 0
+
+    def minimize(self, costs, max_iterations=10000):
+        """Move to an optimal vertex for costs, starting from the current one; returns the objective."""
+        tableau, values, upper, at_upper, basis = self.tableau, self.values, self.upper, self.at_upper, self.basis
+        reduced = list(costs)
+        for r, column in enumerate(basis):
+            cost = costs[column]
+            if cost:
+                reduced = [d - cost * a for d, a in zip(reduced, tableau[r])]
+        degenerate = False
+
+        for _ in range(max_iterations):
+            basic = set(basis)
+            entering, direction, best = None, 0, EPSILON
+            for j, d in enumerate(reduced):
+                if j in basic or upper[j] <= 0:
+                    continue
+                gain = d if at_upper[j] else -d
+                if gain > best:
+                    entering, direction, best = j, (-1 if at_upper[j] else 1), gain
+                    # Bland's rule, the first improving column, after a degenerate step to avoid cycling
+                    if degenerate:
+                        break
+            if entering is None:
+                break
+            self.iterations += 1
+
+            # Ratio test: the entering variable moves by step until a basic variable or itself hits a bound
+            step, leaving, to_upper = upper[entering], None, False
+            for r, row in enumerate(tableau):
+                change = -direction * row[entering]
+                if abs(change) < EPSILON:
+                    continue
+                column = basis[r]
+                if change < 0:
+                    limit, bound = values[column] / -change, False
+                elif upper[column] < math.inf:
+                    limit, bound = (upper[column] - values[column]) / change, True
+                else:
+                    continue
+                if limit < step - EPSILON or (leaving is not None and limit <= step + EPSILON and column < basis[leaving]):
+                    step, leaving, to_upper = max(limit, 0.0), r, bound
+            if step == math.inf:
+                raise ValueError("The program is unbounded")
+            degenerate = step <= EPSILON
+
+            for r, row in enumerate(tableau):
+                values[basis[r]] -= direction * row[entering] * step
+            values[entering] += direction * step
+            if leaving is None:
+                at_upper[entering] = not at_upper[entering]
+                values[entering] = upper[entering] if at_upper[entering] else 0.0
+                continue
+
+            column = basis[leaving]
+            values[column] = upper[column] if to_upper else 0.0
+            at_upper[column] = to_upper
+            at_upper[entering] = False
+            basis[leaving] = entering
+            self._pivot(leaving, entering, reduced)
+        else:
+            raise ValueError(f"The simplex did not converge in {max_iterations} iterations")
+
+        return sum(cost * value for cost, value in zip(costs, values))
+
+    def _pivot(self, r, j, reduced):
+        """Make column j the unit vector of row r, updating the reduced costs in place."""
+        tableau = self.tableau
+        pivot_row = tableau[r]
+        pivot = pivot_row[j]
+        pivot_row = tableau[r] = [a / pivot for a in pivot_row]
+        for i, row in enumerate(tableau):
+            factor = row[j]
+            if i != r and factor:
+                tableau[i] = [a - factor * p for a, p in zip(row, pivot_row)]
+        factor = reduced[j]
+        if factor:
+            reduced[:] = [d - factor * p for d, p in zip(reduced, pivot_row)]
+
+
+def build_program(coefficients, targets, max_quantity=None):
+    """Rows of the target program for n items.
+
+    coefficients holds one list per target with the amount of that nutrient in a unit of
+    every item, targets the (low, high) range of every target. Returns (rows, rhs, upper,
+    basis, deviations), deviations being the columns of the short and excess variables.
+    """
+    n = len(coefficients[0]) if coefficients else 0
+    specs = []
+    for values, (low, high) in zip(coefficients, targets):
+        scale = 1.0 / (high if high < math.inf and high > 0 else max(low, 1.0))
+        scaled = [value * scale for value in values]
+        if low > 0:
+            specs.append((scaled, low * scale, 1.0))
+        if high < math.inf:
+            specs.append((scaled, high * scale, -1.0))
+
+    # Columns: the n items, then a deviation and a slack per row
+    width = n + 2 * len(specs)
+    rows, rhs, basis, deviations = [], [], [], []
+    for r, (scaled, bound, sign) in enumerate(specs):
+        row = scaled + [0.0] * (width - n)
+        deviation, slack = n + 2 * r, n + 2 * r + 1
+        # Lower bound rows start from the shortfall, upper bound rows from the slack
+        row[deviation] = sign
+        row[slack] = -sign
+        rows.append(row)
+        rhs.append(bound)
+        basis.append(deviation if sign > 0 else slack)
+        deviations.append(deviation)
+
+    cap = math.inf if max_quantity is None else float(max_quantity)
+    upper = [cap] * n + [math.inf] * (width - n)
+    return rows, rhs, upper, basis, deviations
+
+
+def solve_targets(coefficients, targets, objective="deviation", max_quantity=None, solver="auto"):
+    """Quantities of n items whose nutrients fall in the target ranges, or as close as possible.
+
+    See build_program for coefficients and targets. Returns a dict with the 'quantities',
+    the scaled 'deviation' from the targets, whether the targets are 'feasible' and the
+    'solver' used; raises ValueError on unknown solvers or a program that cannot be solved.
+    """
+    if solver not in SOLVERS:
+        raise ValueError(f"Unknown solver '{solver}', use one of: {', '.join(SOLVERS)}")
+    if objective not in OBJECTIVES:
+        raise ValueError(f"Unknown objective '{objective}', use one of: {', '.join(OBJECTIVES)}")
+    if solver == "scipy" and get_scipy() is None:
+        raise ValueError("The scipy solver needs SciPy, install it or use --solver simplex")
+    use_scipy = solver == "scipy" or (solver == "auto" and get_scipy() is not None)
+
+    rows, rhs, upper, basis, deviations = build_program(coefficients, targets, max_quantity)
+    n = len(coefficients[0]) if coefficients else 0
+    width = len(upper)
+    costs = [0.0] * width
+    for column in deviations:
+        costs[column] = 1.0
+    quantity_costs = [1.0 if j < n else 0.0 for j in range(width)]
+    if objective == "deviation":
+        costs[:n] = [TIE_BREAK] * n
+    solve = _solve_scipy if use_scipy else _solve_simplex
+    values = solve(rows, rhs, upper, basis, costs, deviations, quantity_costs if objective == "weight" else None)
+
+    deviation = sum(values[column] for column in deviations)
+    return {
+        'quantities': [max(value, 0.0) for value in values[:n]],
+        'deviation': deviation,
+        'feasible': deviation <= FEASIBILITY,
+        'solver': "scipy" if use_scipy else "simplex",
+    }
+
+
+def _solve_simplex(rows, rhs, upper, basis, costs, deviations, weight_costs):
+    """Solve with BoundedSimplex; a second phase minimizes weight_costs with no deviation when given."""
+    simplex = BoundedSimplex(rows, rhs, upper, basis)
+    deviation = simplex.minimize(costs)
+    if weight_costs is not None and deviation <= FEASIBILITY:
+        for column in deviations:
+            simplex.upper[column] = 0.0
+            simplex.values[column] = 0.0
+        simplex.minimize(weight_costs)
+    return simplex.values
+
+
+def _solve_scipy(rows, rhs, upper, basis, costs, deviations, weight_costs):
+    """Solve with scipy.optimize.linprog (HiGHS); same phases as _solve_simplex."""
+    linprog = get_scipy().linprog
+    bounds = [(0.0, None if bound == math.inf else bound) for bound in upper]
+
+    def run(objective, bounds):
+        result = linprog(objective, A_eq=rows or None, b_eq=rhs or None, bounds=bounds, method="highs")
+        if result.status != 0:
+            raise ValueError(f"SciPy could not solve the program: {result.message}")
+        return result
+
+    result = run(costs, bounds)
+    if weight_costs is not None and sum(result.x[column] for column in deviations) <= FEASIBILITY:
+        for column in deviations:
+            bounds[column] = (0.0, 0.0)
+        result = run(weight_costs, bounds)
+    return result.x.tolist()
@@ -0,0 +1,17 @@
+from .yaml_store import YamlStore
+from .journal_store import JournalStore
+from .sqlite_store import SqliteStore
+
+STORAGE_BACKENDS = ["yaml", "journal", "sqlite"]
+
+
+def open_storage(config, identifier):
+    """Open the storage backend of a dataset ('item', 'meal' or 'diet') in a configuration."""
+    backend = config.get("storage", "yaml")
+    if backend == "yaml":
+        return YamlStore(config[identifier])
+    if backend == "journal":
+        return JournalStore(config[identifier])
+    if backend == "sqlite":
+        return SqliteStore(config["database"], identifier)
+    raise ValueError(f"Unknown storage backend '{backend}' in configuration '{config['name']}'")
@@ -0,0 +1,195 @@
+import bisect
+import json
+import os
+from collections import Counter
+
+from ..cache import read_cache, write_cache, sources_key
+from ..utils import file_lock, save_data, iter_records, select_records
+from ..vars import CACHE_ENABLED
+from .yaml_store import YamlStore
+
+NAMES_SUFFIX = "names.pickle"
+
+
+class JournalStore(YamlStore):
+    """Dataset kept as a YAML snapshot plus an append-only journal of changes.
+
+    Every change appends one JSON line to `<file>.journal`, so single-record writes do not
+    rewrite the catalogue. Loads replay the journal over the snapshot, and compact() folds
+    the journal back into the YAML file. Writes check names against a count of the live
+    names kept in the cache folder, read and updated under the file lock.
+    """
+
+    def __init__(self, file):
+        super().__init__(file)
+        self.journal = f"{file}.journal"
+
+    def sources(self):
+        """Files holding the dataset, watched for changes by `nut serve`."""
+        return [self.file, self.journal]
+
+    def load(self):
+        """Load the snapshot and replay the journal over it."""
+        return replay(super().load(), read_journal(self.journal))
+
+    def find(self, names):
+        """Return the first record called each of names, streaming the snapshot instead of loading it."""
+        entries = read_journal(self.journal)
+        # Records renamed by the journal are needed under their old names too
+        wanted = set(names)
+        for entry in reversed(entries):
+            if entry["op"] == "update" and entry["record"]["name"] in wanted:
+                wanted.add(entry["name"])
+        snapshot = (record for record in iter_records(self.file) if record["name"] in wanted)
+        return select_records(replay(snapshot, entries), names)
+
+    def add(self, record):
+        """Append a record."""
+        with file_lock(self.file):
+            names = self._names()
+            self._append({"op": "add", "record": record})
+            names[record["name"]] += 1
+            self._save_names(names)
+
+    def update(self, name, record):
+        """Replace the record called name; returns False if it does not exist."""
+        with file_lock(self.file):
+            names = self._names()
+            if not names[name]:
+                return False
+            self._append({"op": "update", "name": name, "record": record})
+            rename(names, name, record["name"])
+            self._save_names(names)
+        return True
+
+    def upsert(self, records):
+        """Add records, replacing existing records with the same name, in a single journal write.
+
+        Returns the number of (added, updated) records.
+        """
+        with file_lock(self.file):
+            names = self._names()
+            entries = []
+            for record in records:
+                if names[record["name"]]:
+                    entries.append({"op": "update", "name": record["name"], "record": record})
+                else:
+                    names[record["name"]] += 1
+                    entries.append({"op": "add", "record": record})
+            if entries:
+                self._append(*entries)
+                self._save_names(names)
+        added = sum(1 for entry in entries if entry["op"] == "add")
+        return added, len(entries) - added
+
+    def remove(self, name):
+        """Remove the record called name; returns the removed record or None."""
+        with file_lock(self.file):
+            names = self._names()
+            if not names[name]:
+                return None
+            # Only read back when the name exists, to return the removed record
+            removed = select_records(self.load(), [name])[0]
+            self._append({"op": "remove", "name": name})
+            rename(names, name, None)
+            self._save_names(names)
+        return removed
+
+    def clear(self):
+        """Remove all records."""
+        with file_lock(self.file):
+            self._append({"op": "clear"})
+            self._save_names(Counter())
+
+    def replace(self, records):
+        """Replace all records and drop the journal."""
+        with file_lock(self.file):
+            save_data(records, self.file)
+            if os.path.exists(self.journal):
+                os.remove(self.journal)
+            self._save_names(Counter(record["name"] for record in records))
+
+    def compact(self):
+        """Fold the journal into the YAML snapshot; returns the number of entries folded."""
+        with file_lock(self.file):
+            entries = read_journal(self.journal)
+            if not entries:
+                return 0
+            names = self._names()
+            save_data(replay(super().load(), entries), self.file)
+            os.remove(self.journal)
+            self._save_names(names)
+        return len(entries)
+
+    def _names(self):
+        """Count of the live records by name; the caller holds the file lock.
+
+        Rebuilt from the snapshot and journal when the files changed since it was saved.
+        """
+        names = read_cache(self.file, sources_key(self.sources()), NAMES_SUFFIX) if CACHE_ENABLED else None
+        if names is None:
+            names = Counter(record["name"] for record in self.load())
+        return names
+
+    def _save_names(self, names):
+        """Keep the name counts for the files as they are now; the caller holds the file lock."""
+        if CACHE_ENABLED:
+            write_cache(self.file, sources_key(self.sources()), names, NAMES_SUFFIX)
+
+    def _append(self, *entries):
+        """Append entries to the journal; the caller holds the file lock."""
+        lines = "".join(json.dumps(entry, ensure_ascii=False) + "\n" for entry in entries)
+        with open(self.journal, "a", encoding="utf-8") as journal:
+            journal.write(lines)
+            journal.flush()
+            os.fsync(journal.fileno())
+
+
+def rename(names, name, new_name):
+    """Move one record from name to new_name (None when removed) in the name counts."""
+    names[name] -= 1
+    if not names[name]:
+        del names[name]
+    if new_name is not None:
+        names[new_name] += 1
+
+
+def read_journal(journal):
+    """Read the journal entries, ignoring a partially written last line."""
+    if not os.path.exists(journal):
+        return []
+    entries = []
+    with open(journal, "r", encoding="utf-8") as file:
+        for line in file:
+            try:
+                entries.append(json.loads(line))
+            except json.JSONDecodeError:
+                break
+    return entries
+
+
+def replay(records, entries):
+    """Apply journal entries to a list of records and return the resulting list."""
+    records = list(records)
+    # Indices of live records by name, in file order
+    positions = {}
+    for i, record in enumerate(records):
+        positions.setdefault(record["name"], []).append(i)
+
+    for entry in entries:
+        op = entry["op"]
+        if op == "add":
+            positions.setdefault(entry["record"]["name"], []).append(len(records))
+            records.append(entry["record"])
+        elif op == "clear":
+            records = []
+            positions = {}
+        elif positions.get(entry["name"]):
+            idx = positions[entry["name"]].pop(0)
+            if op == "update":
+                records[idx] = entry["record"]
+                bisect.insort(positions.setdefault(entry["record"]["name"], []), idx)
+            elif op == "remove":
+                records[idx] = None
+
+    return [record for record in records if record is not None]
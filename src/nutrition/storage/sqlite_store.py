@@ -0,0 +1,270 @@
+import json
+import os
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    type TEXT,
+    per TEXT,
+    record TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS items_name ON items (name);
+
+CREATE TABLE IF NOT EXISTS meals (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    record TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS meals_name ON meals (name);
+CREATE TABLE IF NOT EXISTS meal_items (
+    meal_id INTEGER NOT NULL REFERENCES meals (id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    quantity,  -- no type affinity, keeps ints and floats as given
+    unit TEXT,
+    record TEXT,  -- the whole line, keeps keys without a column
+    PRIMARY KEY (meal_id, position)
+);
+CREATE INDEX IF NOT EXISTS meal_items_name ON meal_items (name);
+
+CREATE TABLE IF NOT EXISTS diets (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    record TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS diets_name ON diets (name);
+CREATE TABLE IF NOT EXISTS diet_meals (
+    diet_id INTEGER NOT NULL REFERENCES diets (id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    day TEXT,
+    type TEXT,
+    record TEXT,
+    PRIMARY KEY (diet_id, position)
+);
+CREATE INDEX IF NOT EXISTS diet_meals_name ON diet_meals (name);
+"""
+
+# Table of each dataset and the table holding its lines
+TABLES = {
+    "item": ("items", None),
+    "meal": ("meals", "meal_items"),
+    "diet": ("diets", "diet_meals"),
+}
+# Columns added to tables of older databases
+MIGRATIONS = [
+    ("meal_items", "record", "TEXT"),
+    ("diet_meals", "record", "TEXT"),
+]
+
+
+class SqliteStore:
+    """Dataset kept in indexed SQLite tables, shared by items, meals and diets."""
+
+    # Records can be found by name without loading the dataset
+    indexed = True
+
+    def __init__(self, database, identifier):
+        self.file = database
+        self.identifier = identifier
+        self.table, self.lines_table = TABLES[identifier]
+        self._connection = None
+
+    def sources(self):
+        """Files holding the dataset, watched for changes by `nut serve`."""
+        return [self.file, f"{self.file}-wal"]
+
+    @property
+    def connection(self):
+        if self._connection is None:
+            # Imported on first use to keep it out of the startup of the other backends
+            import sqlite3
+            folder = os.path.dirname(self.file) or "."
+            os.makedirs(folder, exist_ok=True)
+            self._connection = sqlite3.connect(self.file, timeout=30)
+            self._connection.execute("PRAGMA foreign_keys = ON")
+            self._connection.execute("PRAGMA journal_mode = WAL")
+            self._connection.executescript(SCHEMA)
+            migrate(self._connection)
+        return self._connection
+
+    def load(self):
+        """Load all records in insertion order."""
+        rows = self.connection.execute(f"SELECT id, record FROM {self.table} ORDER BY id").fetchall()
+        records = [(record_id, json.loads(record)) for record_id, record in rows]
+        if self.identifier == "meal":
+            lines = self._lines("SELECT meal_id, record, name, quantity, unit FROM meal_items ORDER BY meal_id, position")
+            for record_id, record in records:
+                record["items"] = [meal_item(*line) for line in lines.get(record_id, [])]
+        elif self.identifier == "diet":
+            lines = self._lines("SELECT diet_id, record, name, day, type FROM diet_meals ORDER BY diet_id, position")
+            for record_id, record in records:
+                record["meals"] = [diet_meal(*line) for line in lines.get(record_id, [])]
+        return [record for _, record in records]
+
+    def find(self, names):
+        """Return the first record called each of names, using the name index."""
+        names = list(set(names))
+        found = {}
+        # Stay below the SQLite limit on query parameters
+        for start in range(0, len(names), 500):
+            chunk = names[start:start + 500]
+            rows = self.connection.execute(
+                f"SELECT id, name FROM {self.table} WHERE name IN ({', '.join('?' * len(chunk))}) ORDER BY id",
+                chunk
+            )
+            for record_id, name in rows:
+                found.setdefault(name, record_id)
+        return [self._read(self.connection, record_id) for record_id in sorted(found.values())]
+
+    def add(self, record):
+        """Append a record."""
+        with self.connection as connection:
+            self._insert(connection, record)
+
+    def update(self, name, record):
+        """Replace the record called name in place; returns False if it does not exist."""
+        with self.connection as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            record_id = self._find(connection, name)
+            if record_id is None:
+                return False
+            self._write(connection, record, record_id)
+        return True
+
+    def upsert(self, records):
+        """Add records, replacing existing records with the same name, in a single transaction.
+
+        Returns the number of (added, updated) records.
+        """
+        added = updated = 0
+        with self.connection as connection:
+            # Writers queue here, so the names read below are still current when writing
+            connection.execute("BEGIN IMMEDIATE")
+            ids = dict(connection.execute(f"SELECT name, MIN(id) FROM {self.table} GROUP BY name"))
+            for record in records:
+                record_id = ids.get(record["name"])
+                if record_id is None:
+                    self._insert(connection, record)
+                    ids[record["name"]] = connection.execute("SELECT last_insert_rowid()").fetchone()[0]
+                    added += 1
+                else:
+                    self._write(connection, record, record_id)
+                    updated += 1
+        return added, updated
+
+    def remove(self, name):
+        """Remove the record called name; returns the removed record or None."""
+        with self.connection as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            record_id = self._find(connection, name)
+            if record_id is None:
+                return None
+            removed = self._read(connection, record_id)
+            connection.execute(f"DELETE FROM {self.table} WHERE id = ?", (record_id,))
+        return removed
+
+    def clear(self):
+        """Remove all records."""
+        with self.connection as connection:
+            connection.execute(f"DELETE FROM {self.table}")
+
+    def replace(self, records):
+        """Replace all records in a single transaction."""
+        with self.connection as connection:
+            connection.execute(f"DELETE FROM {self.table}")
+            for record in records:
+                self._insert(connection, record)
+
+    def _lines(self, query):
+        lines = {}
+        for parent_id, *line in self.connection.execute(query):
+            lines.setdefault(parent_id, []).append(line)
+        return lines
+
+    def _find(self, connection, name):
+        row = connection.execute(
+            f"SELECT id FROM {self.table} WHERE name = ? ORDER BY id LIMIT 1", (name,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def _read(self, connection, record_id):
+        (record,) = connection.execute(f"SELECT record FROM {self.table} WHERE id = ?", (record_id,)).fetchone()
+        record = json.loads(record)
+        if self.identifier == "meal":
+            rows = connection.execute(
+                "SELECT record, name, quantity, unit FROM meal_items WHERE meal_id = ? ORDER BY position", (record_id,)
+            )
+            record["items"] = [meal_item(*row) for row in rows]
+        elif self.identifier == "diet":
+            rows = connection.execute(
+                "SELECT record, name, day, type FROM diet_meals WHERE diet_id = ? ORDER BY position", (record_id,)
+            )
+            record["meals"] = [diet_meal(*row) for row in rows]
+        return record
+
+    def _insert(self, connection, record):
+        self._write(connection, record, None)
+
+    def _write(self, connection, record, record_id):
+        """Insert a record (record_id None) or overwrite the record with record_id."""
+        if self.identifier == "item":
+            values = (record["name"], record.get("type"), record.get("per"), json.dumps(record))
+            if record_id is None:
+                connection.execute("INSERT INTO items (name, type, per, record) VALUES (?, ?, ?, ?)", values)
+            else:
+                connection.execute("UPDATE items SET name = ?, type = ?, per = ?, record = ? WHERE id = ?",
+                                   (*values, record_id))
+            return
+
+        lines_key = "items" if self.identifier == "meal" else "meals"
+        header = {key: value for key, value in record.items() if key != lines_key}
+        if record_id is None:
+            cursor = connection.execute(f"INSERT INTO {self.table} (name, record) VALUES (?, ?)",
+                                        (record["name"], json.dumps(header)))
+            record_id = cursor.lastrowid
+        else:
+            connection.execute(f"UPDATE {self.table} SET name = ?, record = ? WHERE id = ?",
+                               (record["name"], json.dumps(header), record_id))
+            connection.execute(f"DELETE FROM {self.lines_table} WHERE {self.identifier}_id = ?", (record_id,))
+
+        if self.identifier == "meal":
+            connection.executemany(
+                "INSERT INTO meal_items (meal_id, position, name, quantity, unit, record) VALUES (?, ?, ?, ?, ?, ?)",
+                [(record_id, position, line["name"], line.get("quantity"), line.get("unit"), json.dumps(line))
+                 for position, line in enumerate(record.get("items") or [])]
+            )
+        else:
+            connection.executemany(
+                "INSERT INTO diet_meals (diet_id, position, name, day, type, record) VALUES (?, ?, ?, ?, ?, ?)",
+                [(record_id, position, line["name"], line.get("day"), line.get("type"), json.dumps(line))
+                 for position, line in enumerate(record.get("meals") or [])]
+            )
+
+
+def migrate(connection):
+    """Add the columns of MIGRATIONS missing from a database made by an older version."""
+    for table, column, column_type in MIGRATIONS:
+        columns = {row[1] for row in connection.execute(f"PRAGMA table_info({table})")}
+        if column not in columns:
+            connection.execute(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}")
+
+
+def meal_item(record, name, quantity, unit):
+    """Meal item entry, as stored or from its columns in databases of older versions."""
+    if record is not None:
+        return json.loads(record)
+    return {"name": name, "quantity": quantity, "unit": unit}
+
+
+def diet_meal(record, name, day, meal_type):
+    """Diet meal entry, as stored or with the optional day and type only when set."""
+    if record is not None:
+        return json.loads(record)
+    entry = {"name": name}
+    if day is not None:
+        entry["day"] = day
+    if meal_type is not None:
+        entry["type"] = meal_type
+    return entry
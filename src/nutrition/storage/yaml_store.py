@@ -0,0 +1,96 @@
+from ..cache import cached, refresh_cache
+from ..index import NameIndex
+from ..utils import load_existing_data, save_data, locked_data, file_lock, iter_records, select_records
+
+
+class YamlStore:
+    """Dataset kept as one YAML list, rewritten on every change."""
+
+    # Finding records by name streams the file, loading the dataset is cheaper with the cache
+    indexed = False
+
+    def __init__(self, file):
+        self.file = file
+
+    def sources(self):
+        """Files holding the dataset, watched for changes by `nut serve`."""
+        return [self.file]
+
+    def load(self):
+        """Load all records, using the parsed snapshot while the file is unchanged."""
+        return cached(self.file, lambda: load_existing_data(self.file))
+
+    def find(self, names):
+        """Return the first record called each of names, streaming the file instead of loading it."""
+        return select_records(iter_records(self.file), names)
+
+    def add(self, record):
+        """Append a record."""
+        with locked_data(self.file) as records:
+            records.append(record)
+            save_data(records, self.file)
+
+    def update(self, name, record):
+        """Replace the record called name; returns False if it does not exist."""
+        with locked_data(self.file) as records:
+            idx = NameIndex(record["name"] for record in records).exact(name)
+            if idx is None:
+                return False
+            records[idx] = record
+            save_data(records, self.file)
+        return True
+
+    def upsert(self, records):
+        """Add records, replacing existing records with the same name, in a single write.
+
+        Returns the number of (added, updated) records.
+        """
+        with file_lock(self.file):
+            # Bulk writes reuse the parsed snapshot and refresh it, the file is not parsed again
+            existing = self.load()
+            added, updated = merge_records(existing, records)
+            save_data(existing, self.file)
+            refresh_cache(self.file, existing)
+        return added, updated
+
+    def remove(self, name):
+        """Remove the record called name; returns the removed record or None."""
+        with locked_data(self.file) as records:
+            idx = NameIndex(record["name"] for record in records).exact(name)
+            if idx is None:
+                return None
+            removed = records.pop(idx)
+            save_data(records, self.file)
+        return removed
+
+    def clear(self):
+        """Remove all records."""
+        with locked_data(self.file) as records:
+            records.clear()
+            save_data(records, self.file)
+
+    def replace(self, records):
+        """Replace all records."""
+        with file_lock(self.file):
+            save_data(records, self.file)
+
+
+def merge_records(existing, records):
+    """Add records to the existing list in place, replacing the first record with the same name.
+
+    Returns the number of (added, updated) records.
+    """
+    positions = {}
+    for i, record in enumerate(existing):
+        positions.setdefault(record["name"], i)
+    added = updated = 0
+    for record in records:
+        idx = positions.get(record["name"])
+        if idx is None:
+            positions[record["name"]] = len(existing)
+            existing.append(record)
+            added += 1
+        else:
+            existing[idx] = record
+            updated += 1
+    return added, updated
@@ -0,0 +1,117 @@
+"""Memoized meal nutrient totals, by meal index within a run and across runs by meal name and a
+fingerprint of its definition."""
+import hashlib
+import json
+
+from .cache import read_cache, write_cache
+from .vars import CACHE_SCHEMA_VERSION, MEAL_CACHE_ENABLED
+
+CACHE_SUFFIX = "totals.pickle"
+CACHE_KEY = (CACHE_SCHEMA_VERSION, "meal-totals")
+
+
+def digest(data):
+    """Stable hash of a YAML-like structure."""
+    encoded = json.dumps(data, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha1(encoded).hexdigest()
+
+
+class MealTotalsCache:
+    """Meal totals of one data context, calculated once per meal.
+
+    Within a run totals are kept by meal index, the datasets of a context do not change. When
+    `meals_file` is given they are also persisted in the cache folder next to the meals file,
+    by meal name with a fingerprint of the meal and of the items it references, and stay valid
+    while neither changes; fingerprints are only computed for persisted totals.
+    """
+
+    def __init__(self, meals_file=None):
+        self.meals_file = meals_file
+        self._totals = {}
+        # Meal indexes stored since the last call to calculated()
+        self._new = []
+        self._entries = {}
+        self._fingerprints = {}
+        self._item_digests = {}
+        self._dirty = False
+        if meals_file:
+            self._entries = read_cache(meals_file, CACHE_KEY, CACHE_SUFFIX) or {}
+
+    def fingerprint(self, meal, context):
+        """Fingerprint of a meal definition, of every catalogue item it references and of the unit registry."""
+        items = context.items
+        item_index = context.index("item")
+        item_digests = []
+        for meal_item in meal.items:
+            idx = item_index.exact(meal_item.name)
+            if idx is None:
+                item_digests.append(None)
+                continue
+            # By name, positions change when streamed items are read again (see DataContext.require_items)
+            if meal_item.name not in self._item_digests:
+                self._item_digests[meal_item.name] = digest(items[idx].to_dict())
+            item_digests.append(self._item_digests[meal_item.name])
+        return digest([meal.to_dict(), item_digests, context.units().signature])
+
+    def get(self, idx, context):
+        """Return the (vector, skipped) of the meal at idx, or None if not calculated yet."""
+        totals = self._totals.get(idx)
+        if totals is None and self.meals_file:
+            entry = self._entries.get(context.meals[idx].name)
+            if entry is not None and entry[0] == self._fingerprint(idx, context):
+                totals = self._totals[idx] = (entry[1], entry[2])
+        return totals
+
+    def put(self, idx, context, vector, skipped):
+        """Store the totals of the meal at idx."""
+        self._totals[idx] = (vector, skipped)
+        self._new.append(idx)
+        if self.meals_file:
+            meal = context.meals[idx]
+            item_names = frozenset(meal_item.name for meal_item in meal.items)
+            self._entries[meal.name] = (self._fingerprint(idx, context), list(vector), skipped, item_names)
+            self._dirty = True
+
+    def calculated(self):
+        """(idx, vector, skipped) of the totals stored since the last call, see merge."""
+        totals = [(idx, *self._totals[idx]) for idx in self._new]
+        self._new = []
+        return totals
+
+    def merge(self, totals, context):
+        """Store the totals calculated by the cache of another context of the same meals,
+        such as a worker process (see parallel.py)."""
+        for idx, vector, skipped in totals:
+            if idx not in self._totals:
+                self.put(idx, context, vector, skipped)
+
+    def _fingerprint(self, idx, context):
+        """Fingerprint of the meal at idx, computed once."""
+        if idx not in self._fingerprints:
+            self._fingerprints[idx] = self.fingerprint(context.meals[idx], context)
+        return self._fingerprints[idx]
+
+    def invalidate_items(self, item_names):
+        """Drop the totals of meals that reference any of the given items."""
+        item_names = set(item_names)
+        stale = [name for name, entry in self._entries.items() if entry[3] & item_names]
+        for name in stale:
+            del self._entries[name]
+        self._dirty = self._dirty or bool(stale)
+        return stale
+
+    def save(self):
+        """Persist the entries if this cache is backed by a file and has changed."""
+        if self.meals_file and self._dirty:
+            write_cache(self.meals_file, CACHE_KEY, self._entries, CACHE_SUFFIX)
+            self._dirty = False
+
+
+def invalidate_meal_totals(meals_file, item_names):
+    """Drop persisted totals of meals referencing the given items, after items were edited."""
+    if not MEAL_CACHE_ENABLED:
+        return []
+    cache = MealTotalsCache(meals_file)
+    stale = cache.invalidate_items(item_names)
+    cache.save()
+    return stale
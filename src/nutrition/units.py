@@ -0,0 +1,115 @@
+"""Unit registry: every unit alias as an amount of grams, millilitres or pieces.
+
+Conversions are dict lookups: meal lines look up the base unit and amount of their unit,
+and each item gets a table of its nutrition multiplier per base unit, from its `per` basis
+(parsed once when the item is loaded) and its optional `piece_weight` (g) and `density`
+(g/ml). A configuration may add or override aliases with a `units` mapping of alias to
+grams or to an amount of another unit, e.g. `units: {scoop: 30, glass: 250 ml}`.
+"""
+import re
+from functools import lru_cache
+
+# Base units: mass, volume and count
+GRAMS, MILLILITRES, PIECES = "g", "ml", "pcs"
+
+# (base unit, amount of the base unit) of every alias
+DEFAULT_UNITS = {
+    "mg": (GRAMS, 0.001), "milligram": (GRAMS, 0.001), "milligrams": (GRAMS, 0.001),
+    "g": (GRAMS, 1.0), "gr": (GRAMS, 1.0), "gram": (GRAMS, 1.0), "grams": (GRAMS, 1.0),
+    "kg": (GRAMS, 1000.0), "kilogram": (GRAMS, 1000.0), "kilograms": (GRAMS, 1000.0),
+    "oz": (GRAMS, 28.35), "ounce": (GRAMS, 28.35), "ounces": (GRAMS, 28.35),
+    "lb": (GRAMS, 453.6), "lbs": (GRAMS, 453.6), "pound": (GRAMS, 453.6), "pounds": (GRAMS, 453.6),
+    "ml": (MILLILITRES, 1.0), "milliliter": (MILLILITRES, 1.0), "milliliters": (MILLILITRES, 1.0),
+    "millilitre": (MILLILITRES, 1.0), "millilitres": (MILLILITRES, 1.0),
+    "cl": (MILLILITRES, 10.0), "dl": (MILLILITRES, 100.0),
+    "l": (MILLILITRES, 1000.0), "liter": (MILLILITRES, 1000.0), "liters": (MILLILITRES, 1000.0),
+    "litre": (MILLILITRES, 1000.0), "litres": (MILLILITRES, 1000.0),
+    "tsp": (MILLILITRES, 5.0), "teaspoon": (MILLILITRES, 5.0), "teaspoons": (MILLILITRES, 5.0),
+    "tbsp": (MILLILITRES, 15.0), "tablespoon": (MILLILITRES, 15.0), "tablespoons": (MILLILITRES, 15.0),
+    "cup": (MILLILITRES, 240.0), "cups": (MILLILITRES, 240.0),
+    "pc": (PIECES, 1.0), "pcs": (PIECES, 1.0), "piece": (PIECES, 1.0), "pieces": (PIECES, 1.0),
+}
+
+# Amount followed by the unit: a decimal (point or comma) or a fraction with an optional whole
+# number, e.g. "100g", "0.5 cup", "1 piece", "1/2 cup", "1 1/2 cups"
+PER_PATTERN = re.compile(
+    r"\s*(?:(?:(?P<whole>\d+)\s+)?(?P<numerator>\d+)\s*/\s*(?P<denominator>\d+)|(?P<amount>\d+(?:[.,]\d*)?|[.,]\d+))?"
+    r"\s*(?P<unit>[^\W\d_]*)"
+)
+
+
+def normalize_unit(unit):
+    """Registry key of a unit alias."""
+    return unit.strip().lower() if isinstance(unit, str) else None
+
+
+@lru_cache(maxsize=None)
+def parse_per(per):
+    """Split a `per` basis into (amount, normalized unit): '0.5 cup' -> (0.5, 'cup').
+
+    Fractions are amounts as well ('1/2 cup' -> (0.5, 'cup')), one over zero is none, so the
+    item does not convert. Without an amount a unit counts once ('piece' -> (1.0, 'piece'))
+    and an empty basis is 100 g; the unit is None when there is none ('100' -> (100.0, None)).
+    """
+    if not isinstance(per, str):
+        return (100.0, None) if per is None else (float(per), None)
+    match = PER_PATTERN.match(per)
+    unit = normalize_unit(match["unit"]) or None
+    if match["denominator"] is not None:
+        denominator = int(match["denominator"])
+        fraction = int(match["numerator"]) / denominator if denominator else 0.0
+        return int(match["whole"] or 0) + fraction, unit
+    if match["amount"] is None:
+        return (1.0 if unit else 100.0), unit
+    return float(match["amount"].replace(",", ".")), unit
+
+
+class UnitRegistry:
+    """Unit aliases, the defaults plus the `units` of a configuration."""
+
+    def __init__(self, units=None):
+        units = {normalize_unit(alias): self.define(value) for alias, value in (units or {}).items()}
+        self.units = {**DEFAULT_UNITS, **units}
+        # Identifies the conversions for memoized totals, the defaults are covered by the schema version
+        self.signature = sorted(units.items())
+
+    @staticmethod
+    def define(value):
+        """(base unit, amount) of a configured unit: grams, or an amount of a default unit such as '250 ml'."""
+        if not isinstance(value, str):
+            return GRAMS, float(value)
+        amount, unit = parse_per(value)
+        base, base_amount = DEFAULT_UNITS.get(unit, (unit or GRAMS, 1.0))
+        return base, amount * base_amount
+
+    def lookup(self, unit):
+        """(base unit, amount) of a unit; an unknown unit is its own base unit."""
+        found = self.units.get(unit)
+        if found is None:
+            unit = normalize_unit(unit)
+            found = self.units.get(unit) or (unit, 1.0)
+        return found
+
+    def conversions(self, item):
+        """Multiplier of an item's nutrition per base unit, for the base units the item converts to.
+
+        The base unit of the item's `per` always converts, grams, millilitres and pieces convert
+        between each other through the item's `density` and `piece_weight`, and a `per` without
+        a unit is in grams.
+        """
+        base, amount = self.lookup(item.per_unit) if item.per_unit else (GRAMS, 1.0)
+        amount *= item.per_amount
+        if not amount:
+            return {}
+        table = {base: 1 / amount}
+        # Grams per base unit
+        weights = {GRAMS: 1.0}
+        if item.density:
+            weights[MILLILITRES] = item.density
+        if item.piece_weight:
+            weights[PIECES] = item.piece_weight
+        if base in weights:
+            grams = amount * weights[base]
+            for other, weight in weights.items():
+                table[other] = weight / grams
+        return table
@@ -1,30 +1,111 @@
+import json
 import os
-import yaml
+import shutil
+import tempfile
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    # Advisory locks are not available on Windows
+    fcntl = None
 
 from .console import print_separator
+from .yamlio import safe_load, safe_load_all, iter_load, dump
+
+# Data files with these extensions hold one JSON record per line instead of YAML
+JSONL_EXTENSIONS = (".jsonl", ".ndjson")
 
 def load_yaml(filepath):
     """Read YAML configuration file and return the contents as a dictionary."""
     with open(filepath, "r", encoding="utf-8") as file:
-        data = yaml.safe_load(file)
+        data = safe_load(file)
     return data
 
+def is_jsonl(filename):
+    """Whether a data file holds JSON lines."""
+    return filename.lower().endswith(JSONL_EXTENSIONS)
+
 def load_existing_data(filename):
-    """Load existing data from YAML file."""
-    if os.path.exists(filename):
-        with open(filename, 'r', encoding='utf-8') as file:
-            data = yaml.safe_load(file)
-            return data if data is not None else []
-    else:
+    """Load existing data from a YAML (one list or one record per document) or JSON lines file."""
+    if not os.path.exists(filename):
         return []
+    if is_jsonl(filename):
+        return list(iter_records(filename))
+    with open(filename, 'r', encoding='utf-8') as file:
+        documents = [document for document in safe_load_all(file) if document is not None]
+    if len(documents) == 1 and isinstance(documents[0], list):
+        return documents[0]
+    return [record for document in documents for record in (document if isinstance(document, list) else [document])]
+
+def iter_records(filename):
+    """Yield the records of a data file one at a time, without loading the whole file."""
+    if not os.path.exists(filename):
+        return
+    with open(filename, 'r', encoding='utf-8') as file:
+        if is_jsonl(filename):
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from iter_load(file)
+
+def select_records(records, names):
+    """Return the first record called each of names, in the order the records come."""
+    wanted = set(names)
+    selected = []
+    for record in records:
+        if not wanted:
+            break
+        if record.get('name') in wanted:
+            wanted.discard(record['name'])
+            selected.append(record)
+    return selected
 
 def save_data(data, filename):
-    """Save data to YAML file."""
+    """Save data to a YAML or JSON lines file atomically (write a temporary file, fsync it, rename it)."""
     # create file if not exist
-    os.makedirs(os.path.dirname(filename), exist_ok=True)
+    folder = os.path.dirname(filename) or "."
+    os.makedirs(folder, exist_ok=True)
+
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(filename)}.", suffix=".tmp", dir=folder)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as file:
+            if is_jsonl(filename):
+                file.writelines(json.dumps(record, ensure_ascii=False) + "\n" for record in data)
+            else:
+                dump(data, file)
+            file.flush()
+            os.fsync(file.fileno())
+        if os.path.exists(filename):
+            shutil.copymode(filename, tmp_path)
+        else:
+            os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, filename)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+@contextmanager
+def file_lock(filename):
+    """Hold an exclusive advisory lock for a data file, using a .lock file next to it."""
+    folder = os.path.dirname(filename) or "."
+    os.makedirs(folder, exist_ok=True)
+    with open(f"{filename}.lock", "a", encoding="utf-8") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
 
-    with open(filename, 'w', encoding='utf-8') as file:
-        yaml.dump(data, file, sort_keys=False, allow_unicode=True, indent=2)
+@contextmanager
+def locked_data(filename):
+    """Lock a data file and yield its current contents for a load/modify/save cycle."""
+    with file_lock(filename):
+        yield load_existing_data(filename)
 
 def vprint(text, verbose=0):
     """Print text if verbose level is sufficient."""
@@ -34,5 +115,5 @@ def vprint(text, verbose=0):
 def print_yaml(data:dict, lines=False):
     """Print YAML data."""
     if lines: print_separator()
-    print(yaml.dump(data, sort_keys=False, allow_unicode=True, indent=2))
+    print(dump(data))
     if lines: print_separator()
@@ -2,3 +2,29 @@ import os
 from pathlib import Path
 
 SETTINGS_FILE = os.getenv("NUTRITION_CONFIG", Path.home() / ".nutcfg.yaml")
+
+# Snapshots of parsed data files are kept in this folder next to each data file
+CACHE_DIRNAME = ".nutcache"
+# Bump whenever the layout of cached objects changes
+CACHE_SCHEMA_VERSION = 4
+CACHE_ENABLED = os.getenv("NUTRITION_CACHE", "1").lower() not in ("0", "false", "no", "off")
+
+# YAML backend: "auto" uses libyaml when PyYAML was built with it, "c" or "python" force one
+YAML_BACKEND = os.getenv("NUTRITION_YAML_BACKEND", "auto").lower()
+# Persist memoized meal totals across runs (they are always memoized within a run)
+MEAL_CACHE_ENABLED = os.getenv("NUTRITION_MEAL_CACHE", "0").lower() in ("1", "true", "yes", "on")
+
+# Calculations read only the items they reference, streaming the item file instead of loading
+# it: "auto" streams item files larger than STREAM_THRESHOLD bytes, "1" always, "0" never
+STREAM_ITEMS = os.getenv("NUTRITION_STREAM_ITEMS", "auto").lower()
+STREAM_THRESHOLD = int(os.getenv("NUTRITION_STREAM_THRESHOLD", 64 * 1024 * 1024))
+
+# Unix socket of `nut serve`, one daemon per settings file
+SOCKET_FILE = os.getenv("NUTRITION_SOCKET", f"{SETTINGS_FILE}.sock")
+# Seconds a forwarded command waits for `nut serve` to accept it and then to answer,
+# before running in the calling process instead
+FORWARD_CONNECT_TIMEOUT = float(os.getenv("NUTRITION_FORWARD_CONNECT_TIMEOUT", 1))
+FORWARD_TIMEOUT = float(os.getenv("NUTRITION_FORWARD_TIMEOUT", 30))
+
+# Default names of the data files in a configuration folder
+DATA_FILES = {"item": "items.yaml", "meal": "meals.yaml", "diet": "diets.yaml"}
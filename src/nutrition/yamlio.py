@@ -0,0 +1,73 @@
+"""YAML backend selection: libyaml C loader/dumper when available, pure Python otherwise."""
+import yaml
+
+from .console import print_warning
+from .vars import YAML_BACKEND
+
+HAS_LIBYAML = hasattr(yaml, "CSafeLoader") and hasattr(yaml, "CSafeDumper")
+
+
+def get_backend(backend=None):
+    """Resolve the backend name ('c' or 'python') from the argument or NUTRITION_YAML_BACKEND."""
+    backend = (backend or YAML_BACKEND).lower()
+    if backend not in ("auto", "c", "python"):
+        print_warning(f"Unknown YAML backend '{backend}', using 'auto'")
+        backend = "auto"
+    if backend == "c" and not HAS_LIBYAML:
+        print_warning("PyYAML was built without libyaml, using the pure Python YAML backend")
+        return "python"
+    if backend == "auto":
+        return "c" if HAS_LIBYAML else "python"
+    return backend
+
+
+def get_loader(backend=None):
+    """Return the safe loader class for the selected backend."""
+    return yaml.CSafeLoader if get_backend(backend) == "c" else yaml.SafeLoader
+
+
+def get_dumper(backend=None):
+    """Return the safe dumper class for the selected backend."""
+    return yaml.CSafeDumper if get_backend(backend) == "c" else yaml.SafeDumper
+
+
+def safe_load(stream, backend=None):
+    """Parse a single YAML document."""
+    return yaml.load(stream, Loader=get_loader(backend))
+
+
+def dump(data, stream=None, backend=None):
+    """Serialize data with the formatting used for all data files."""
+    return yaml.dump(data, stream, Dumper=get_dumper(backend), sort_keys=False, allow_unicode=True, indent=2)
+
+
+def safe_load_all(stream, backend=None):
+    """Parse every document of a YAML stream, yielding one document at a time."""
+    return yaml.load_all(stream, Loader=get_loader(backend))
+
+
+def iter_load(stream):
+    """Yield the records of a YAML stream one at a time without parsing the whole stream.
+
+    A document holding a list yields its elements, any other document is yielded whole, so
+    both a regular data file and a multi-document file (one record per document) stream.
+    This composes one node at a time, which only the pure Python loader supports.
+    """
+    loader = yaml.SafeLoader(stream)
+    try:
+        loader.get_event()  # StreamStart
+        while not loader.check_event(yaml.StreamEndEvent):
+            loader.get_event()  # DocumentStart
+            if loader.check_event(yaml.SequenceStartEvent):
+                loader.get_event()
+                while not loader.check_event(yaml.SequenceEndEvent):
+                    yield loader.construct_document(loader.compose_node(None, None))
+                loader.get_event()  # SequenceEnd
+            else:
+                record = loader.construct_document(loader.compose_node(None, None))
+                if record is not None:
+                    yield record
+            loader.get_event()  # DocumentEnd
+            loader.anchors = {}
+    finally:
+        loader.dispose()
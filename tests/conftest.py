@@ -0,0 +1,89 @@
+"""Shared sample records for the tests."""
+import copy
+
+import pytest
+
+from nutrition import loader, yamlio
+
+ITEMS = [
+    {
+        "name": "Oats",
+        "type": "Grain",
+        "per": "100g",
+        "nutrition": {
+            "energy": {"value": 389, "unit": "kcal"},
+            "carbohydrates": {"value": 66.3, "unit": "g", "sugar": 1.0},
+            "fat": {"value": 6.9, "unit": "g", "saturated": 1.2, "unsaturated": 4.5},
+            "protein": {"value": 16.9, "unit": "g"},
+            "salt": {"value": 0.01, "unit": "g"},
+        },
+    },
+    {
+        "name": "Crème fraîche",
+        "type": "Dairy",
+        "per": "100 ml",
+        "density": 1.01,
+        "nutrition": {
+            "energy": {"value": 292.5, "unit": "kcal"},
+            "fat": {"value": 30.0, "unit": "g", "saturated": 20.1, "unsaturated": None},
+            "protein": {"value": 2.4, "unit": "g"},
+        },
+    },
+    {
+        "name": "Banana",
+        "type": "Fruit",
+        "per": "1 piece",
+        "piece_weight": 120,
+        "nutrition": {
+            "energy": {"value": 105, "unit": "kcal"},
+            "carbohydrates": {"value": 27, "unit": "g", "sugar": 14.4},
+            "protein": {"value": 1.3, "unit": "g"},
+        },
+    },
+]
+
+MEALS = [
+    {
+        "name": "Breakfast",
+        "items": [
+            {"name": "Oats", "quantity": 80, "unit": "g"},
+            {"name": "Banana", "quantity": 1, "unit": "pcs"},
+        ],
+    },
+    {
+        "name": "Dessert",
+        "items": [{"name": "Crème fraîche", "quantity": 50, "unit": "ml"}],
+    },
+]
+
+DIETS = [
+    {
+        "name": "Weekday",
+        "description": "A balanced day",
+        "meals": [
+            {"name": "Breakfast", "day": "Monday", "type": "breakfast"},
+            {"name": "Dessert", "type": "snack"},
+        ],
+    },
+]
+
+SAMPLES = {"item": ITEMS, "meal": MEALS, "diet": DIETS}
+
+
+@pytest.fixture
+def samples():
+    """Fresh copies of the sample items, meals and diets by dataset."""
+    return copy.deepcopy(SAMPLES)
+
+
+@pytest.fixture
+def data_config(tmp_path, samples, monkeypatch):
+    """Configuration of the samples written to YAML data files, made the current one."""
+    config = {"name": "test"}
+    for identifier, records in samples.items():
+        config[identifier] = str(tmp_path / f"{identifier}s.yaml")
+        with open(config[identifier], "w", encoding="utf-8") as data:
+            yamlio.dump(records, data)
+    monkeypatch.setattr(loader, "_config", config)
+    monkeypatch.setattr(loader, "_shared_context", None)
+    return config
@@ -0,0 +1,118 @@
+import asyncio
+import http.client
+import json
+import queue
+import threading
+
+import pytest
+
+from nutrition import yamlio
+from nutrition.config import get_config
+from nutrition.server import api, serve
+
+
+def run_until_cancelled(loop, task):
+    try:
+        loop.run_until_complete(task)
+    except asyncio.CancelledError:
+        pass
+
+
+@pytest.fixture
+def port(tmp_path, data_config, monkeypatch):
+    """Port of the HTTP API serving the sample data, run in-process on an ephemeral port."""
+    settings_file = str(tmp_path / "settings.yaml")
+    with open(settings_file, "w", encoding="utf-8") as settings:
+        yamlio.dump({"current": "test", "configs": [data_config]}, settings)
+    monkeypatch.setattr(get_config, "SETTINGS_FILE", settings_file)
+    monkeypatch.setattr(serve, "SETTINGS_FILE", settings_file)
+
+    loop = asyncio.new_event_loop()
+    ports = queue.Queue()
+    task = loop.create_task(api.run_http("127.0.0.1", 0, serve.ServerState(), ports.put))
+    thread = threading.Thread(target=run_until_cancelled, args=(loop, task), daemon=True)
+    thread.start()
+    yield ports.get(timeout=10)
+    loop.call_soon_threadsafe(task.cancel)
+    thread.join(10)
+    loop.close()
+
+
+def fetch(port, method, path, body=None):
+    """(status, JSON payload) of one request."""
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    try:
+        connection.request(method, path, body=json.dumps(body) if body is not None else None)
+        response = connection.getresponse()
+        return response.status, json.loads(response.read())
+    finally:
+        connection.close()
+
+
+def test_get_records(port):
+    status, payload = fetch(port, "GET", "/items?name=an")
+    assert status == 200
+    assert [item["name"] for item in payload["items"]] == ["Banana"]
+    status, payload = fetch(port, "GET", "/meals")
+    assert (status, payload["count"]) == (200, 2)
+
+
+def test_calculate(port):
+    status, payload = fetch(port, "GET", "/meals/calculate?name=Breakfast")
+    assert status == 200
+    assert payload["meal"]["totals"]["energy"]["value"] == pytest.approx(389 * 0.8 + 105)
+    status, payload = fetch(port, "GET", "/diets/calculate?name=Weekday&summary=1")
+    assert status == 200
+    assert [meal["status"] for meal in payload["diet"]["meals"]] == ["ok", "ok"]
+    status, payload = fetch(port, "GET", "/meals/calculate?all=1")
+    assert [meal["name"] for meal in payload["meals"]] == ["Breakfast", "Dessert"]
+
+
+def test_calculate_prefers_the_exact_name(port, data_config, samples):
+    meals = samples["meal"] + [{"name": "Breakfast 2", "items": [{"name": "Oats", "quantity": 40, "unit": "g"}]}]
+    with open(data_config["meal"], "w", encoding="utf-8") as data:
+        yamlio.dump(meals, data)
+    status, payload = fetch(port, "GET", "/meals/calculate?name=Breakfast")
+    assert status == 200
+    assert payload["meal"]["name"] == "Breakfast"
+    status, payload = fetch(port, "GET", "/meals/calculate?name=Break")
+    assert [meal["name"] for meal in payload["meals"]] == ["Breakfast", "Breakfast 2"]
+
+
+def test_batch(port):
+    requests = [
+        {"path": "/meals/calculate", "params": {"name": "Dessert"}},
+        {"path": "/items", "params": {"name": "Oats"}},
+        {"path": "/nowhere"},
+        {"path": "/items", "params": {"name": "(oops"}},
+    ]
+    status, payload = fetch(port, "POST", "/batch", {"requests": requests})
+    assert status == 200
+    assert [result["status"] for result in payload["results"]] == [200, 200, 400, 400]
+    assert payload["results"][1]["body"]["items"][0]["name"] == "Oats"
+
+
+@pytest.mark.parametrize("method, path, body, status", [
+    ("GET", "/nowhere", None, 404),
+    ("POST", "/items", None, 405),
+    ("GET", "/meals/calculate", None, 400),
+    ("GET", "/meals/calculate?name=Lunch", None, 404),
+    ("GET", "/diets/calculate?name=Holiday", None, 404),
+    ("POST", "/batch", {"requests": "all"}, 400),
+    ("GET", "/items?name=(oops", None, 400),
+    ("GET", "/meals/calculate?name=[", None, 400),
+    ("GET", "/diets/calculate?name=*", None, 400),
+])
+def test_errors(port, method, path, body, status):
+    answer, payload = fetch(port, method, path, body)
+    assert answer == status
+    assert payload["error"]
+
+
+def test_invalid_json(port):
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    connection.request("POST", "/batch", body=b"{not json")
+    response = connection.getresponse()
+    assert response.status == 400
+    assert json.loads(response.read())["error"] == "Request body is not valid JSON"
+    connection.close()
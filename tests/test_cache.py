@@ -0,0 +1,69 @@
+import os
+
+import pytest
+
+from nutrition import cache, yamlio
+from nutrition.cache import cache_path, cached
+from nutrition.storage import YamlStore
+
+
+@pytest.fixture
+def data_file(tmp_path, monkeypatch, samples):
+    monkeypatch.setattr(cache, "CACHE_ENABLED", True)
+    file = str(tmp_path / "items.yaml")
+    with open(file, "w", encoding="utf-8") as data:
+        yamlio.dump(samples["item"], data)
+    return file
+
+
+def counting(value):
+    """build() returning value and counting its calls."""
+    def build():
+        build.calls += 1
+        return value
+    build.calls = 0
+    return build
+
+
+def test_snapshot_is_reused_while_the_file_is_unchanged(data_file):
+    build = counting(["parsed"])
+    assert cached(data_file, build) == ["parsed"]
+    assert cached(data_file, build) == ["parsed"]
+    assert build.calls == 1
+    assert os.path.exists(cache_path(data_file))
+
+
+def test_snapshot_is_rebuilt_when_the_mtime_changes(data_file):
+    cached(data_file, counting("old"))
+    stat = os.stat(data_file)
+    os.utime(data_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert cached(data_file, counting("new")) == "new"
+
+
+def test_snapshot_is_rebuilt_when_the_size_changes(data_file):
+    cached(data_file, counting("old"))
+    stat = os.stat(data_file)
+    with open(data_file, "a", encoding="utf-8") as data:
+        data.write("\n")
+    # Same mtime, e.g. a change within the timestamp resolution of the file system
+    os.utime(data_file, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert cached(data_file, counting("new")) == "new"
+
+
+@pytest.mark.parametrize("damage", ["truncate", "garble", "empty", "unknown class"])
+def test_damaged_snapshot_falls_back_to_the_yaml(data_file, samples, damage):
+    store = YamlStore(data_file)
+    assert store.load() == samples["item"]
+    path = cache_path(data_file)
+    with open(path, "rb") as snapshot:
+        content = snapshot.read()
+    with open(path, "wb") as snapshot:
+        if damage == "truncate":
+            snapshot.write(content[:len(content) // 2])
+        elif damage == "garble":
+            snapshot.write(bytes(reversed(content)))
+        elif damage == "unknown class":
+            snapshot.write(b"cno_such_module\nRecord\n.")
+    assert store.load() == samples["item"]
+    # The snapshot is written again
+    assert cached(data_file, counting(None)) == samples["item"]
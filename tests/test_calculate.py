@@ -0,0 +1,53 @@
+import json
+from argparse import Namespace
+
+import pytest
+
+from nutrition import yamlio
+from nutrition.diet import calculate as diet_calculate
+from nutrition.diet.calculate import compute_diet
+from nutrition.meal import calculate as meal_calculate
+from nutrition.export import diet_records
+from nutrition.loader import DataContext
+
+
+@pytest.fixture
+def lunch_box(data_config, samples):
+    """The samples with a meal whose name contains another meal's name, and a diet of both."""
+    meals = samples["meal"] + [
+        {"name": "Lunch", "items": [{"name": "Oats", "quantity": 100, "unit": "g"}]},
+        {"name": "Lunch Box", "items": [{"name": "Banana", "quantity": 2, "unit": "pcs"}]},
+    ]
+    diets = [{"name": "Work day", "meals": [{"name": "Lunch"}, {"name": "Lunch Box"}, {"name": "Dess"},
+                                            {"name": "Brunch"}, {"name": "(oops"}]},
+             {"name": "Work day 2", "meals": [{"name": "Lunch Box"}]}]
+    for identifier, records in (("meal", meals), ("diet", diets)):
+        with open(data_config[identifier], "w", encoding="utf-8") as data:
+            yamlio.dump(records, data)
+    return data_config
+
+
+def test_diet_meals_resolve_exact_names_first(lunch_box):
+    context = DataContext()
+    result = compute_diet(context.diets[0], context)
+    assert [meal["status"] for meal in result["meals"]] == ["ok", "ok", "ok", "not_found", "not_found"]
+    assert result["meals"][0]["totals"]["energy"]["value"] == pytest.approx(389)
+    assert result["meals"][2]["result"]["name"] == "Dessert"
+
+    # Export resolves the same meals
+    exported = next(diet_records(DataContext()))
+    assert [meal["status"] for meal in exported["meals"]] == [meal["status"] for meal in result["meals"]]
+    assert exported["totals"]["energy"]["value"] == pytest.approx(round(result["totals"]["energy"]["value"], 2))
+
+
+@pytest.mark.parametrize("calculate, name, several", [
+    (meal_calculate, "Lunch", "Lunc"),
+    (diet_calculate, "Work day", "Work"),
+])
+def test_calculate_prefers_the_exact_name(lunch_box, capsys, calculate, name, several):
+    def names(pattern):
+        calculate.handle_calculate(Namespace(name=pattern, all=False, summary=False, jobs=1, format="ndjson"))
+        return [json.loads(line)["name"] for line in capsys.readouterr().out.splitlines()]
+
+    assert names(name) == [name]
+    assert len(names(several)) == 2
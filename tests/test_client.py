@@ -0,0 +1,112 @@
+import json
+import socket
+import threading
+
+import pytest
+
+from nutrition import yamlio
+from nutrition.config import get_config
+from nutrition.server import client, serve
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="the server listens on a unix socket")
+
+
+@pytest.fixture
+def server(tmp_path):
+    """Unix socket server answering each connection with handler(message), run on a thread."""
+    socket_file = str(tmp_path / "nut.sock")
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(socket_file)
+    listener.listen()
+    handlers = []
+
+    def serve():
+        while True:
+            try:
+                connection, _ = listener.accept()
+            except OSError:
+                return
+            with connection, connection.makefile("rb") as message:
+                answer = handlers[0](json.loads(message.read()))
+                if isinstance(answer, bytes):
+                    connection.sendall(answer)
+                elif answer is not None:
+                    connection.sendall(json.dumps(answer).encode("utf-8"))
+
+    thread = threading.Thread(target=serve, daemon=True)
+    thread.start()
+    yield socket_file, handlers
+    # Wakes up accept, so the thread ends before the next test
+    listener.shutdown(socket.SHUT_RDWR)
+    listener.close()
+    thread.join(5)
+
+
+def test_forward_prints_the_answer(server, capsys):
+    socket_file, handlers = server
+    handlers.append(lambda message: {"stdout": " ".join(message["argv"]), "stderr": "", "status": 0})
+    assert client.forward(["item", "get", "Oats"], socket_file)
+    assert capsys.readouterr().out == "item get Oats"
+
+
+def test_forward_falls_back_when_the_server_stalls(server, capsys):
+    socket_file, handlers = server
+    stalled = threading.Event()
+    handlers.append(lambda message: stalled.wait(5) and None)
+    assert not client.forward(["item", "get", "Oats"], socket_file, timeout=0.2)
+    stalled.set()
+    assert capsys.readouterr().out == ""
+
+
+def test_forward_falls_back_without_a_server(tmp_path):
+    assert not client.forward(["item", "get", "Oats"], str(tmp_path / "nut.sock"))
+
+
+def test_forward_falls_back_when_asked(server):
+    socket_file, handlers = server
+    handlers.append(lambda message: {"fallback": True})
+    assert not client.forward(["item", "get", "Oats"], socket_file)
+
+
+@pytest.mark.parametrize("answer", [b'{"stdout": "item get Oa', b"\xff\xfe garbled"])
+def test_forward_falls_back_on_a_damaged_answer(server, capsys, answer):
+    socket_file, handlers = server
+    handlers.append(lambda message: answer)
+    assert not client.forward(["item", "get", "Oats"], socket_file)
+    assert capsys.readouterr().out == ""
+
+
+def test_forward_runs_on_the_server_and_follows_data_changes(tmp_path, data_config, samples, monkeypatch, capsys):
+    settings_file = str(tmp_path / "settings.yaml")
+    with open(settings_file, "w", encoding="utf-8") as settings:
+        yamlio.dump({"current": "test", "configs": [data_config]}, settings)
+    monkeypatch.setattr(get_config, "SETTINGS_FILE", settings_file)
+    monkeypatch.setattr(serve, "SETTINGS_FILE", settings_file)
+
+    socket_file = str(tmp_path / "nut.sock")
+    command_server = serve.CommandServer(socket_file, serve.ServerState())
+
+    def run():
+        while not command_server.stopping:
+            command_server.handle_request()
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    try:
+        assert client.forward(["item", "get", "Oats", "-f", "ndjson"], socket_file)
+        assert json.loads(capsys.readouterr().out)["nutrition"]["energy"]["value"] == 389
+
+        # Edited data files start a new data context on the next command
+        samples["item"][0]["nutrition"]["energy"]["value"] = 379
+        with open(data_config["item"], "w", encoding="utf-8") as data:
+            yamlio.dump(samples["item"] + [{"name": "Pear", "per": "100g"}], data)
+        assert client.forward(["item", "get", "Oats", "-f", "ndjson"], socket_file)
+        assert json.loads(capsys.readouterr().out)["nutrition"]["energy"]["value"] == 379
+
+        # Commands that change data run locally
+        assert not client.forward(["item", "remove", "Oats"], socket_file)
+        assert client.request({"command": "status"}, socket_file)["requests"] == 2
+    finally:
+        client.request({"command": "stop"}, socket_file)
+        thread.join(10)
+        command_server.server_close()
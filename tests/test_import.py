@@ -0,0 +1,139 @@
+import csv
+import json
+import multiprocessing
+
+import pytest
+
+from nutrition import loader, utils, yamlio
+from nutrition.item.get_item import ITEM_COLUMNS
+from nutrition.item.import_items import import_items, item_from_record
+from nutrition.storage import open_storage
+
+VALUES = {"energy": 100, "carbohydrates": 10, "fat": 5, "protein": 3, "salt": 0.1}
+STORAGES = ["yaml", "journal", "sqlite"]
+
+
+@pytest.fixture(params=STORAGES)
+def storage(request, tmp_path, data_config, monkeypatch):
+    """Item storage of the samples, in each backend."""
+    config = {**data_config, "storage": request.param, "database": str(tmp_path / "nutrition.db")}
+    monkeypatch.setattr(loader, "_config", config)
+    items = open_storage(config, "item")
+    with open(data_config["item"], encoding="utf-8") as data:
+        items.replace(yamlio.safe_load(data))
+    return items
+
+
+def write_csv(path, rows, columns=ITEM_COLUMNS):
+    with open(path, "w", encoding="utf-8", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(columns)
+        writer.writerows(rows)
+    return str(path)
+
+
+def test_csv(tmp_path, storage):
+    file = write_csv(tmp_path / "import.csv", [
+        ["Apple", "Fruit", "100g", "180", "", "52", "", "14", "10", "", "0.2", "", "", "", "0.3", "", "0"],
+        ["Oats", "Grain", "100g", "", "", "380", "kcal", "60", "1", "g", "7", "1", "4", "g", "13", "g", "0.02", "g"],
+    ])
+    assert import_items(file) == (1, 1)
+    names = [record["name"] for record in storage.load()]
+    assert names == ["Oats", "Crème fraîche", "Banana", "Apple"]
+    apple = storage.find(["Apple"])[0]
+    assert apple["piece_weight"] == 180
+    assert apple["nutrition"]["energy"] == {"value": 52, "unit": "kcal"}
+
+
+def test_csv_items_match_hand_written_items(tmp_path, storage, samples):
+    oats = samples["item"][0]
+    nutrition = oats["nutrition"]
+    row = {"name": "Oats copy", "type": oats["type"], "per": oats["per"],
+           **{f"{section}_unit": values["unit"] for section, values in nutrition.items()},
+           **{section: values["value"] for section, values in nutrition.items()},
+           "sugar": nutrition["carbohydrates"]["sugar"], "saturated": nutrition["fat"]["saturated"],
+           "unsaturated": nutrition["fat"]["unsaturated"]}
+    file = write_csv(tmp_path / "import.csv", [[row.get(column, "") for column in ITEM_COLUMNS]])
+    assert import_items(file) == (1, 0)
+
+    imported = storage.find(["Oats copy"])[0]
+    assert {**imported, "name": "Oats"} == oats
+    assert type(imported["nutrition"]["energy"]["value"]) is int
+    if storage.sources()[0].endswith(".yaml"):
+        with open(storage.sources()[0], encoding="utf-8") as data:
+            assert "389.0" not in data.read()
+
+
+def test_jsonl_and_yaml(tmp_path, storage):
+    jsonl = tmp_path / "import.jsonl"
+    jsonl.write_text("\n".join(json.dumps({"name": f"Item {i}", "per": "100g", **VALUES}) for i in range(3)) + "\n")
+    assert import_items(str(jsonl)) == (3, 0)
+
+    nested = {"name": "Item 1", "per": "1 piece", "piece_weight": 50, "nutrition": {
+        section: {"value": value} for section, value in VALUES.items()}}
+    with open(tmp_path / "import.yaml", "w", encoding="utf-8") as data:
+        yamlio.dump([nested, {"name": "Item 3", **VALUES}], data)
+    assert import_items(str(tmp_path / "import.yaml")) == (1, 1)
+    assert storage.find(["Item 1"])[0]["per"] == "1 piece"
+    assert len(storage.load()) == 3 + 4
+
+
+def test_invalid_rows_are_skipped(tmp_path, storage, capsys):
+    file = write_csv(tmp_path / "import.csv", [
+        ["Only a name", "Fruit"],
+        ["Overflow", "Fruit", "100g", "", "", "52", "", "14", "", "", "0.2", "", "", "", "0.3", "", "0", "", "extra"],
+        ["Negative", "Fruit", "100g", "", "", "-1", "", "14", "", "", "0.2", "", "", "", "0.3", "", "0"],
+        ["Zero per", "Fruit", "0g", "", "", "52", "", "14", "", "", "0.2", "", "", "", "0.3", "", "0"],
+        ["", "Fruit", "100g", "", "", "52", "", "14", "", "", "0.2", "", "", "", "0.3", "", "0"],
+        ["Valid", "Fruit", "100g", "", "", "52", "", "14", "", "", "0.2", "", "", "", "0.3", "", "0"],
+    ])
+    assert import_items(file) == (1, 0)
+    output = capsys.readouterr().out
+    assert "missing 'energy', 'carbohydrates', 'fat', 'protein', 'salt'" in output
+    assert "more cells than columns" in output
+    assert "5 invalid records skipped" in output
+
+
+@pytest.mark.parametrize("record", [
+    {"name": "Apple", "energy": 52},
+    {"name": "Apple", **VALUES, "fat": "lots"},
+    {"name": "Apple", "nutrition": {"energy": 52}},
+    {"name": "Apple", None: ["surplus"], **VALUES},
+    ["Apple"],
+])
+def test_invalid_records(record):
+    with pytest.raises(ValueError):
+        item_from_record(record)
+
+
+def test_skip_existing_and_dry_run(tmp_path, storage):
+    file = tmp_path / "import.jsonl"
+    file.write_text(json.dumps({"name": "Oats", **VALUES}) + "\n" + json.dumps({"name": "Pear", **VALUES}) + "\n")
+    assert import_items(str(file), dry_run=True) == (0, 0)
+    assert import_items(str(file), skip_existing=True) == (1, 0)
+    assert storage.find(["Oats"])[0]["nutrition"]["energy"]["value"] == 389
+    assert import_items(str(file)) == (0, 2)
+
+
+def import_file(config, file, start):
+    loader._config = config
+    start.wait()
+    import_items(file)
+
+
+@pytest.mark.skipif(utils.fcntl is None, reason="file locks need fcntl")
+def test_concurrent_imports_add_each_item_once(tmp_path, storage):
+    file = tmp_path / "import.jsonl"
+    file.write_text("".join(json.dumps({"name": f"Item {i}", **VALUES}) + "\n" for i in range(50)))
+    context = multiprocessing.get_context("fork")
+    start = context.Event()
+    importers = [context.Process(target=import_file, args=(loader._config, str(file), start)) for _ in range(4)]
+    for process in importers:
+        process.start()
+    start.set()
+    for process in importers:
+        process.join(60)
+        assert process.exitcode == 0
+
+    names = [record["name"] for record in storage.load()]
+    assert len(names) == len(set(names)) == 3 + 50
@@ -0,0 +1,38 @@
+import re
+
+import pytest
+
+from nutrition.index import NameIndex
+
+NAMES = ["Oats", "Rice", "Brown rice", "rice", "Rice", "Straße", "STRASSE", "İstanbul kebab",
+         "Crème fraîche", "CRÈME brûlée", "ﬁg jam", "Fig", "Peanut butter (smooth)", "Kelvin", ""]
+
+
+@pytest.fixture
+def index():
+    return NameIndex(NAMES)
+
+
+@pytest.mark.parametrize("pattern", [
+    "", "rice", "RICE", "Rice", "ice", "ss", "strasse", "STRAßE", "i", "İ", "is", "crème", "CRÈME",
+    "fi", "ﬁ", "kelvin", "butter (smooth)", "^rice$", "r.ce", "oat|fig", "x",
+])
+def test_search_matches_the_regex_scan(index, pattern):
+    assert index.search(pattern) == [i for i, name in enumerate(NAMES) if re.search(pattern, name, re.IGNORECASE)]
+
+
+@pytest.mark.parametrize("name", ["Rice", "rice", "RICE", "Straße", "Crème fraîche", "", "Pear"])
+def test_exact_is_the_first_equal_name(index, name):
+    scan = [i for i, other in enumerate(NAMES) if other == name]
+    assert index.exact(name) == (scan[0] if scan else None)
+
+
+@pytest.mark.parametrize("name", ["rice", "RICE", "strasse", "crème FRAÎCHE", "Pear"])
+def test_folded_is_every_name_equal_ignoring_case(index, name):
+    assert index.folded(name) == [i for i, other in enumerate(NAMES) if other.casefold() == name.casefold()]
+
+
+@pytest.mark.parametrize("prefix", ["r", "RI", "br", "crè", "str", "", "zzz"])
+def test_prefix_is_every_name_starting_with_it(index, prefix):
+    scan = [i for i, name in enumerate(NAMES) if name.casefold().startswith(prefix.casefold())]
+    assert index.prefix(prefix) == sorted(scan, key=lambda i: (NAMES[i].casefold(), i))
@@ -0,0 +1,19 @@
+import pytest
+
+from nutrition.loader import DataContext
+from nutrition.meal.calculate import compute_meals
+
+
+def test_streamed_items_keep_memoized_meal_totals(data_config):
+    context = DataContext(stream_items=True)
+    first = compute_meals("Dessert", context)
+    totals = context.meal_totals()
+    assert [item.name for item in context.items] == ["Crème fraîche"]
+
+    # Reading more items reorders the streamed catalogue, memoized totals stay valid
+    both = compute_meals("", context)
+    assert context.meal_totals() is totals
+    assert [item.name for item in context.items] == ["Oats", "Crème fraîche", "Banana"]
+    assert both[1] == first[0]
+    assert both[0]["totals"]["energy"]["value"] == pytest.approx(389 * 0.8 + 105)
+    assert both[0]["skipped"] == 0
@@ -0,0 +1,64 @@
+import pytest
+
+from conftest import SAMPLES
+from nutrition.models import MODELS, Item, from_records, to_records
+
+EXTRA = {
+    "item": [{
+        "name": "Lentils",
+        "per": "100g",
+        "source": {"database": "USDA", "id": 172420},
+        "nutrition": {
+            "energy": {"value": 116, "unit": "kcal", "kj": 485},
+            "carbohydrates": {"value": 20.1, "unit": "g", "sugar": 1.8, "fiber": 7.9},
+            "fat": None,
+            "vitamins": {"b9": {"value": 181, "unit": "µg"}},
+            "protein": {"unit": "g", "value": 9.0},
+        },
+    }, {
+        "name": "Water",
+        "per": "100 ml",
+    }],
+    "meal": [{
+        "name": "Dal",
+        "tags": ["vegan"],
+        "items": [{"name": "Lentils", "quantity": 200, "unit": "g", "cooked": True, "note": {"soak": "8h"}}],
+    }],
+    "diet": [{
+        "name": "Plant week",
+        "meals": [{"name": "Dal", "day": "Monday", "time": "19:00"}, {"name": "Dal", "portions": 2}],
+        "owner": "me",
+    }],
+}
+
+
+@pytest.mark.parametrize("identifier", sorted(MODELS))
+def test_records_round_trip(identifier, samples):
+    for records in (samples[identifier], EXTRA[identifier]):
+        assert to_records(from_records(identifier, records)) == records
+
+
+def test_default_nutrition_is_not_stored():
+    item = Item.from_dict(SAMPLES["item"][0])
+    assert item.nutrition_layout is None
+    assert item.to_dict() == SAMPLES["item"][0]
+
+
+def test_values_set_later_are_written():
+    item = Item.from_dict(EXTRA["item"][0])
+    item.fat, item.saturated, item.salt, item.salt_unit = 0.4, 0.1, 0.01, "g"
+    nutrition = item.to_dict()["nutrition"]
+    assert nutrition["fat"] == {"value": 0.4, "saturated": 0.1}
+    assert nutrition["salt"] == {"value": 0.01, "unit": "g"}
+    assert nutrition["carbohydrates"]["fiber"] == 7.9
+
+    item = Item.from_dict(EXTRA["item"][1])
+    assert "nutrition" not in item.to_dict()
+    item.energy = 0
+    assert item.to_dict()["nutrition"] == {"energy": {"value": 0}}
+
+
+def test_new_items_write_every_section():
+    nutrition = Item("Apple", per="100g", energy=52, energy_unit="kcal").to_dict()["nutrition"]
+    assert list(nutrition) == ["energy", "carbohydrates", "fat", "protein", "salt"]
+    assert nutrition["salt"] == {"value": None, "unit": None}
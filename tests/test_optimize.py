@@ -0,0 +1,31 @@
+import pytest
+
+from nutrition.loader import DataContext, get_storage
+from nutrition.meal.optimize import optimize_meal
+
+
+def optimize(*patterns, save=False, force=False, unit="g", name="Optimized meal", **targets):
+    return optimize_meal(list(patterns), targets, unit=unit, solver="simplex", name=name, save=save,
+                         output_format="json", context=DataContext(), force=force)
+
+
+def test_candidates_are_measured_in_the_unit(data_config, capsys):
+    # Only the banana has a piece weight
+    result = optimize("Oats", "Banana", "Crème fraîche", unit="pcs", energy=(210, 210))
+    assert [(item["name"], item["quantity"], item["unit"]) for item in result["items"]] == [("Banana", 2.0, "pcs")]
+    assert result["targets"][0]["status"] == "ok"
+
+    assert optimize("Oats", unit="cup", energy=(100, 200)) is None
+    assert "No candidate items that can be measured in cup" in capsys.readouterr().err
+
+
+def test_save_rejects_an_existing_name(data_config, samples, capsys):
+    assert optimize("Oats", save=True, name="Breakfast", energy=(389, 389)) is None
+    assert "Meal 'Breakfast' already exists" in capsys.readouterr().err
+    assert get_storage("meal").load() == samples["meal"]
+
+    assert optimize("Oats", save=True, name="Porridge", energy=(389, 389)) is not None
+    assert optimize("Oats", save=True, force=True, name="Breakfast", energy=(389, 389)) is not None
+    meals = get_storage("meal").load()
+    assert [meal["name"] for meal in meals] == ["Breakfast", "Dessert", "Porridge"]
+    assert meals[0]["items"] == [{"name": "Oats", "quantity": 100.0, "unit": "g"}]
@@ -0,0 +1,47 @@
+import io
+import json
+import os
+import subprocess
+import sys
+
+import nutrition
+from nutrition import yamlio
+from nutrition.output import RecordWriter, round_floats
+
+
+def test_round_floats():
+    record = {"energy": 0.1 + 0.2, "items": [{"quantity": 1 / 3, "count": 2}], "name": "x", "none": None}
+    assert round_floats(record) == {"energy": 0.3, "items": [{"quantity": 0.33, "count": 2}], "name": "x", "none": None}
+
+
+def test_writer_rounds_calculated_records():
+    for output_format, expected in (("ndjson", '{"value": 0.3}\n'), ("csv", "value\n0.3\n")):
+        stream = io.StringIO()
+        with RecordWriter(output_format, ["value"], lambda record: [record], stream=stream, digits=2) as writer:
+            writer.write({"value": 0.1 + 0.2})
+        assert stream.getvalue() == expected
+
+    stream = io.StringIO()
+    with RecordWriter("json", ["value"], lambda record: [record], stream=stream) as writer:
+        writer.write({"value": 0.125})
+    assert json.loads(stream.getvalue()) == [{"value": 0.125}]
+
+
+def test_closed_pipe_ends_quietly(tmp_path, data_config):
+    settings_file = tmp_path / "settings.yaml"
+    with open(settings_file, "w", encoding="utf-8") as settings:
+        yamlio.dump({"current": "test", "configs": [data_config]}, settings)
+    # Enough records to fill the pipe after the reader is gone
+    with open(data_config["item"], "w", encoding="utf-8") as items:
+        yamlio.dump([{"name": f"Item {i}", "per": "100g"} for i in range(20000)], items)
+
+    env = {"NUTRITION_CONFIG": str(settings_file), "PYTHONPATH": os.path.dirname(os.path.dirname(nutrition.__file__)), "PATH": ""}
+    process = subprocess.Popen(
+        [sys.executable, "-c", "from nutrition.cli import main; main()", "item", "get", "", "-f", "ndjson"],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=env,
+    )
+    assert json.loads(process.stdout.readline())["name"] == "Item 0"
+    process.stdout.close()
+    _, errors = process.communicate(timeout=60)
+    assert process.returncode == 1
+    assert errors == b""
@@ -0,0 +1,41 @@
+import pytest
+
+from nutrition import yamlio
+from nutrition.diet.calculate import compute_diets
+from nutrition.loader import DataContext
+from nutrition.meal import calculate as meal_calculate
+from nutrition.meal.calculate import compute_meals
+
+# Threads of a pool that was just shut down may not have exited yet when the next pool forks
+pytestmark = pytest.mark.filterwarnings("ignore:This process .* is multi-threaded:DeprecationWarning")
+
+
+@pytest.fixture
+def library(data_config, samples):
+    """The sample items with enough meals and diets to fill several chunks per worker."""
+    meals = [{"name": f"Meal {i}", "items": [{"name": "Oats", "quantity": 10 + i, "unit": "g"},
+                                             {"name": "Banana" if i % 3 else "Pear", "quantity": 1, "unit": "pcs"}]}
+             for i in range(40)]
+    diets = [{"name": f"Diet {i}", "meals": [{"name": f"Meal {(i + j) % 40}"} for j in range(i % 5 + 1)]}
+             for i in range(24)]
+    for identifier, records in (("meal", meals), ("diet", diets)):
+        with open(data_config[identifier], "w", encoding="utf-8") as data:
+            yamlio.dump(records, data)
+    return data_config
+
+
+@pytest.mark.parametrize("compute", [compute_meals, compute_diets])
+def test_jobs_match_the_serial_run_in_order(library, compute):
+    serial = compute("", DataContext())
+    assert len(serial) > 8
+    assert compute("", DataContext(), jobs=3) == serial
+    assert compute("Meal 1|Diet 1", DataContext(), jobs=2) == compute("Meal 1|Diet 1", DataContext())
+
+
+def test_worker_meal_totals_are_merged_back(library, monkeypatch):
+    context = DataContext()
+    diets = compute_diets("", context, jobs=3)
+    meals = compute_meals("", context, jobs=3)
+    monkeypatch.setattr(meal_calculate, "meal_vector", lambda *_: pytest.fail("merged totals are reused"))
+    assert compute_meals("", context) == meals
+    assert compute_diets("", context) == diets
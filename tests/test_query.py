@@ -0,0 +1,56 @@
+import pytest
+
+from nutrition import matrix
+from nutrition.matrix import NutrientMatrix
+from nutrition.models import Item
+from nutrition.query import NutrientColumns, column_index, parse_query
+
+ITEMS = [
+    Item("Oil", per="100g", fat=100.0, salt=0.0),
+    Item("Rice", per="100g", fat=0.3, salt=0.01),
+    Item("Water", per="100g", fat=0.0),
+    Item("Unknown", per="100g"),
+    Item("Lard", per="100g", fat=100.0, salt=-0.5),
+]
+QUERIES = ["fat > 0", "fat >= 100", "fat < 0.3", "fat <= 0.3", "fat == 100", "fat != 100",
+           "salt > -1", "-1 < salt", "salt < -.25", "fat > 50 and salt >= 0 or fat == 0"]
+
+
+def matched(query, scales=None):
+    scales = scales or [1.0] * len(ITEMS)
+    columns = NutrientColumns(NutrientMatrix(ITEMS), scales)
+    return [ITEMS[i].name for i in columns.evaluate(parse_query(query))]
+
+
+@pytest.fixture(params=["numpy", "pure"])
+def numpy(request, monkeypatch):
+    if request.param == "pure":
+        monkeypatch.setattr(matrix, "get_numpy", lambda: None)
+    elif matrix.get_numpy() is None:
+        pytest.skip("NumPy is not installed")
+
+
+def test_negative_numbers_parse():
+    fat = column_index("fat")
+    assert parse_query("fat > -1") == ("compare", fat, ">", -1.0)
+    assert parse_query("-1.5 < fat") == ("compare", fat, ">", -1.5)
+    with pytest.raises(ValueError):
+        parse_query("fat > - 1")
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_pure_comparisons_match_numpy(monkeypatch, query):
+    if matrix.get_numpy() is None:
+        pytest.skip("NumPy is not installed")
+    expected = matched(query)
+    monkeypatch.setattr(matrix, "get_numpy", lambda: None)
+    assert matched(query) == expected
+
+
+@pytest.mark.usefixtures("numpy")
+def test_missing_values_never_match():
+    assert matched("fat != 100") == ["Rice", "Water"]
+    assert matched("salt > -1") == ["Oil", "Rice", "Lard"]
+    assert matched("-1 < salt and salt < 0") == ["Lard"]
+    # Items without a conversion to the query basis
+    assert matched("fat >= 0", [1.0, None, 1.0, 1.0, 1.0]) == ["Oil", "Water", "Lard"]
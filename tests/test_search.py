@@ -0,0 +1,35 @@
+import pytest
+
+from nutrition.search import TrigramIndex
+
+NAMES = ["Chicken Breast", "Rice", "Broccoli", "Brown rice", "Chickpeas", "Ice cream", "Oats"]
+TYPES = ["Meat", "Grain", "Vegetable", "Grain", "Legume", "Dessert", "Grain"]
+
+
+@pytest.fixture
+def index():
+    return TrigramIndex(NAMES, TYPES)
+
+
+def found(index, query, **options):
+    return [NAMES[i] for i, _ in index.search(query, **options)]
+
+
+def test_typos_match_the_best_word(index):
+    assert found(index, "chiken")[0] == "Chicken Breast"
+    assert found(index, "brocoli") == ["Broccoli"]
+    assert found(index, "brocoli", threshold=0.3) == ["Broccoli", "Brown rice"]
+    assert found(index, "chiken brest")[0] == "Chicken Breast"
+
+
+def test_names_containing_the_query_come_first(index):
+    assert found(index, "rice")[:2] == ["Rice", "Brown rice"]
+    assert set(found(index, "ic")) == {"Rice", "Brown rice", "Chicken Breast", "Chickpeas", "Ice cream"}
+    assert found(index, "ts") == ["Oats"]
+
+
+def test_type_limit_and_threshold(index):
+    assert found(index, "ric", record_type="grain") == ["Rice", "Brown rice"]
+    assert len(found(index, "ic", limit=2)) == 2
+    assert found(index, "chiken", threshold=0.9) == []
+    assert found(index, "") == []
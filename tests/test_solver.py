@@ -0,0 +1,77 @@
+import math
+import random
+
+import pytest
+
+from nutrition import solver
+from nutrition.solver import solve_targets
+
+# Energy and protein in a gram of two items
+COEFFICIENTS = [[4.0, 2.0], [0.1, 0.3]]
+SOLVERS = ["simplex", pytest.param("scipy", marks=pytest.mark.skipif(solver.get_scipy() is None, reason="needs SciPy"))]
+
+
+@pytest.mark.parametrize("name", SOLVERS)
+def test_weight_objective_finds_the_lightest_quantities(name):
+    # min a + b with 4a + 2b >= 400 and 0.1a + 0.3b >= 30: the vertex where both bind
+    solution = solve_targets(COEFFICIENTS, [(400, math.inf), (30, math.inf)], "weight", solver=name)
+    assert solution["feasible"]
+    assert solution["quantities"] == pytest.approx([60, 80], abs=1e-6)
+    assert solution["solver"] == name
+
+
+@pytest.mark.parametrize("name", SOLVERS)
+def test_deviation_objective_meets_exact_targets(name):
+    solution = solve_targets(COEFFICIENTS, [(500, 500), (25, 25)], "deviation", solver=name)
+    assert solution["feasible"]
+    assert solution["deviation"] == pytest.approx(0, abs=1e-9)
+    assert solution["quantities"] == pytest.approx([100, 50], abs=1e-6)
+
+
+@pytest.mark.parametrize("name", SOLVERS)
+@pytest.mark.parametrize("objective", ["deviation", "weight"])
+def test_infeasible_targets_give_the_closest_quantities(name, objective):
+    # At most 100 kcal but 30 g of protein from an item with 0.1 g per 4 kcal
+    solution = solve_targets([[4.0], [0.1]], [(0, 100), (30, math.inf)], objective, solver=name)
+    assert not solution["feasible"]
+    # The scaled excess energy grows faster than the scaled protein shortfall shrinks
+    assert solution["quantities"] == pytest.approx([25], abs=1e-6)
+    assert solution["deviation"] == pytest.approx((30 - 2.5) / 30, abs=1e-6)
+
+
+@pytest.mark.parametrize("name", SOLVERS)
+def test_max_quantity_caps_every_item(name):
+    solution = solve_targets(COEFFICIENTS, [(400, math.inf), (30, math.inf)], "weight", max_quantity=75, solver=name)
+    assert solution["feasible"]
+    assert solution["quantities"] == pytest.approx([75, 75], abs=1e-6)
+
+    capped = solve_targets(COEFFICIENTS, [(400, math.inf), (30, math.inf)], "weight", max_quantity=50, solver=name)
+    assert not capped["feasible"]
+    assert max(capped["quantities"]) <= 50 + 1e-9
+
+
+def test_unknown_solver_and_objective():
+    with pytest.raises(ValueError):
+        solve_targets(COEFFICIENTS, [(400, 500), (30, 40)], solver="cplex")
+    with pytest.raises(ValueError):
+        solve_targets(COEFFICIENTS, [(400, 500), (30, 40)], objective="taste")
+
+
+@pytest.mark.skipif(solver.get_scipy() is None, reason="needs SciPy")
+@pytest.mark.parametrize("objective", ["deviation", "weight"])
+def test_simplex_agrees_with_highs(objective):
+    generator = random.Random(7)
+    for _ in range(50):
+        n = generator.randint(1, 12)
+        coefficients = [[generator.uniform(0, 5) for _ in range(n)] for _ in range(3)]
+        targets = []
+        for _ in range(3):
+            low = generator.choice([0, generator.uniform(10, 400)])
+            targets.append((low, generator.choice([math.inf, low + generator.uniform(0, 200)])))
+        cap = generator.choice([None, generator.uniform(20, 200)])
+        simplex = solve_targets(coefficients, targets, objective, cap, "simplex")
+        highs = solve_targets(coefficients, targets, objective, cap, "scipy")
+        assert simplex["feasible"] == highs["feasible"]
+        assert simplex["deviation"] == pytest.approx(highs["deviation"], abs=1e-6)
+        if objective == "weight" and simplex["feasible"]:
+            assert sum(simplex["quantities"]) == pytest.approx(sum(highs["quantities"]), rel=1e-6, abs=1e-6)
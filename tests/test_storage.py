@@ -0,0 +1,136 @@
+import json
+import multiprocessing
+import sqlite3
+
+import pytest
+
+from nutrition import loader, utils, yamlio
+from nutrition.storage import JournalStore, SqliteStore, YamlStore
+
+STORES = {"yaml": YamlStore, "journal": JournalStore}
+WRITERS = 8
+RECORDS_PER_WRITER = 10
+
+
+def add_records(backend, file, writer, start):
+    """Add this writer's records one at a time, once every writer is ready."""
+    store = STORES[backend](file)
+    start.wait()
+    for i in range(RECORDS_PER_WRITER):
+        store.add({"name": f"Item {writer}-{i}", "per": "100g"})
+
+
+@pytest.mark.skipif(utils.fcntl is None, reason="file locks need fcntl")
+@pytest.mark.parametrize("backend", sorted(STORES))
+def test_concurrent_writers_lose_no_record(tmp_path, backend):
+    file = str(tmp_path / "items.yaml")
+    STORES[backend](file).add({"name": "Existing", "per": "100g"})
+
+    context = multiprocessing.get_context("fork")
+    start = context.Event()
+    writers = [context.Process(target=add_records, args=(backend, file, writer, start)) for writer in range(WRITERS)]
+    for process in writers:
+        process.start()
+    start.set()
+    for process in writers:
+        process.join(60)
+        assert process.exitcode == 0
+
+    expected = {"Existing"} | {f"Item {writer}-{i}" for writer in range(WRITERS) for i in range(RECORDS_PER_WRITER)}
+    names = [record["name"] for record in STORES[backend](file).load()]
+    assert len(names) == len(expected)
+    assert set(names) == expected
+
+    # Every file is complete and parses
+    if backend == "journal":
+        with open(f"{file}.journal", encoding="utf-8") as journal:
+            entries = [json.loads(line) for line in journal]
+        assert len(entries) == 1 + WRITERS * RECORDS_PER_WRITER
+        STORES[backend](file).compact()
+    with open(file, encoding="utf-8") as data:
+        assert {record["name"] for record in yamlio.safe_load(data)} == expected
+
+
+def test_yaml_store_round_trip(tmp_path, samples):
+    store = YamlStore(str(tmp_path / "items.yaml"))
+    for record in samples["item"]:
+        store.add(record)
+    assert store.load() == samples["item"]
+    assert store.find(["Banana"]) == [samples["item"][2]]
+
+
+def test_journal_updates_and_removes(tmp_path, samples):
+    store = JournalStore(str(tmp_path / "meals.yaml"))
+    for record in samples["meal"]:
+        store.add(record)
+
+    renamed = {**samples["meal"][0], "name": "Brunch"}
+    assert store.update("Breakfast", renamed)
+    assert not store.update("Breakfast", renamed)
+    assert store.remove("Breakfast") is None
+    assert store.remove("Dessert") == samples["meal"][1]
+    assert store.load() == [renamed]
+    assert store.upsert([samples["meal"][1], {**renamed, "items": []}]) == (1, 1)
+    assert [record["name"] for record in store.load()] == ["Brunch", "Dessert"]
+
+
+def test_journal_writes_do_not_replay_the_dataset(tmp_path, samples, monkeypatch):
+    store = JournalStore(str(tmp_path / "items.yaml"))
+    store.replace(samples["item"])
+    monkeypatch.setattr(JournalStore, "load", lambda self: pytest.fail("writes must not load the dataset"))
+    store.add({"name": "Apple"})
+    assert store.update("Apple", {"name": "Green apple"})
+    assert not store.update("Apple", {"name": "Apple"})
+    assert store.upsert([{"name": "Oats"}, {"name": "Pear"}]) == (1, 1)
+
+
+def test_journal_name_counts_follow_outside_changes(tmp_path, samples):
+    file = str(tmp_path / "items.yaml")
+    store = JournalStore(file)
+    store.replace(samples["item"])
+    # Written without the store, e.g. by hand
+    with open(f"{file}.journal", "a", encoding="utf-8") as journal:
+        journal.write(json.dumps({"op": "remove", "name": "Oats"}) + "\n")
+    assert not store.update("Oats", {"name": "Oats"})
+    assert store.remove("Banana") == samples["item"][2]
+    assert [record["name"] for record in store.load()] == ["Crème fraîche"]
+
+
+def test_sqlite_store_keeps_extra_line_keys(tmp_path, samples):
+    database = str(tmp_path / "nutrition.db")
+    meal = {**samples["meal"][0], "items": [{**line, "note": "cooked"} for line in samples["meal"][0]["items"]]}
+    diet = {**samples["diet"][0], "meals": [{**line, "time": "08:00"} for line in samples["diet"][0]["meals"]]}
+    meals, diets = SqliteStore(database, "meal"), SqliteStore(database, "diet")
+    meals.add(meal)
+    diets.add(diet)
+    assert meals.load() == [meal]
+    assert meals.find([meal["name"]]) == [meal]
+    assert diets.load() == [diet]
+    assert diets.remove(diet["name"]) == diet
+
+
+def test_sqlite_store_migrates_line_tables(tmp_path):
+    database = str(tmp_path / "nutrition.db")
+    with sqlite3.connect(database) as connection:
+        connection.executescript("""
+            CREATE TABLE meals (id INTEGER PRIMARY KEY, name TEXT NOT NULL, record TEXT NOT NULL);
+            CREATE TABLE meal_items (meal_id INTEGER NOT NULL, position INTEGER NOT NULL, name TEXT NOT NULL,
+                                     quantity, unit TEXT, PRIMARY KEY (meal_id, position));
+            INSERT INTO meals VALUES (1, 'Lunch', '{"name": "Lunch"}');
+            INSERT INTO meal_items VALUES (1, 0, 'Rice', 150, 'g');
+        """)
+    store = SqliteStore(database, "meal")
+    assert store.load() == [{"name": "Lunch", "items": [{"name": "Rice", "quantity": 150, "unit": "g"}]}]
+    store.add({"name": "Dinner", "items": [{"name": "Rice", "quantity": 1, "unit": "cup", "note": "brown"}]})
+    assert store.find(["Dinner"])[0]["items"][0]["note"] == "brown"
+
+
+def test_exact_lookups_use_the_sqlite_index(tmp_path, samples, monkeypatch):
+    database = str(tmp_path / "nutrition.db")
+    SqliteStore(database, "item").replace(samples["item"])
+    monkeypatch.setattr(loader, "_config", {"name": "test", "storage": "sqlite", "database": database,
+                                            "item": "", "meal": "", "diet": ""})
+    monkeypatch.setattr(SqliteStore, "load", lambda self: pytest.fail("exact lookups must not load the dataset"))
+    context = loader.DataContext()
+    assert context.find("item", "Banana").to_dict() == samples["item"][2]
+    assert context.find("item", "Ban") is None
@@ -0,0 +1,48 @@
+import pytest
+
+from nutrition import loader
+from nutrition.diet import calculate as diet_calculate
+from nutrition.diet.calculate import compute_diet
+from nutrition.loader import DataContext
+from nutrition.meal import calculate as meal_calculate
+from nutrition.meal.calculate import compute_meals
+from nutrition.totals_cache import MealTotalsCache
+
+
+def test_totals_are_memoized_without_fingerprints(data_config, monkeypatch):
+    monkeypatch.setattr(MealTotalsCache, "fingerprint", lambda *_: pytest.fail("in-run totals need no fingerprint"))
+    context = DataContext()
+    first = compute_meals("", context)
+    monkeypatch.setattr(meal_calculate, "meal_vector", lambda *_: pytest.fail("totals are calculated once"))
+    assert compute_meals("", context) == first
+
+
+def test_persisted_totals_survive_the_run(data_config, monkeypatch):
+    monkeypatch.setattr(loader, "MEAL_CACHE_ENABLED", True)
+    context = DataContext()
+    first = compute_meals("", context)
+    context.meal_totals().save()
+
+    monkeypatch.setattr(meal_calculate, "meal_vector", lambda *_: pytest.fail("persisted totals are reused"))
+    assert compute_meals("", DataContext()) == first
+
+
+def test_repeated_diet_meals_are_calculated_once(data_config, monkeypatch):
+    context = DataContext()
+    diet = context.diets[0]
+    diet.meals = diet.meals * 7
+    calls = []
+    compute_meal = diet_calculate.compute_meal
+
+    def counted(meal, context):
+        calls.append(meal.name)
+        return compute_meal(meal, context)
+
+    monkeypatch.setattr(diet_calculate, "compute_meal", counted)
+
+    result = compute_diet(diet, context)
+    assert sorted(calls) == ["Breakfast", "Dessert"]
+    assert [meal["status"] for meal in result["meals"]] == ["ok"] * 14
+    summary = compute_diet(diet, context, detailed=False)
+    assert result["totals"]["energy"]["value"] == pytest.approx(summary["totals"]["energy"]["value"])
+    assert result["totals"]["energy"]["value"] == pytest.approx(7 * (389 * 0.8 + 105 + 292.5 / 2))
@@ -0,0 +1,97 @@
+import pytest
+
+from nutrition.loader import DataContext
+from nutrition.meal.calculate import calculate_multiplier, compute_meal
+from nutrition.models import Item, Meal, MealItem
+from nutrition.units import UnitRegistry, parse_per
+
+
+@pytest.mark.parametrize("per, expected", [
+    ("100g", (100.0, "g")),
+    ("100 G", (100.0, "g")),
+    ("0.5 cup", (0.5, "cup")),
+    ("0,5 l", (0.5, "l")),
+    (".5 cup", (0.5, "cup")),
+    ("1 piece", (1.0, "piece")),
+    ("piece", (1.0, "piece")),
+    ("100", (100.0, None)),
+    ("1/2 cup", (0.5, "cup")),
+    ("1 / 4 tbsp", (0.25, "tbsp")),
+    ("1 1/2 cups", (1.5, "cups")),
+    ("3/4", (0.75, None)),
+    ("1/0 cup", (0.0, "cup")),
+    ("", (100.0, None)),
+    (None, (100.0, None)),
+    (250, (250.0, None)),
+])
+def test_parse_per(per, expected):
+    assert parse_per(per) == expected
+
+
+@pytest.fixture
+def registry():
+    return UnitRegistry({"scoop": 30, "glass": "250 ml"})
+
+
+def multiplier(registry, item, quantity, unit):
+    return calculate_multiplier(quantity, registry.lookup(unit), registry.conversions(item))
+
+
+def test_weights_convert_between_aliases(registry):
+    oats = Item("Oats", per="100g")
+    assert registry.conversions(oats) == {"g": pytest.approx(0.01)}
+    assert multiplier(registry, oats, 0.5, "kg") == pytest.approx(5)
+    assert multiplier(registry, oats, 2, "Scoop") == pytest.approx(0.6)
+    # Pieces and volumes need a piece_weight and a density
+    assert multiplier(registry, oats, 1, "cup") is None
+    assert multiplier(registry, oats, 1, "pcs") is None
+
+
+def test_density_converts_grams_and_millilitres(registry):
+    cream = Item("Cream", per="100 ml", density=1.01)
+    assert registry.conversions(cream) == {"ml": pytest.approx(0.01), "g": pytest.approx(1 / 101)}
+    assert multiplier(registry, cream, 1, "glass") == pytest.approx(2.5)
+    assert multiplier(registry, cream, 101, "g") == pytest.approx(1)
+    honey = Item("Honey", per="100g", density=1.4)
+    assert multiplier(registry, honey, 1, "tbsp") == pytest.approx(15 * 1.4 / 100)
+
+
+def test_piece_weight_converts_pieces(registry):
+    banana = Item("Banana", per="1 piece", piece_weight=120)
+    assert multiplier(registry, banana, 2, "pcs") == pytest.approx(2)
+    assert multiplier(registry, banana, 60, "g") == pytest.approx(0.5)
+    egg = Item("Egg", per="100g", piece_weight=60)
+    assert multiplier(registry, egg, 2, "pieces") == pytest.approx(1.2)
+    # Volumes go through grams, with both a piece weight and a density
+    juice = Item("Orange juice", per="1 pc", piece_weight=200, density=1.05)
+    assert multiplier(registry, juice, 210, "ml") == pytest.approx(210 * 1.05 / 200)
+
+
+def test_unknown_units_do_not_convert(registry):
+    oats = Item("Oats", per="100g")
+    assert registry.lookup("handful") == ("handful", 1.0)
+    assert multiplier(registry, oats, 1, "handful") is None
+    # An item per an unknown unit converts only from that unit
+    bar = Item("Protein bar", per="1 bar")
+    assert registry.conversions(bar) == {"bar": 1.0}
+    assert multiplier(registry, bar, 2, "BAR") == pytest.approx(2)
+    assert multiplier(registry, bar, 50, "g") is None
+
+
+def test_missing_base(registry):
+    # A per without a unit is in grams, and an empty one is 100 g
+    assert registry.conversions(Item("Rice", per="50")) == {"g": pytest.approx(0.02)}
+    assert registry.conversions(Item("Rice")) == {"g": pytest.approx(0.01)}
+    assert registry.conversions(Item("Rice", per="0 g")) == {}
+
+
+def test_pieces_without_weight_are_conversion_issues():
+    context = DataContext(datasets={
+        "item": ([Item("Egg", per="100g", energy=143.0)], ""),
+        "meal": ([], ""),
+    })
+    meal = Meal("Omelette", [MealItem("Egg", 2, "pcs"), MealItem("Egg", 50, "g")])
+    result = compute_meal(meal, context)
+    assert [item["status"] for item in result["items"]] == ["conversion", "ok"]
+    assert result["conversion_issues"] == ["Egg"]
+    assert result["totals"]["energy"]["value"] == pytest.approx(71.5)
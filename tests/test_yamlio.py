@@ -0,0 +1,42 @@
+import io
+
+import pytest
+
+from nutrition import yamlio
+
+from conftest import SAMPLES
+
+BACKENDS = [
+    "python",
+    pytest.param("c", marks=pytest.mark.skipif(not yamlio.HAS_LIBYAML, reason="PyYAML built without libyaml")),
+]
+
+
+@pytest.mark.parametrize("dump_backend", BACKENDS)
+@pytest.mark.parametrize("load_backend", BACKENDS)
+@pytest.mark.parametrize("dataset", sorted(SAMPLES))
+def test_round_trip_between_backends(dataset, dump_backend, load_backend):
+    records = SAMPLES[dataset]
+    text = yamlio.dump(records, backend=dump_backend)
+    assert yamlio.safe_load(text, backend=load_backend) == records
+
+
+@pytest.mark.skipif(not yamlio.HAS_LIBYAML, reason="PyYAML built without libyaml")
+@pytest.mark.parametrize("dataset", sorted(SAMPLES))
+def test_backends_dump_the_same_data(dataset):
+    records = SAMPLES[dataset]
+    c_text = yamlio.dump(records, backend="c")
+    python_text = yamlio.dump(records, backend="python")
+    assert yamlio.safe_load(c_text, backend="python") == yamlio.safe_load(python_text, backend="c")
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_multiple_documents(backend):
+    text = "".join("---\n" + yamlio.dump(record, backend=backend) for record in SAMPLES["item"])
+    assert list(yamlio.safe_load_all(text, backend=backend)) == SAMPLES["item"]
+    assert list(yamlio.iter_load(io.StringIO(text))) == SAMPLES["item"]
+
+
+def test_iter_load_streams_list_elements():
+    text = yamlio.dump(SAMPLES["meal"], backend="python")
+    assert list(yamlio.iter_load(io.StringIO(text))) == SAMPLES["meal"]